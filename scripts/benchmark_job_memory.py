@@ -0,0 +1,81 @@
+import argparse
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+# The synthetic history is shared with the save format benchmark.
+from benchmark_save_codec import make_local_job  # noqa: E402
+
+from hordeqt.classes.Job import Job  # noqa: E402
+from hordeqt.classes.LocalJob import LocalJob  # noqa: E402
+
+
+def measure(name: str, n: int, fn: Callable[[], object]) -> object:
+    """Run fn, and print how much of what it allocated is still in use afterwards (including what it returns), per job."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<34} {size / n:8.0f} B/job {elapsed:8.3f}s")
+    return result
+
+
+def serialize_all(jobs: List) -> None:
+    # Results are thrown away, so only what the jobs keep is counted.
+    for job in jobs:
+        job.serialize()
+
+
+# Each kind of job is measured in its own function, so the previous ones are freed by the time it starts.
+def measure_jobs(data: List[dict], n: int):
+    jobs = measure(
+        "Job.deserialize", n, lambda: [Job.deserialize(d["original"]) for d in data]
+    )
+    measure("Job.serialize, kept", n, lambda: serialize_all(jobs))  # type: ignore
+
+
+def measure_queued_jobs(data: List[dict], n: int):
+    # Jobs still in the queues keep their to_json payload between autosaves.
+    queued = measure(
+        "queued Job.deserialize",
+        n,
+        lambda: [Job.deserialize(d["original"] | {"done": False}) for d in data],
+    )
+    measure("queued Job.serialize, kept", n, lambda: serialize_all(queued))  # type: ignore
+    measure("queued Job.serialize again", n, lambda: serialize_all(queued))  # type: ignore
+
+
+def measure_local_jobs(data: List[dict], n: int):
+    local_jobs = measure(
+        "LocalJob.deserialize", n, lambda: [LocalJob.deserialize(d) for d in data]
+    )
+    measure("LocalJob.serialize, kept", n, lambda: serialize_all(local_jobs))  # type: ignore
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Memory used per Job and LocalJob in a synthetic history."
+    )
+    parser.add_argument("-n", type=int, default=20_000, help="Jobs to load")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    data = [make_local_job(rng) for _ in range(args.n)]
+    print(f"{args.n} jobs")
+    measure_jobs(data, args.n)
+    measure_queued_jobs(data, args.n)
+    measure_local_jobs(data, args.n)
+
+
+if __name__ == "__main__":
+    main()
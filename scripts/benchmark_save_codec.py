@@ -0,0 +1,153 @@
+import argparse
+import gzip
+import json
+import random
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+import jsonpickle
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from hordeqt.other.save_codec import (  # noqa: E402
+    LOCAL_JOB,
+    Compression,
+    decode,
+    encode,
+)
+
+MODELS = ["AlbedoBase XL (SDXL)", "Pony Diffusion XL", "Deliberate", "Juggernaut XL"]
+SAMPLERS = ["k_euler", "k_euler_a", "k_dpmpp_2m", "k_dpmpp_sde"]
+WORDS = "a lighthouse on a cliff at dusk, dramatic clouds, oil painting, detailed, masterpiece, fog, seagulls".split()
+
+
+def make_local_job(rng: random.Random) -> dict:
+    """Shaped like LocalJob.serialize(), without importing the app."""
+    job_id = str(uuid.UUID(int=rng.getrandbits(128)))
+    prompt = " ".join(rng.choices(WORDS, k=rng.randint(5, 40)))
+    loras = [
+        {
+            "name": str(rng.randint(10000, 400000)),
+            "model": 1.0,
+            "clip": 1.0,
+            "is_version": True,
+            "_hordeqt_name": f"LoRA {rng.randint(0, 50)}",
+        }
+        for _ in range(rng.choice([0, 0, 1, 2]))
+    ]
+    created = 1.7e9 + rng.random() * 3e7
+    return {
+        "id": job_id,
+        "original": {
+            "prompt": f"{prompt}###blurry, lowres",
+            "params": {
+                "sampler_name": rng.choice(SAMPLERS),
+                "cfg_scale": rng.choice([4.0, 5.0, 7.5]),
+                "seed": str(rng.getrandbits(32)),
+                "height": 1024,
+                "width": rng.choice([832, 1024, 1216]),
+                "post_processing": [],
+                "karras": True,
+                "hires_fix": False,
+                "clip_skip": rng.choice([1, 2]),
+                "steps": rng.choice([20, 25, 30]),
+                "n": 1,
+                "loras": loras,
+            },
+            "nsfw": False,
+            "trusted_workers": False,
+            "slow_workers": True,
+            "censor_nsfw": True,
+            "models": [rng.choice(MODELS)],
+            "r2": True,
+            "shared": True,
+            "replacement_filter": True,
+            "dry_run": False,
+            "done": True,
+            "faulted": False,
+            "kudos": rng.randint(5, 60),
+            "id": job_id,
+            "horde_job_id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "queue_position": 0,
+            "wait_time": 0,
+            "mod_time": created + 30,
+            "creation_time": created,
+        },
+        "fileType": "webp",
+        "path": f"/home/user/.local/share/HordeQT/images/{job_id}.webp",
+        "completed_at": created + 35,
+        "worker_id": str(uuid.UUID(int=rng.getrandbits(128) % 200)),
+        "worker_name": f"Worker {rng.randint(0, 200)}",
+    }
+
+
+Codec = Tuple[str, Callable[[List[dict]], object], Callable[[object], object]]
+
+
+def _rows(enc, dec) -> Tuple[Callable, Callable]:
+    return (
+        lambda jobs: [enc(j) for j in jobs],
+        lambda rows: [dec(r) for r in rows],
+    )
+
+
+def _size(encoded) -> int:
+    if isinstance(encoded, list):
+        return sum(len(r) for r in encoded)
+    return len(encoded)
+
+
+def codecs() -> List[Codec]:
+    return [
+        (
+            "jsonpickle+gzip snapshot (old save file)",
+            lambda jobs: gzip.compress(jsonpickle.encode({"current_images": jobs}).encode()),  # type: ignore
+            lambda b: jsonpickle.decode(gzip.decompress(b)),  # type: ignore
+        ),
+        ("json rows", *_rows(lambda j: json.dumps(j).encode(), json.loads)),
+        ("binary rows", *_rows(lambda j: encode(j, LOCAL_JOB), decode)),
+        (
+            "binary rows, zlib 1",
+            *_rows(lambda j: encode(j, LOCAL_JOB, Compression.ZLIB, 1), decode),
+        ),
+        ("binary snapshot", lambda jobs: encode(jobs, LOCAL_JOB), decode),
+        (
+            "binary snapshot, gzip 6",
+            lambda jobs: encode(jobs, LOCAL_JOB, Compression.GZIP, 6),
+            decode,
+        ),
+        (
+            "binary snapshot, lzma 6",
+            lambda jobs: encode(jobs, LOCAL_JOB, Compression.LZMA, 6),
+            decode,
+        ),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare save formats on a synthetic image history."
+    )
+    parser.add_argument("-n", type=int, default=50_000, help="Images in the history")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    jobs = [make_local_job(rng) for _ in range(args.n)]
+    print(f"{args.n} images")
+    print(f"{'format':<42} {'encode':>9} {'decode':>9} {'size':>10}")
+    for name, enc, dec in codecs():
+        start = time.perf_counter()
+        encoded = enc(jobs)
+        encode_time = time.perf_counter() - start
+        start = time.perf_counter()
+        dec(encoded)
+        decode_time = time.perf_counter() - start
+        size = _size(encoded) / 1024 / 1024
+        print(f"{name:<42} {encode_time:8.2f}s {decode_time:8.2f}s {size:8.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,8 @@
-from hordeqt.app import main
+import multiprocessing
 
 if __name__ == "__main__":
+    # Imported here so that worker processes don't create a second QApplication.
+    from hordeqt.app import main
+
+    multiprocessing.freeze_support()
     main()
@@ -1,38 +1,46 @@
 import datetime as dt
-import json
 import os
 import shutil
 import sys
 import threading
 import time
-from typing import Any, Dict, List, Optional, Tuple
+from operator import attrgetter
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 import human_readable as hr
 import keyring
 import requests
 from pyqttoast import Toast, ToastPreset, toast_enums
-from PySide6.QtCore import Qt, QTimer, QUrl
+from PySide6.QtCore import (
+    QCoreApplication,
+    QEvent,
+    QFileSystemWatcher,
+    QSignalBlocker,
+    Qt,
+    QTimer,
+    QUrl,
+)
 from PySide6.QtGui import QDesktopServices, QFont, QIcon
 from PySide6.QtWidgets import (
     QApplication,
     QLineEdit,
     QMainWindow,
-    QScrollArea,
     QSizePolicy,
     QSystemTrayIcon,
     QTableWidgetItem,
     QVBoxLayout,
 )
 
+from hordeqt.classes.ImageCache import ImageCache
+from hordeqt.classes.ImageIndex import ImageIndex
 from hordeqt.classes.Job import Job
-from hordeqt.classes.LocalJob import LocalJob
-from hordeqt.classes.Model import Model
-from hordeqt.classes.SavedData import SavedData
+from hordeqt.classes.LocalJob import LocalJob, set_loaded_limit
+from hordeqt.classes.Model import Model, apply_status
+from hordeqt.classes.SavedData import SavedData, SaveSection
 from hordeqt.classes.Style import Style
 from hordeqt.classes.StyleLibrary import StyleLibrary
 from hordeqt.components.gallery.image_gallery_widget import ImageGalleryWidget
 from hordeqt.components.gallery.image_popup import ImagePopup
-from hordeqt.components.gallery.image_widget import ImageWidget
 from hordeqt.components.localstats.local_stats import LocalStats
 from hordeqt.components.loras.lora_browser import LoraBrowser
 from hordeqt.components.loras.lora_item import LoRAItem
@@ -46,25 +54,36 @@ from hordeqt.gen.ui_form import Ui_MainWindow
 from hordeqt.other.consts import (
     ANON_API_KEY,
     APP,
-    BASE_URL,
     CACHE_PATH,
     LOGGER,
     SAVED_DATA_DIR_PATH,
     SAVED_IMAGE_DIR_PATH,
 )
+from hordeqt.other.history_window import HistoryWindow
+from hordeqt.other.image_layout import (
+    ImageLayout,
+    migration_pending,
+    set_target_layout,
+    target_layout,
+)
 from hordeqt.other.job_util import get_horde_metadata_pretty
 from hordeqt.other.prompt_util import create_jobs
-from hordeqt.other.rescan import rescan_jobs
 from hordeqt.other.util import get_time_str, size_presets
 from hordeqt.threads.connection_thread import (
     CheckConnectionThread,
     OnlineStatus,
     oc_to_description,
 )
+from hordeqt.threads.duplicate_thread import DuplicateScanThread
 from hordeqt.threads.etc_download_thread import DownloadThread
+from hordeqt.threads.import_thread import ImportThread
 from hordeqt.threads.job_download_thread import JobDownloadThread
 from hordeqt.threads.job_manager_thread import JobManagerThread
+from hordeqt.threads.layout_migration_thread import LayoutMigrationThread
 from hordeqt.threads.load_thread import LoadThread
+from hordeqt.threads.model_status_thread import ModelStatusThread
+from hordeqt.threads.recompress_thread import RecompressThread
+from hordeqt.threads.rescan_thread import RescanThread
 from hordeqt.threads.save_thread import SaveThread
 
 
@@ -78,6 +97,10 @@ class HordeQt(QMainWindow):
         LOGGER.debug("Saved data loaded")
         self.clipboard = app.clipboard()
         self.model_dict: Dict[str, Model] = {}
+        self.model_reference: Optional[dict] = None
+        self.model_status: Optional[List[dict]] = None
+        self.style_previews: Dict[str, Dict[str, str]] = {}
+        self.styleLibrary: Optional[StyleLibrary] = None
         self.user_styles: List[Style] = [
             Style.deserialize(s) for s in self.savedData.user_saved_styles
         ]
@@ -106,6 +129,8 @@ class HordeQt(QMainWindow):
             )
 
         self.loading_thread = LoadThread(self.api_key)
+        # Generating only needs the models and the user's limits, the rest fills in as it arrives.
+        self.waiting_to_generate = {"models", "reload_user_info"}
         self.hide_api_key()
         LOGGER.debug("Updating generate frame")
         sizePolicy = QSizePolicy(
@@ -142,6 +167,14 @@ class HordeQt(QMainWindow):
         self.ui.tabWidget.setCurrentIndex(self.savedData.current_open_tab)
         self.ui.saveFormatComboBox.setCurrentText(self.savedData.prefered_format)
         self.ui.showDoneImagesCheckbox.setChecked(self.savedData.show_done_images)
+        self.ui.imageCacheSpinBox.setValue(self.savedData.image_cache_mb)
+        self.ui.watchImageDirCheckBox.setChecked(self.savedData.watch_image_dir)
+        self.ui.imageLayoutComboBox.setCurrentText(self.savedData.image_layout)
+        self.ui.historyCountSpinBox.setValue(self.savedData.history_count)
+        self.ui.historyAgeSpinBox.setValue(self.savedData.history_max_age_hours)
+        # Before any LocalJob works out its path.
+        set_target_layout(ImageLayout(self.savedData.image_layout))
+        self.image_cache = ImageCache(self.savedData.image_cache_mb * 1024 * 1024)
         self.warned_models = self.savedData.warned_models
         LOGGER.debug("Initializing API thread")
         self.api_thread = JobManagerThread.deserialize(
@@ -149,21 +182,48 @@ class HordeQt(QMainWindow):
             api_key=self.api_key,
             max_requests=self.savedData.max_jobs,
         )
+        self.apply_history()
         LOGGER.debug("Disabling buttons until fully loaded")
         self.ui.GenerateButton.setEnabled(False)
         self.ui.modelComboBox.setEnabled(False)
         self.ui.StyleSelector.setEnabled(False)
 
+        LOGGER.debug("Loading image index")
+        self.image_index = ImageIndex()
         self.job_download_thread: JobDownloadThread = JobDownloadThread.deserialize(
             {
-                "completed_downloads": self.savedData.current_images,
                 "queued_downloads": self.savedData.queued_downloads,
             },
         )
-        self.job_download_thread.completed_downloads = rescan_jobs(
-            self.job_download_thread.completed_downloads
+        self.job_download_thread.completed_downloads = self.image_index.load_jobs()
+        # Files in the image directory that aren't in the index are loaded in the background once the window is up.
+        self.import_thread = ImportThread()
+        self.rescan_thread = RescanThread(self.known_image_ids)
+        self.rescan_thread.found.connect(self.on_images_imported)
+        self.image_dir_watcher = QFileSystemWatcher(self)
+        self.image_dir_watcher.directoryChanged.connect(self.on_image_dir_changed)
+        # Downloads and deletes change the directory too, so wait for things to settle rather than listing it for every file.
+        self.rescan_timer = QTimer(self)
+        self.rescan_timer.setSingleShot(True)
+        self.rescan_timer.setInterval(2000)
+        self.rescan_timer.timeout.connect(self.rescan_thread.trigger)
+        self.save_thread = SaveThread(self.savedData)
+        # Sections of the saved data that changed since the last autosave, nothing is saved while this is empty.
+        self.dirty_sections: Set[SaveSection] = set()
+        self.autosave_timer = QTimer(self)
+        self.autosave_timer.setSingleShot(True)
+        self.autosave_timer.setInterval(30 * 1000)
+        self.autosave_timer.timeout.connect(self.autosave)
+        self.recompress_thread = RecompressThread(
+            lambda: self.job_download_thread.completed_downloads, self.is_generating
+        )
+        self.recompress_thread.recompressed.connect(self.on_image_recompressed)
+        self.duplicate_thread = DuplicateScanThread()
+        self.layout_migration_thread = LayoutMigrationThread(
+            lambda: self.job_download_thread.completed_downloads,
+            lambda: self.recompress_thread.busy,
         )
-        self.save_thread = SaveThread(self)
+        self.layout_migration_thread.finished.connect(self.on_layout_migration_done)
         self.download_thread: DownloadThread = DownloadThread.deserialize(
             self.savedData.download_state
         )
@@ -189,6 +249,9 @@ class HordeQt(QMainWindow):
         self.loading_thread.style_preview.connect(self.construct_style_preview)
         self.loading_thread.user_info.connect(self.update_user_info)
         self.loading_thread.horde_info.connect(self.update_horde_info)
+        self.loading_thread.loaded.connect(self.on_resource_loaded)
+        self.model_status_thread = ModelStatusThread()
+        self.model_status_thread.models.connect(self.on_model_status)
         LOGGER.debug("Connecting UI signals")
         self.ui.GenerateButton.clicked.connect(self.on_generate_click)
         self.ui.modelDetailsButton.clicked.connect(self.on_model_open_click)
@@ -196,6 +259,17 @@ class HordeQt(QMainWindow):
             self.update_metadata_save
         )
         self.ui.LoRASelector.clicked.connect(lambda: LoraBrowser(self))
+        self.ui.imageCacheSpinBox.valueChanged.connect(
+            lambda mb: self.image_cache.set_budget(mb * 1024 * 1024)
+        )
+        self.ui.watchImageDirCheckBox.checkStateChanged.connect(
+            self.update_image_dir_watch
+        )
+        self.ui.imageLayoutComboBox.currentTextChanged.connect(
+            self.on_image_layout_changed
+        )
+        self.ui.historyCountSpinBox.valueChanged.connect(self.on_history_changed)
+        self.ui.historyAgeSpinBox.valueChanged.connect(self.on_history_changed)
 
         self.ui.apiKeyEntry.editingFinished.connect(self.save_api_key)
         self.ui.saveAPIkey.clicked.connect(self.save_api_key)
@@ -221,6 +295,8 @@ class HordeQt(QMainWindow):
         self.ui.imagesSpinBox.valueChanged.connect(self.update_images_created)
         self.ui.karrasCheckBox.checkStateChanged.connect(self.update_kudos_preview)
         self.ui.highResFixCheckBox.checkStateChanged.connect(self.update_kudos_preview)
+        # After the saved values are on the UI, so restoring them doesn't count as a change.
+        self.connect_autosave()
 
         localStatsLayout = QVBoxLayout()
         localStatsLayout.addWidget(LocalStats(self))
@@ -234,29 +310,20 @@ class HordeQt(QMainWindow):
         LOGGER.debug("Initializing Masonry/Gallery layout")
         self.ui.galleryViewFrame.setSizePolicy(sizePolicy)
         container_layout = QVBoxLayout(self.ui.galleryViewFrame)
-        scroll_area = QScrollArea()
-
-        scroll_area.setSizePolicy(sizePolicy)
-        scroll_area.setWidgetResizable(True)
-        self.gallery_container = ImageGalleryWidget()
-        existing_ids: List[str] = []
-        filtered_jobs: List[LocalJob] = []
-        for lj in self.job_download_thread.completed_downloads:
-            if lj.id in existing_ids:
-                LOGGER.debug(f"Found duplicate for {lj.id}")
-            else:
-                lj.update_path()
-                v = self.add_image_to_gallery(lj)
-                if not v:
-                    LOGGER.warning(f"Image {lj.path} is invalid, not adding to gallery")
-                else:
-                    LOGGER.trace(f"Image found, added to gallery: {lj.id}")
-                    filtered_jobs.append(lj)
-                    existing_ids.append(lj.id)
-        self.job_download_thread.completed_downloads = filtered_jobs
-        # May need to update scroll_area when jobs are added?
-        scroll_area.setWidget(self.gallery_container)
-        container_layout.addWidget(scroll_area)
+        self.gallery_container = ImageGalleryWidget(self.image_cache, self.image_index)
+        self.gallery_container.gallery.imageClicked.connect(self.show_image_popup)
+        self.gallery_container.pathsDropped.connect(self.import_thread.add_paths)
+        self.import_thread.progress.connect(self.gallery_container.set_import_progress)
+        self.import_thread.imported.connect(self.on_images_imported)
+        self.import_thread.finished.connect(self.on_import_finished)
+        # Images are only decoded once they scroll into view, and checking every file is there would be a stat per image, so the first rescan does that from a directory listing.
+        self.rescan_thread.missing.connect(self.on_images_missing)
+        self.rescan_thread.check_missing(self.job_download_thread.completed_downloads)
+        self.gallery_container.set_jobs(
+            self.job_download_thread.completed_downloads,
+            self.image_index.file_sizes(),
+        )
+        container_layout.addWidget(self.gallery_container)
         self.ui.galleryViewFrame.setLayout(container_layout)
 
         LOGGER.debug("Setting up toasts")
@@ -265,7 +332,13 @@ class HordeQt(QMainWindow):
         Toast.setPositionRelativeToWidget(self)
         LOGGER.debug("Starting threads")
         self.loading_thread.start()
+        self.model_status_thread.start()
         self.job_download_thread.start()
+        self.rescan_thread.start()
+        self.update_image_dir_watch()
+        if migration_pending():
+            # A move that was interrupted, or the layout was changed without one.
+            self.layout_migration_thread.start()
         self.download_thread.start()
         self.api_thread.start()
         self.connection_thread.start()
@@ -278,29 +351,23 @@ class HordeQt(QMainWindow):
         self.api_thread.stop()
         self.job_download_thread.stop()
         self.download_thread.stop()
+        self.model_status_thread.stop()
         self.connection_thread.stop()
+        self.recompress_thread.stop()
+        # Apply recompressions that finished while stopping, otherwise their jobs still point at the old files.
+        QCoreApplication.sendPostedEvents(self, QEvent.Type.MetaCall)
+        self.duplicate_thread.stop()
+        self.rescan_thread.stop()
+        self.import_thread.stop()
+        self.layout_migration_thread.stop()
+        self.gallery_container.gallery.stop()
         LOGGER.debug("Threads stopped")
         if not self.fullyloaded:
             qCleanupResources()
             QMainWindow.closeEvent(self, event)
             return
         LOGGER.debug("Updating saved data")
-        self.savedData.update(
-            self.api_thread,
-            self.ui.NSFWCheckBox.isChecked(),
-            self.ui.maxJobsSpinBox.value(),
-            self.ui.saveMetadataCheckBox.isChecked(),
-            self.job_download_thread,
-            self.download_thread,
-            self.save_job_config(),
-            self.ui.shareImagesCheckBox.isChecked(),
-            self.ui.tabWidget.currentIndex(),
-            self.ui.saveFormatComboBox.currentText(),
-            self.warned_models,
-            self.ui.showDoneImagesCheckbox.isChecked(),
-            self.ui.notifyAfterNFinishedSpinBox.value(),
-            self.styleLibrary.get_user_styles(),
-        )
+        self.update_saved_data(SaveSection)
         LOGGER.debug("Writing saved data")
         self.savedData.write()
         LOGGER.debug("Unloading resources")
@@ -308,6 +375,97 @@ class HordeQt(QMainWindow):
         LOGGER.debug("Closing Main window")
         QMainWindow.closeEvent(self, event)
 
+    def connect_autosave(self):
+        def mark_settings(*_):
+            self.mark_dirty(SaveSection.SETTINGS)
+
+        def mark_jobs(*_):
+            self.mark_dirty(SaveSection.JOBS)
+
+        for spin_box in (
+            self.ui.maxJobsSpinBox,
+            self.ui.notifyAfterNFinishedSpinBox,
+            self.ui.imageCacheSpinBox,
+            self.ui.historyCountSpinBox,
+            self.ui.historyAgeSpinBox,
+            self.ui.guidenceDoubleSpinBox,
+            self.ui.seedSpinBox,
+            self.ui.widthSpinBox,
+            self.ui.heightSpinBox,
+            self.ui.clipSkipSpinBox,
+            self.ui.stepsSpinBox,
+            self.ui.imagesSpinBox,
+        ):
+            spin_box.valueChanged.connect(mark_settings)
+        for check_box in (
+            self.ui.NSFWCheckBox,
+            self.ui.shareImagesCheckBox,
+            self.ui.saveMetadataCheckBox,
+            self.ui.showDoneImagesCheckbox,
+            self.ui.watchImageDirCheckBox,
+            self.ui.highResFixCheckBox,
+            self.ui.karrasCheckBox,
+        ):
+            check_box.checkStateChanged.connect(mark_settings)
+        for combo_box in (
+            self.ui.saveFormatComboBox,
+            self.ui.imageLayoutComboBox,
+            self.ui.samplerComboBox,
+            self.ui.modelComboBox,
+            self.ui.upscaleComboBox,
+        ):
+            combo_box.currentTextChanged.connect(mark_settings)
+        self.ui.PromptBox.textChanged.connect(mark_settings)
+        self.ui.NegativePromptBox.textChanged.connect(mark_settings)
+        self.ui.tabWidget.currentChanged.connect(mark_settings)
+        self.selectedLoRAs.updated.connect(mark_settings)
+        self.selectedStyles.updated.connect(mark_settings)
+        self.api_thread.jobs_changed.connect(mark_jobs)
+        self.job_download_thread.completed.connect(mark_jobs)
+        self.download_thread.queue_changed.connect(
+            lambda: self.mark_dirty(SaveSection.DOWNLOADS)
+        )
+
+    def mark_dirty(self, section: SaveSection):
+        self.dirty_sections.add(section)
+        # Changes are gathered up, the first one starts the countdown.
+        if not self.autosave_timer.isActive():
+            self.autosave_timer.start()
+
+    def autosave(self):
+        sections, self.dirty_sections = self.dirty_sections, set()
+        self.update_saved_data(sections)
+        self.save_thread.save(sections)
+
+    def update_saved_data(self, sections: Iterable[SaveSection]):
+        """Copy the current state of sections into the saved data. Widgets are read, so this has to be on the GUI thread."""
+        sections = set(sections)
+        if SaveSection.SETTINGS in sections:
+            self.savedData.update_settings(
+                self.ui.NSFWCheckBox.isChecked(),
+                self.ui.maxJobsSpinBox.value(),
+                self.ui.saveMetadataCheckBox.isChecked(),
+                self.save_job_config(),
+                self.ui.shareImagesCheckBox.isChecked(),
+                self.ui.tabWidget.currentIndex(),
+                self.ui.saveFormatComboBox.currentText(),
+                self.warned_models,
+                self.ui.showDoneImagesCheckbox.isChecked(),
+                self.ui.notifyAfterNFinishedSpinBox.value(),
+                self.ui.imageCacheSpinBox.value(),
+                self.ui.watchImageDirCheckBox.isChecked(),
+                self.ui.imageLayoutComboBox.currentText(),
+                self.ui.historyCountSpinBox.value(),
+                self.ui.historyAgeSpinBox.value(),
+            )
+        if SaveSection.JOBS in sections:
+            self.savedData.update_jobs(self.api_thread, self.job_download_thread)
+        # Until the styles have loaded, the saved user styles are still the current ones.
+        if SaveSection.STYLES in sections and self.styleLibrary is not None:
+            self.savedData.update_styles(self.styleLibrary.get_user_styles())
+        if SaveSection.DOWNLOADS in sections:
+            self.savedData.update_downloads(self.download_thread)
+
     def on_connection_status_update(self, value: OnlineStatus):
         self.online = value.online
         if self.last_online_status is None:
@@ -397,9 +555,17 @@ class HordeQt(QMainWindow):
         self.preset_being_updated = False
 
     def on_image_fully_downloaded(self, lj: LocalJob):
+        self.image_index.add(lj)
         self.add_image_to_gallery(lj)
         QTimer.singleShot(1000, self.check_for_notifications)
 
+    def is_generating(self) -> bool:
+        return (
+            not self.api_thread.job_queue.empty()
+            or not self.api_thread.current_requests.empty()
+            or len(self.job_download_thread.queued_downloads) > 0
+        )
+
     def check_for_notifications(self):
         # this seems like it could be an oppurtuniy for a race condition, but it's probably not a huge deal.
         # Also, this construction is... not the cleanest or clearest, but it's also probably fine.
@@ -423,15 +589,97 @@ class HordeQt(QMainWindow):
                 f"{len(self.job_download_thread.queued_downloads)=} {self.api_thread.job_queue.qsize()=} {self.api_thread.current_requests.qsize()=}"
             )
 
+    def known_image_ids(self) -> Set[str]:
+        # Called from the rescan thread. Jobs still downloading or being deleted count, so their files aren't loaded as new ones.
+        return {
+            lj.id
+            for jobs in (
+                self.job_download_thread.completed_downloads,
+                self.job_download_thread.queued_downloads,
+                self.job_download_thread.queued_deletes,
+            )
+            for lj in list(jobs)
+        } | set(self.import_thread.pending_ids)
+
+    def on_images_missing(self, job_ids: List[str]):
+        ids = set(job_ids)
+        # Anything that's been moved or recompressed since the directory was listed is still there.
+        missing = [
+            lj
+            for lj in self.job_download_thread.completed_downloads
+            if lj.id in ids and not lj.path.exists()
+        ]
+        for lj in missing:
+            LOGGER.warning(f"Image {lj.path} is missing, removing it from the gallery")
+            self.job_download_thread.completed_downloads.remove(lj)
+            self.gallery_container.remove_job(lj.id)
+        self.image_index.remove_many(lj.id for lj in missing)
+
+    def on_images_imported(self, jobs: List[LocalJob]):
+        # The import and rescan threads have already added them to the image index.
+        known = {lj.id for lj in self.job_download_thread.completed_downloads}
+        new_jobs = [lj for lj in jobs if lj.id not in known]
+        self.job_download_thread.completed_downloads.extend(new_jobs)
+        self.gallery_container.add_jobs(new_jobs)
+
+    def on_import_finished(self):
+        if not self.import_thread.running:
+            # Stopped because the app is closing.
+            return
+        self.gallery_container.importProgressBar.hide()
+        self.show_info_toast(
+            "Import finished",
+            f"Imported {self.import_thread.n_imported} images"
+            + (
+                f", skipped {self.import_thread.n_skipped} without readable metadata"
+                if self.import_thread.n_skipped
+                else ""
+            ),
+        )
+
+    def on_image_dir_changed(self, _path: str):
+        self.rescan_timer.start()
+
+    def update_image_dir_watch(self):
+        path = str(SAVED_IMAGE_DIR_PATH)
+        if self.ui.watchImageDirCheckBox.isChecked():
+            if path not in self.image_dir_watcher.directories():
+                self.image_dir_watcher.addPath(path)
+        else:
+            self.image_dir_watcher.removePath(path)
+            self.rescan_timer.stop()
+
+    def on_image_layout_changed(self, layout: str):
+        set_target_layout(ImageLayout(layout))
+        if migration_pending():
+            self.show_info_toast(
+                "Moving images", f"Moving saved images to the {layout} layout"
+            )
+            self.layout_migration_thread.retarget()
+
+    def on_image_recompressed(self, lj: LocalJob, file_type: str):
+        if lj.file_type != file_type:
+            old_path = lj.path
+            # The new file is already in place, so the job can be repointed before the old file goes away.
+            lj.set_file_type(file_type)
+            old_path.unlink(missing_ok=True)
+        self.image_cache.remove_job(lj.id)
+        self.image_index.add(lj)
+
+    def on_layout_migration_done(self):
+        if self.layout_migration_thread.target_changed:
+            # Stopped part way for a new target, so move to that one now.
+            self.layout_migration_thread.start()
+        elif not migration_pending():
+            self.show_success_toast(
+                "Images moved", f"Saved images are now in the {target_layout()} layout"
+            )
+
     def add_image_to_gallery(self, lj: LocalJob):
-        image_widget = ImageWidget(lj)
-        if image_widget.valid:
-            image_widget.imageClicked.connect(lambda v: self.show_image_popup(v, lj))
-            self.gallery_container.m_layout.addWidget(image_widget)
-        return image_widget.valid
-
-    def show_image_popup(self, pixmap, lj):
-        popup = ImagePopup(pixmap, lj, self)
+        self.gallery_container.add_job(lj)
+
+    def show_image_popup(self, lj: LocalJob):
+        popup = ImagePopup(lj, self)
         self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, popup)
         popup.show()
 
@@ -442,18 +690,29 @@ class HordeQt(QMainWindow):
                 "Deleting image failed",
                 "Image path couldn't be found, can't delete image.",
             )
-        self.gallery_container.m_layout.delete_image(lj.id)
-        self.gallery_container.m_layout.updateGeometry()
+        self.gallery_container.remove_job(lj.id)
+        self.image_cache.remove_job(lj.id)
+        self.image_index.remove(lj.id)
         self.job_download_thread.delete_image(lj)
 
-    def on_fully_loaded(self):
-        LOGGER.info("Fully loaded")
+    def on_resource_loaded(self, name: str):
+        if name not in self.waiting_to_generate:
+            return
+        self.waiting_to_generate.remove(name)
+        if not self.waiting_to_generate:
+            self.on_ready_to_generate()
+
+    def on_ready_to_generate(self):
+        LOGGER.info("Ready to generate")
         self.ui.GenerateButton.setEnabled(True)
         self.ui.modelComboBox.setEnabled(True)
         # this doesn't feel right, for some reason.
         self.ui.maxJobsSpinBox.setMaximum(self.ui.maxConcurrencySpinBox.value())
         LOGGER.debug("Loading kudos preview after 200 ms")
         QTimer.singleShot(200, self.update_kudos_preview)
+
+    def on_fully_loaded(self):
+        LOGGER.info("Fully loaded")
         LOGGER.debug("Hiding progress bar after 500 ms")
         QTimer.singleShot(500, self.ui.progressBar.hide)
         LOGGER.debug("Starting save thread after 750 ms")
@@ -758,61 +1017,77 @@ class HordeQt(QMainWindow):
             images,
         )
 
+    @property
+    def style_library(self) -> StyleLibrary:
+        """The style library, for the style browser and viewer. They can only be opened once the styles have loaded."""
+        if self.styleLibrary is None:
+            raise RuntimeError("Styles haven't loaded yet")
+        return self.styleLibrary
+
     def construct_style_info(self, styles: List[Style]):
+        # A second time if the cached styles were out of date.
+        if self.styleLibrary is not None:
+            user_styles = self.styleLibrary.get_user_styles()
+            self.styleLibrary.add_styles(styles)
+            self.styleLibrary.add_styles(user_styles)
+            return
         self.styleLibrary = StyleLibrary(styles=styles, parent=self)
         self.styleLibrary.add_styles(self.user_styles)
+        self.styleLibrary.previews = self.style_previews
         self.ui.StyleSelector.clicked.connect(lambda: StyleBrowser(self))
         self.ui.StyleSelector.setEnabled(True)
 
-    def construct_style_preview(self):
-        with open(self.loading_thread.style_preview_cache_path, "rt") as f:
-            self.styleLibrary.previews = json.load(f)
+    def construct_style_preview(self, previews: Dict[str, Dict[str, str]]):
+        # These can arrive before the styles.
+        self.style_previews = previews
+        if self.styleLibrary is not None:
+            self.styleLibrary.previews = previews
 
     def construct_model_dict(self, mod):
-        self.ui.modelComboBox.clear()
-
-        models: List[dict] = self.get_available_models()
-        models.sort(key=lambda k: k.get("count", 0), reverse=True)
-        model_dict: Dict[str, Model] = {}
-        for n in models:
-            name = n.get("name") or "Unknown"
-            self.ui.modelComboBox.addItem(name)
-            m = Model(
-                n.get("performance", 0),
-                n.get("queued", 0),
-                n.get("jobs", 0),
-                n.get("eta", 0),
-                "image",
-                name,
-                n.get("count", 1),
-                n.get("details", {}),
-            )
-            try:
-                m.details = mod[m.name]
-            except KeyError:
-                if m.name not in self.warned_models:
-                    self.show_warn_toast(
-                        "Unknown Model",
-                        f"{m.name} is not on the official model list. This may be a custom model, or may be an extremely new model.",
-                    )
-                    m.details = {}
-                    self.warned_models.append(m.name)
-                else:
-                    LOGGER.warning(
-                        f"Unknown model {m.name} is already known, not warning user."
-                    )
-            model_dict[name] = m
-        self.ui.modelComboBox.setCurrentIndex(0)
-        self.model_dict = model_dict
+        self.model_reference = mod
+        self.update_models()
+
+    def on_model_status(self, status: List[dict]):
+        self.model_status = status
+        self.update_models()
 
-    def get_available_models(self) -> List[dict]:
-        # TODO: move to separate thread
-        r = requests.get(
-            BASE_URL + "status/models",
-            params={"type": "image", "min_count": 1, "model_state": "all"},
+    def update_models(self):
+        # Needs both the reference and the status, which arrive separately.
+        if self.model_reference is None or self.model_status is None:
+            return
+        for s in self.model_status:
+            name = s.get("name") or "Unknown"
+            if name in self.model_dict or name in self.model_reference:
+                continue
+            if name not in self.warned_models:
+                self.show_warn_toast(
+                    "Unknown Model",
+                    f"{name} is not on the official model list. This may be a custom model, or may be an extremely new model.",
+                )
+                self.warned_models.append(name)
+                self.mark_dirty(SaveSection.SETTINGS)
+            else:
+                LOGGER.warning(
+                    f"Unknown model {name} is already known, not warning user."
+                )
+        self.model_dict = apply_status(
+            self.model_dict, self.model_status, self.model_reference
         )
-        r.raise_for_status()
-        return r.json()
+        combo = self.ui.modelComboBox
+        names = list(self.model_dict)
+        # Don't reorder the list under the user while it's open, the next refresh will.
+        if names != [combo.itemText(i) for i in range(combo.count())] and (
+            not combo.view().isVisible()
+        ):
+            # Before the first list, the model is the one from the saved job config.
+            current = combo.currentText() or self.savedData.job_config.get("model", "")
+            with QSignalBlocker(combo):
+                combo.clear()
+                combo.addItems(names)
+                combo.setCurrentIndex(max(0, combo.findText(current)))
+            if combo.currentText() != current:
+                self.mark_dirty(SaveSection.SETTINGS)
+        self.on_resource_loaded("models")
 
     def on_model_open_click(self):
         curr_model = self.model_dict[self.ui.modelComboBox.currentText()]
@@ -954,6 +1229,22 @@ class HordeQt(QMainWindow):
         table.resizeColumnsToContents()
         table.setSortingEnabled(True)
 
+    def history_window(self) -> HistoryWindow:
+        return HistoryWindow(
+            self.ui.historyCountSpinBox.value(),
+            self.ui.historyAgeSpinBox.value() * 60 * 60,
+        )
+
+    def apply_history(self):
+        history = self.history_window()
+        self.api_thread.set_history(history)
+        # Saved images keep their full job only while they're among the most recently used. A floor, so a page of search results isn't read again on every use.
+        set_loaded_limit(max(history.count, 100))
+
+    def on_history_changed(self, *_):
+        self.apply_history()
+        self.update_inprogess_table()
+
     def update_inprogess_table(self):
         table = self.ui.inProgressItemsTable
         table.setUpdatesEnabled(True)
@@ -984,35 +1275,48 @@ class HordeQt(QMainWindow):
         update_table_with_jobs(
             {job.job_id: job for job in self.api_thread.job_queue.queue}, "Queued"
         )
-        update_table_with_jobs(
-            {job.job_id: job for job in self.api_thread.errored_jobs}, "Errored"
+        history = self.history_window()
+        errored = history.keep(
+            self.api_thread.errored_jobs, attrgetter("creation_time")
         )
+        update_table_with_jobs({job.job_id: job for job in errored}, "Errored")
         update_table_with_jobs(
             {job_id: job for _, job_id, job in self.api_thread.current_requests.queue},
             "In Progress",
         )
 
         show_done_images = self.ui.showDoneImagesCheckbox.isChecked()
+        done = (
+            history.keep(
+                self.job_download_thread.completed_downloads,
+                attrgetter("completed_at"),
+            )
+            if show_done_images
+            else []
+        )
 
-        # Clear the table if necessary
-        if not show_done_images:
-            # Optionally remove all "Done" rows if we don't want to show them
-            for row in range(table.rowCount() - 1, -1, -1):  # Traverse in reverse
-                status_item = table.item(row, 1)
-                if status_item and status_item.text() == "Done":
-                    table.removeRow(row)
-
-        for lj in self.job_download_thread.completed_downloads:
-            if show_done_images:
-                row = find_or_insert_row(lj.id)
-                self.update_row(
-                    row,
-                    lj.id,
-                    "Done",
-                    lj.original.prompt,
-                    lj.original.model,
-                    lj.completed_at - time.time(),
-                )
+        # Remove finished rows that have left the history, or all "Done" rows if we don't want to show them
+        shown = {"Done": {lj.id for lj in done}, "Errored": {j.job_id for j in errored}}
+        for row in range(table.rowCount() - 1, -1, -1):  # Traverse in reverse
+            id_item, status_item = table.item(row, 0), table.item(row, 1)
+            if (
+                id_item
+                and status_item
+                and status_item.text() in shown
+                and id_item.text() not in shown[status_item.text()]
+            ):
+                table.removeRow(row)
+
+        for lj in done:
+            row = find_or_insert_row(lj.id)
+            self.update_row(
+                row,
+                lj.id,
+                "Done",
+                lj.summary.prompt,
+                lj.summary.model or "",
+                lj.completed_at - time.time(),
+            )
 
     def clear_cache(self):
         if CACHE_PATH.exists():
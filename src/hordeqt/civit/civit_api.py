@@ -1,3 +1,4 @@
+import weakref
 from dataclasses import dataclass
 from typing import Dict, List, Optional
 
@@ -174,6 +175,13 @@ class ModelVersionImage:
         }
 
 
+# Every ModelVersion in use, by id, so one that's loaded again (another search, a saved LoRA, a job) is the same object.
+# A version's files and images don't change once it's published, so the first copy loaded is kept while anything uses it.
+_model_versions: "weakref.WeakValueDictionary[int, ModelVersion]" = (
+    weakref.WeakValueDictionary()
+)
+
+
 class ModelVersion:
     def __init__(
         self,
@@ -210,8 +218,21 @@ class ModelVersion:
             "downloadURL": self.downloadURL,
         }
 
+    @staticmethod
+    def get(id: int) -> Optional["ModelVersion"]:
+        """The version with this id, if one has been loaded and is still in use."""
+        return _model_versions.get(id)
+
+    def intern(self) -> "ModelVersion":
+        # Versions from missing data all have id 0, they aren't the same version.
+        if self.id <= 0:
+            return self
+        return _model_versions.setdefault(self.id, self)
+
     @staticmethod
     def deserialize(data: dict):
+        if (known := _model_versions.get(data.get("id", 0))) is not None:
+            return known
         return ModelVersion(
             id=data.get("id", 0),
             name=data.get("name", ""),
@@ -226,7 +247,7 @@ class ModelVersion:
                 ModelVersionImage.deserialize(image) for image in data.get("images", {})
             ],
             downloadURL=data.get("downloadURL", ""),
-        )
+        ).intern()
 
 
 @dataclass
@@ -0,0 +1,95 @@
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+from PIL import Image
+from PySide6.QtGui import QPixmap
+
+from hordeqt.other.consts import LOGGER
+from hordeqt.other.thumbnail_cache import load_thumbnail_image
+
+# (job id, thumbnail size) for a decoded thumbnail, (job id, thumbnail size, width) for a copy smoothly scaled to width.
+CacheKey = Union[Tuple[str, int], Tuple[str, int, int]]
+
+
+class ImageCache:
+    """LRU of decoded images, bounded by how much memory the pixels take up.
+
+    Only used from the GUI thread, as it holds QPixmaps.
+    """
+
+    def __init__(self, budget: int) -> None:
+        self.budget = budget
+        self.entries: OrderedDict[CacheKey, QPixmap] = OrderedDict()
+        # Only one scaled copy of each thumbnail is kept, the width it's at. Otherwise resizing the window leaves a copy at every width it went through.
+        self.scaled_widths: Dict[Tuple[str, int], int] = {}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def cost(pixmap: QPixmap) -> int:
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+    def get(self, key: CacheKey) -> Optional[QPixmap]:
+        pixmap = self.entries.get(key)
+        if pixmap is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return pixmap
+
+    def touch(self, key: CacheKey):
+        # Marks an entry as recently viewed without counting it as a lookup.
+        if key in self.entries:
+            self.entries.move_to_end(key)
+
+    def put(self, key: CacheKey, pixmap: QPixmap):
+        if (old := self.entries.pop(key, None)) is not None:
+            self.size -= self.cost(old)
+        if len(key) == 3:
+            job_key = (key[0], key[1])
+            old_width = self.scaled_widths.get(job_key)
+            if old_width is not None and old_width != key[2]:
+                self._pop((*job_key, old_width))
+            self.scaled_widths[job_key] = key[2]
+        self.entries[key] = pixmap
+        self.size += self.cost(pixmap)
+        self._evict()
+
+    def get_or_load(self, key: CacheKey, path: Path) -> QPixmap:
+        """Get an image, decoding it on the calling thread if it isn't cached. Returns a null pixmap if it can't be read."""
+        if (pixmap := self.get(key)) is not None:
+            return pixmap
+        try:
+            pixmap = QPixmap.fromImage(load_thumbnail_image(path, key[1]))
+        except (Image.UnidentifiedImageError, OSError) as e:
+            LOGGER.warning(f'Couldn\'t decode "{path}": {e}')
+            return QPixmap()
+        self.put(key, pixmap)
+        return pixmap
+
+    def remove_job(self, job_id: str):
+        for key in [k for k in self.entries if k[0] == job_id]:
+            self._pop(key)
+
+    def _pop(self, key: CacheKey):
+        if (pixmap := self.entries.pop(key, None)) is None:
+            return
+        self.size -= self.cost(pixmap)
+        if len(key) == 3 and self.scaled_widths.get((key[0], key[1])) == key[2]:
+            del self.scaled_widths[(key[0], key[1])]
+
+    def set_budget(self, budget: int):
+        self.budget = budget
+        self._evict()
+
+    def _evict(self):
+        while self.size > self.budget and self.entries:
+            self._pop(next(iter(self.entries)))
+            self.evictions += 1
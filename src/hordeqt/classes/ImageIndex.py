@@ -0,0 +1,308 @@
+import json
+import os
+import sqlite3
+import threading
+from functools import partial
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from PIL import Image
+
+from hordeqt.classes.Job import Job
+from hordeqt.classes.LocalJob import JobSummary, LocalJob
+from hordeqt.other.consts import LOGGER, SAVED_DB_PATH
+
+# (bytes, mtime_ns, inode) of a file, if any of them change the file is scanned again.
+FileStamp = Tuple[int, int, int]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    id TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    file_type TEXT NOT NULL,
+    width INTEGER,
+    height INTEGER,
+    bytes INTEGER NOT NULL,
+    model TEXT,
+    worker_id TEXT,
+    worker_name TEXT,
+    seed TEXT,
+    prompt TEXT,
+    created_at REAL,
+    completed_at REAL,
+    job TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS images_completed_at ON images(completed_at);
+CREATE INDEX IF NOT EXISTS images_bytes ON images(bytes);
+CREATE INDEX IF NOT EXISTS images_area ON images(width * height);
+CREATE INDEX IF NOT EXISTS images_model ON images(model COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS images_worker_name ON images(worker_name COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS image_hashes (
+    id TEXT PRIMARY KEY,
+    bytes INTEGER NOT NULL,
+    phash INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS image_files (
+    name TEXT PRIMARY KEY,
+    bytes INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    job_id TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS image_search USING fts5(
+    id UNINDEXED, prompt, negative_prompt, model, loras, prefix='2 3'
+);
+"""
+
+
+def _image_row(lj: LocalJob) -> Tuple:
+    try:
+        size = os.stat(lj.path).st_size
+        # Opening only reads the header, the pixels aren't decoded.
+        with Image.open(lj.path) as im:
+            width, height = im.size
+    except (OSError, Image.UnidentifiedImageError):
+        size = 0
+        width, height = lj.original.width, lj.original.height
+    job = lj.original
+    return (
+        lj.id,
+        str(lj.path),
+        lj.file_type,
+        width,
+        height,
+        size,
+        job.model,
+        lj.worker_id,
+        lj.worker_name,
+        str(job.seed),
+        job.prompt,
+        job.creation_time,
+        lj.completed_at,
+        json.dumps(lj.serialize()),
+    )
+
+
+def _search_row(lj: LocalJob) -> Tuple:
+    prompt, _, negative_prompt = lj.original.prompt.partition("###")
+    loras = " ".join(lora.name for lora in (lj.original.loras or []))
+    return (lj.id, prompt, negative_prompt, lj.original.model, loras)
+
+
+# Jobs are read back when something needs one, from whichever thread that is, so they can't use the index's connection. Each thread keeps its own.
+_readers = threading.local()
+
+
+def _reader(path: Path) -> sqlite3.Connection:
+    conns: Dict[Path, sqlite3.Connection] = _readers.__dict__.setdefault("conns", {})
+    if (conn := conns.get(path)) is None:
+        conn = conns[path] = sqlite3.connect(path)
+    return conn
+
+
+def _read_job(path: Path, job_id: str) -> Job:
+    try:
+        row = (
+            _reader(path)
+            .execute("SELECT job FROM images WHERE id = ?", (job_id,))
+            .fetchone()
+        )
+    except sqlite3.Error as e:
+        raise ValueError(e) from e
+    if row is None:
+        raise KeyError(job_id)
+    return Job.deserialize(json.loads(row[0]).get("original", {}))
+
+
+def _to_signed(h: int) -> int:
+    # SQLite integers are signed 64 bit.
+    return h - (1 << 64) if h >= (1 << 63) else h
+
+
+def _match_query(text: str) -> str:
+    # Every word has to match, as a prefix. Quoting each one keeps FTS5 syntax in the search text from doing anything.
+    return " ".join('"' + word.replace('"', '""') + '"*' for word in text.split())
+
+
+class ImageIndex:
+    """SQLite index of the saved images, keyed by LocalJob.id.
+
+    Each row has the serialized LocalJob, plus the columns that the gallery sorts and the local stats need, so those are single queries.
+    """
+
+    def __init__(self, path: Path = SAVED_DB_PATH) -> None:
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self.conn.commit()
+        (searchable,) = self.conn.execute(
+            "SELECT COUNT(*) FROM image_search"
+        ).fetchone()
+        if searchable != len(self):
+            self._rebuild_search()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM images").fetchone()[0]
+
+    def add(self, lj: LocalJob):
+        self.add_many([lj])
+
+    def add_many(self, jobs: Iterable[LocalJob]):
+        jobs = list(jobs)
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (_image_row(lj) for lj in jobs),
+            )
+            self.conn.executemany(
+                "DELETE FROM image_search WHERE id = ?", ((lj.id,) for lj in jobs)
+            )
+            self.conn.executemany(
+                "INSERT INTO image_search VALUES (?, ?, ?, ?, ?)",
+                (_search_row(lj) for lj in jobs),
+            )
+
+    def remove(self, job_id: str):
+        self.remove_many([job_id])
+
+    def remove_many(self, job_ids: Iterable[str]):
+        ids = [(job_id,) for job_id in job_ids]
+        with self.conn:
+            self.conn.executemany("DELETE FROM images WHERE id = ?", ids)
+            self.conn.executemany("DELETE FROM image_search WHERE id = ?", ids)
+            self.conn.executemany("DELETE FROM image_hashes WHERE id = ?", ids)
+
+    def update_paths(self, paths: Iterable[Tuple[str, Path]]):
+        """Store (id, path) after files have moved. The serialized job doesn't need it, LocalJob.update_path finds the file."""
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE images SET path = ? WHERE id = ?",
+                ((str(path), job_id) for job_id, path in paths),
+            )
+
+    def search(self, text: str) -> List[str]:
+        """Ids of the images whose prompt, negative prompt, model or LoRAs match every word in text, best match first."""
+        if not (query := _match_query(text)):
+            return []
+        return [
+            row[0]
+            for row in self.conn.execute(
+                "SELECT id FROM image_search WHERE image_search MATCH ? ORDER BY rank",
+                (query,),
+            )
+        ]
+
+    def unhashed_images(self) -> List[Tuple[str, str, int]]:
+        """(id, path, bytes) of images with no perceptual hash, or one from before the file last changed size."""
+        return self.conn.execute(
+            "SELECT images.id, images.path, images.bytes FROM images"
+            " LEFT JOIN image_hashes ON image_hashes.id = images.id"
+            " WHERE image_hashes.id IS NULL OR image_hashes.bytes != images.bytes"
+        ).fetchall()
+
+    def set_hashes(self, hashes: Iterable[Tuple[str, int, int]]):
+        """Store (id, bytes, phash) rows."""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO image_hashes VALUES (?, ?, ?)",
+                ((job_id, size, _to_signed(h)) for job_id, size, h in hashes),
+            )
+
+    def hashes(self) -> Dict[str, int]:
+        return {
+            job_id: h & ((1 << 64) - 1)
+            for job_id, h in self.conn.execute(
+                "SELECT image_hashes.id, phash FROM image_hashes"
+                " JOIN images ON images.id = image_hashes.id"
+            )
+        }
+
+    def scanned_files(self) -> Dict[str, Tuple[FileStamp, Optional[str]]]:
+        """Files in the image directory that have been scanned, as name -> (stamp, job id or None if it couldn't be loaded)."""
+        return {
+            name: ((size, mtime_ns, inode), job_id)
+            for name, size, mtime_ns, inode, job_id in self.conn.execute(
+                "SELECT name, bytes, mtime_ns, inode, job_id FROM image_files"
+            )
+        }
+
+    def set_scanned_files(self, files: Iterable[Tuple[str, FileStamp, Optional[str]]]):
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO image_files VALUES (?, ?, ?, ?, ?)",
+                ((name, *stamp, job_id) for name, stamp, job_id in files),
+            )
+
+    def forget_scanned_files(self, names: Iterable[str]):
+        with self.conn:
+            self.conn.executemany(
+                "DELETE FROM image_files WHERE name = ?", ((n,) for n in names)
+            )
+
+    def _rebuild_search(self):
+        LOGGER.info("Rebuilding image search index")
+        rows = []
+        for job_id, job in self.conn.execute("SELECT id, job FROM images"):
+            try:
+                rows.append(_search_row(LocalJob.deserialize(json.loads(job))))
+            except (ValueError, TypeError, KeyError) as e:
+                LOGGER.warning(f"Couldn't load {job_id} from the image index: {e}")
+        with self.conn:
+            self.conn.execute("DELETE FROM image_search")
+            self.conn.executemany(
+                "INSERT INTO image_search VALUES (?, ?, ?, ?, ?)", rows
+            )
+
+    def load_jobs(self) -> List[LocalJob]:
+        """Every image, oldest first. Only the columns are read, each Job is read from the index the first time something uses it."""
+        return [
+            LocalJob.lazy(
+                job_id,
+                JobSummary(model, width, height, seed, prompt, bool(nsfw)),
+                partial(_read_job, self.path, job_id),
+                file_type,
+                completed_at,
+                worker_name,
+                worker_id,
+            )
+            for (
+                job_id,
+                file_type,
+                width,
+                height,
+                model,
+                worker_id,
+                worker_name,
+                seed,
+                prompt,
+                completed_at,
+                nsfw,
+            ) in self.conn.execute(
+                "SELECT id, file_type, width, height, model, worker_id, worker_name, seed, prompt, completed_at,"
+                # A broken job would make json_extract fail the whole query, it's logged when that job is loaded instead.
+                " CASE WHEN json_valid(job) THEN json_extract(job, '$.original.nsfw') END"
+                " FROM images ORDER BY completed_at"
+            )
+        ]
+
+    def file_sizes(self) -> Dict[str, int]:
+        return dict(self.conn.execute("SELECT id, bytes FROM images"))
+
+    def total_bytes(self) -> int:
+        total = self.conn.execute("SELECT TOTAL(bytes) FROM images").fetchone()[0]
+        return int(total)
+
+    def largest(self) -> Optional[Tuple[str, int]]:
+        return self.conn.execute(
+            "SELECT path, bytes FROM images ORDER BY bytes DESC LIMIT 1"
+        ).fetchone()
+
+    def smallest(self) -> Optional[Tuple[str, int]]:
+        return self.conn.execute(
+            "SELECT path, bytes FROM images ORDER BY bytes ASC LIMIT 1"
+        ).fetchone()
+
+    def close(self):
+        self.conn.close()
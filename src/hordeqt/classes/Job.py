@@ -4,10 +4,47 @@ from typing import Dict, List, Optional, Self
 
 from hordeqt.classes.LoRA import LoRA
 from hordeqt.other.consts import UPSCALE_MAP
-from hordeqt.other.util import create_uuid
+from hordeqt.other.util import create_uuid, intern_str
+
+# The attributes to_json reads, setting any of them drops its memoized result.
+_JSON_FIELDS = frozenset(
+    (
+        "prompt",
+        "sampler_name",
+        "cfg_scale",
+        "seed",
+        "height",
+        "width",
+        "upscale",
+        "karras",
+        "hires_fix",
+        "clip_skip",
+        "steps",
+        "loras",
+        "allow_nsfw",
+        "model",
+        "share_image",
+        "dry_run",
+    )
+)
 
 
 class Job:
+    # Tens of thousands of these can be alive at once, slots keep each one small.
+    __slots__ = (
+        *_JSON_FIELDS,
+        "job_id",
+        "horde_job_id",
+        "wait_time",
+        "queue_position",
+        "done",
+        "faulted",
+        "kudos",
+        "creation_time",
+        "mod_time",
+        "_json",
+    )
+
     def __init__(
         self,
         prompt: str,
@@ -33,7 +70,7 @@ class Job:
         loras: List[LoRA] = [],
     ):
         self.prompt = prompt
-        self.sampler_name = sampler_name
+        self.sampler_name = intern_str(sampler_name)
         self.cfg_scale = cfg_scale
         self.seed = seed
         self.width = width
@@ -42,7 +79,7 @@ class Job:
         self.hires_fix = hires_fix
         self.clip_skip = clip_skip
         self.steps = steps
-        self.model = model
+        self.model = intern_str(model)
         self.allow_nsfw = allow_nsfw
         self.share_image = share_image
         self.dry_run = False
@@ -85,6 +122,32 @@ class Job:
         }
 
     def to_json(self) -> Dict:
+        # Jobs in the queues are serialized on every autosave. Finished ones are serialized about once and then kept for the whole session, so they don't keep a copy.
+        if self.done or self.faulted:
+            return self._build_json()
+        if self._json is None:
+            self._json = self._build_json()
+        # Callers change what they get (serialize adds to it), so every level is copied.
+        # LoRAs are always built fresh, the list can be changed in place without going through __setattr__.
+        j = self._json
+        params = j["params"]
+        return {
+            **j,
+            "params": {
+                **params,
+                "post_processing": list(params["post_processing"]),
+                "loras": self._loras_json(),
+            },
+            "models": list(j["models"]),
+        }
+
+    def _loras_json(self) -> List[Dict]:
+        return [
+            lora.to_job_format()
+            for lora in (self.loras if self.loras is not None else [])
+        ]
+
+    def _build_json(self) -> Dict:
         return {
             "prompt": self.prompt,
             "params": {
@@ -101,10 +164,7 @@ class Job:
                 "clip_skip": self.clip_skip,
                 "steps": self.steps,
                 "n": 1,
-                "loras": [
-                    lora.to_job_format()
-                    for lora in (self.loras if self.loras is not None else [])
-                ],
+                "loras": self._loras_json(),
             },
             "nsfw": self.allow_nsfw,
             "trusted_workers": False,
@@ -118,6 +178,11 @@ class Job:
             "dry_run": self.dry_run,
         }
 
+    def __setattr__(self, name: str, value) -> None:
+        object.__setattr__(self, name, value)
+        if name in _JSON_FIELDS:
+            object.__setattr__(self, "_json", None)
+
     def __str__(self) -> str:
         return json.dumps({"ser": self.serialize(), "tj": self.to_json()})
 
@@ -4,7 +4,7 @@ from typing import Optional, Self
 from hordeqt.civit.civit_api import ModelVersion
 
 
-@dataclass
+@dataclass(slots=True)
 class LoRA:
     name: str
     version_id: int
@@ -51,32 +51,34 @@ class LoRA:
             clip_strength=v.get("clip", 1),
             is_version=v.get("is_version"),
             inject_trigger=v.get("inject_trigger", None),
-            model_version=None,
+            model_version=ModelVersion.get(int(k)),
         )
 
     def serialize(self) -> dict:
-        if self.model_version is not None:
-            mv = self.model_version.serialize()
-        else:
-            mv = {}
+        # The model version is only referenced by id, it's the same for every LoRA using it.
         return {
             "name": self.name,
             "id": self.version_id,
             "strength": self.strength,
             "clip_strength": self.clip_strength,
             "inject_trigger": self.inject_trigger,
-            "model_version": mv,
             "is_version": self.is_version,
         }
 
     @classmethod
     def deserialize(cls, val: dict) -> Self:
+        version_id = val.get("id", -1)
+        # Older saves have the whole model version in every LoRA.
+        if mv := val.get("model_version"):
+            model_version = ModelVersion.deserialize(mv)
+        else:
+            model_version = ModelVersion.get(version_id)
         return cls(
             val.get("name", ""),
-            val.get("id", -1),
+            version_id,
             val.get("strength", 1),
             val.get("clip_strength", 1),
-            ModelVersion.deserialize(val.get("model_version", {})),
+            model_version,
             val.get("inject_trigger", None),
             val.get("is_version", None),
         )
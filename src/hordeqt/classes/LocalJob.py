@@ -1,20 +1,72 @@
 import json
+import threading
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Mapping, Optional, Self
+from typing import Callable, Mapping, Optional, Self
 
 from PIL import ExifTags, Image
 
 from hordeqt.classes.Job import Job
-from hordeqt.other.consts import SAVED_IMAGE_DIR_PATH
+from hordeqt.other.consts import LOGGER
+from hordeqt.other.image_layout import locate_image
+from hordeqt.other.util import intern_str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
+class JobSummary:
+    """What the gallery sorts, filters and lays out a finished job by. The image index has all of it as columns."""
+
+    model: Optional[str]
+    width: int
+    height: int
+    seed: str
+    prompt: str
+    nsfw: bool
+
+    @classmethod
+    def from_job(cls, job: Job) -> Self:
+        return cls(
+            job.model,
+            job.width,
+            job.height,
+            str(job.seed),
+            job.prompt,
+            bool(job.allow_nsfw),
+        )
+
+
+# Lazy jobs whose Job is loaded, least recently used first. Past the limit, the oldest is dropped and read again if it's needed.
+_loaded: "OrderedDict[str, LocalJob]" = OrderedDict()
+_loaded_lock = threading.Lock()
+_loaded_limit = 200
+
+
+def set_loaded_limit(limit: int):
+    """How many lazy jobs keep their Job loaded at once."""
+    global _loaded_limit
+    with _loaded_lock:
+        _loaded_limit = limit
+        _evict()
+
+
+def _evict():
+    while len(_loaded) > _loaded_limit:
+        _, lj = _loaded.popitem(last=False)
+        lj._original = None
+
+
+# Slots, since every saved image has one of these for as long as the app is open.
+@dataclass(slots=True)
 class LocalJob:
     id: str
-    path: Path
-    original: Job
+    # Worked out when first used, so loading a job doesn't build a Path (or look on disk mid-move) for it.
+    _path: Optional[Path]
+    _original: Optional[Job]
+    _summary: Optional[JobSummary]
+    # Builds original for jobs loaded lazily, until something needs it.
+    _load_original: Optional[Callable[[], Job]]
     file_type: str
     downloadURL: str
     completed_at: float
@@ -55,11 +107,86 @@ class LocalJob:
     ) -> None:
         self.id = job.job_id
         self.original = job
-        self.file_type = file_type
-        self.worker_name = worker_name
-        self.worker_id = worker_id
+        self.file_type = intern_str(file_type)
+        self.worker_name = intern_str(worker_name)
+        self.worker_id = intern_str(worker_id)
         self.completed_at = time.time()
-        self.update_path()
+        self._path = None
+
+    @classmethod
+    def lazy(
+        cls,
+        job_id: str,
+        summary: JobSummary,
+        load_original: Callable[[], Job],
+        file_type: str = "webp",
+        completed_at: Optional[float] = None,
+        worker_name="Unknown",
+        worker_id="00000000-0000-0000-0000-000000000000",
+    ) -> Self:
+        """A LocalJob whose Job isn't built until original is used, for loading a whole library quickly."""
+        lj = cls.__new__(cls)
+        lj.id = job_id
+        lj._original = None
+        lj._summary = summary
+        lj._load_original = load_original
+        lj.file_type = intern_str(file_type)
+        lj.worker_name = intern_str(worker_name)
+        lj.worker_id = intern_str(worker_id)
+        lj.completed_at = time.time() if completed_at is None else completed_at
+        lj._path = None
+        return lj
+
+    @property
+    def original(self) -> Job:
+        job = self._original
+        if job is None:
+            job = self._original = self._hydrate()
+        if self._load_original is not None:
+            with _loaded_lock:
+                _loaded[self.id] = self
+                _loaded.move_to_end(self.id)
+                _evict()
+        return job
+
+    @original.setter
+    def original(self, job: Job):
+        self._original = job
+        self._summary = None
+        self._load_original = None
+        with _loaded_lock:
+            _loaded.pop(self.id, None)
+
+    @property
+    def summary(self) -> JobSummary:
+        if self._summary is None:
+            self._summary = JobSummary.from_job(self.original)
+        return self._summary
+
+    def _hydrate(self) -> Job:
+        assert self._load_original is not None
+        try:
+            job = self._load_original()
+        except (ValueError, TypeError, KeyError) as e:
+            # The summary is all that's left, which is what images without full metadata have anyway.
+            LOGGER.warning(f"Couldn't load the job for {self.id}: {e}")
+            s = self.summary
+            job = Job(
+                prompt=s.prompt,
+                sampler_name=None,  # type: ignore
+                cfg_scale=None,  # type: ignore
+                seed=s.seed,
+                width=s.width,
+                height=s.height,
+                clip_skip=None,  # type: ignore
+                steps=None,  # type: ignore
+                model=s.model,  # type: ignore
+                allow_nsfw=s.nsfw,
+            )
+            job.job_id = self.id
+            # Trying again won't go any better, so keep this one.
+            self._load_original = None
+        return job
 
     def pretty_format(self) -> str:
         _prompt = self.original.prompt
@@ -84,8 +211,31 @@ class LocalJob:
         ]
         return "\n".join(b)
 
+    @property
+    def aspect_ratio(self) -> float:
+        try:
+            return float(self.summary.width) / float(self.summary.height)
+        except (TypeError, ValueError, ZeroDivisionError):
+            return 1.0
+
+    @property
+    def path(self) -> Path:
+        if self._path is None:
+            self.update_path()
+        return self._path  # type: ignore
+
+    @path.setter
+    def path(self, path: Path):
+        self._path = path
+
     def update_path(self):
-        self.path = (SAVED_IMAGE_DIR_PATH / self.id).with_suffix("." + self.file_type)
+        self._path = locate_image(self.id, self.file_type)
+
+    def set_file_type(self, file_type: str):
+        # The path is derived from the file type, so they always need to change together.
+        # Only the suffix changes, the file stays in whichever directory it's in.
+        path = self.path.with_suffix("." + file_type)
+        self.file_type, self.path = file_type, path
 
     def serialize(self) -> dict:
         return {
@@ -103,10 +253,11 @@ class LocalJob:
         job = value.get("original", {})
         lj = cls(Job.deserialize(job))
         lj.completed_at = value.get("completed_at", time.time())
-        lj.worker_name = value.get("worker_name", "Unknown")
-        lj.worker_id = value.get("worker_id", "00000000-0000-0000-0000-000000000000")
-        lj.file_type = value.get("fileType", "webp")
-        lj.update_path()
+        lj.worker_name = intern_str(value.get("worker_name", "Unknown"))
+        lj.worker_id = intern_str(
+            value.get("worker_id", "00000000-0000-0000-0000-000000000000")
+        )
+        lj.file_type = intern_str(value.get("fileType", "webp"))
         return lj
 
 
@@ -121,6 +272,10 @@ def apply_metadata_to_image(path: Path, lj: LocalJob) -> Path:
     return lj.path
 
 
-def read_metadata_from_image(path: Path):
-    # TODO: Implement
-    pass
+def read_metadata_from_image(path: Path) -> Optional[LocalJob]:
+    """Load a LocalJob from the generation metadata in an image, from any format format_loader knows. Only the header is read."""
+    # format_loader creates LocalJobs, so it can't be imported at the top.
+    from hordeqt.other.format_loader import get_local_job
+
+    with Image.open(path) as im:
+        return get_local_job(im)
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Dict, List
 
 
 @dataclass
@@ -11,3 +12,39 @@ class Model:
     name: str
     count: int
     details: dict
+
+    @classmethod
+    def from_status(cls, status: dict, details: dict) -> "Model":
+        return cls(
+            status.get("performance", 0),
+            status.get("queued", 0),
+            status.get("jobs", 0),
+            status.get("eta", 0),
+            "image",
+            status.get("name") or "Unknown",
+            status.get("count", 1),
+            details,
+        )
+
+    def update_status(self, status: dict):
+        self.performance = status.get("performance", 0)
+        self.queued = status.get("queued", 0)
+        self.jobs = status.get("jobs", 0)
+        self.eta = status.get("eta", 0)
+        self.count = status.get("count", 1)
+
+
+def apply_status(
+    models: Dict[str, Model], status: List[dict], reference: dict
+) -> Dict[str, Model]:
+    """The models in status, most workers first. Ones already in models are updated in place, so anything holding on to them sees the new numbers."""
+    updated: Dict[str, Model] = {}
+    for s in sorted(status, key=lambda s: s.get("count", 0), reverse=True):
+        name = s.get("name") or "Unknown"
+        if (m := models.get(name)) is not None:
+            m.update_status(s)
+            m.details = reference.get(name, m.details)
+        else:
+            m = Model.from_status(s, reference.get(name, s.get("details", {})))
+        updated[name] = m
+    return updated
@@ -1,43 +1,175 @@
 import gzip
+import json
 import os
-from typing import Dict, List
+import sqlite3
+from contextlib import closing
+from enum import StrEnum
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 import jsonpickle
 
+from hordeqt.classes.ImageIndex import ImageIndex
+from hordeqt.classes.LocalJob import LocalJob
 from hordeqt.classes.Style import Style
-from hordeqt.other.consts import ISDEBUG, SAVED_DATA_DIR_PATH, SAVED_DATA_PATH
+from hordeqt.other.consts import (
+    LOGGER,
+    SAVED_DATA_DIR_PATH,
+    SAVED_DATA_PATH,
+    SAVED_DB_PATH,
+)
+from hordeqt.other.image_layout import target_layout
+from hordeqt.other.save_codec import (
+    JOB,
+    LOCAL_JOB,
+    STYLE,
+    Compression,
+    Schema,
+    decode,
+    encode,
+    is_encoded,
+)
 from hordeqt.threads.etc_download_thread import DownloadThread
 from hordeqt.threads.job_download_thread import JobDownloadThread
 from hordeqt.threads.job_manager_thread import JobManagerThread
 
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    queue TEXT NOT NULL,
+    id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (queue, id)
+);
+CREATE TABLE IF NOT EXISTS styles (
+    name TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS downloads (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+"""
+
+# Stored as one JSON value each in the settings table.
+_SETTINGS = (
+    "max_jobs",
+    "nsfw_allowed",
+    "save_metadata",
+    "job_config",
+    "share_images",
+    "current_open_tab",
+    "prefered_format",
+    "warned_models",
+    "show_done_images",
+    "notify_after_n",
+    "image_cache_mb",
+    "watch_image_dir",
+    "image_layout",
+    "history_count",
+    "history_max_age_hours",
+)
+
+# The JobManagerThread queues, they're stored in the jobs table along with the queued downloads.
+_API_QUEUES = ("current_requests", "job_queue", "completed_jobs", "errored_jobs")
+
+# Table name and key columns of the tables that hold one row per item, in order.
+_ORDERED_TABLES: Dict[str, Tuple[str, ...]] = {
+    "jobs": ("queue", "id"),
+    "styles": ("name",),
+    "downloads": ("id",),
+}
+
+# key -> (position, data). Rows from before the binary format are still text until rewritten.
+_Rows = Dict[Tuple, Tuple[int, bytes | str]]
+
+
+def _decode_row(data: bytes | str, decode_text: Callable[[str], Any] = json.loads):
+    # Rows written before the binary format are text, JSON or (for downloads) jsonpickle.
+    if is_encoded(data):
+        return decode(data)  # type: ignore
+    return decode_text(data)  # type: ignore
+
+
+class SaveSection(StrEnum):
+    """The parts of SavedData that can be updated and written on their own."""
+
+    SETTINGS = "settings"
+    JOBS = "jobs"
+    STYLES = "styles"
+    DOWNLOADS = "downloads"
+
+
+# Which ordered table each section writes.
+_SECTION_TABLES = {
+    SaveSection.JOBS: "jobs",
+    SaveSection.STYLES: "styles",
+    SaveSection.DOWNLOADS: "downloads",
+}
+
 
 class SavedData:
+    """Settings, job queues and user styles, stored in SQLite.
+
+    Every item is its own row, and write only touches the rows that changed since the last read or write. The saved images are in the ImageIndex, not here.
+    """
+
     api_state: Dict
     download_state: Dict
     current_open_tab: int
+    # Only set when migrating from the old save file, the images are in the ImageIndex.
     current_images: List[Dict]
-    finished_jobs: List[Dict]
+    queued_downloads: List[Dict]
     job_config: Dict
     max_jobs: int
     nsfw_allowed: bool
+    save_metadata: bool
     share_images: bool
     prefered_format: str
     warned_models: List[str]
     show_done_images: bool
     notify_after_n: int
     user_saved_styles: List[Dict]
+    image_cache_mb: int
+    watch_image_dir: bool
+    image_layout: str
+    history_count: int
+    history_max_age_hours: int
 
-    def __init__(self) -> None:
+    def __init__(
+        self, compression: Compression = Compression.ZLIB, level: Optional[int] = 1
+    ) -> None:
         os.makedirs(SAVED_DATA_DIR_PATH, exist_ok=True)
+        # Rows are small and every row of a section is encoded on each write, so a fast zlib level is the default.
+        self.compression = compression
+        self.level = level
+        # What's in the database, so unchanged rows aren't written again.
+        self._written_settings: Dict[str, str] = {}
+        self._written: Dict[str, _Rows] = {table: {} for table in _ORDERED_TABLES}
+
+    # The update_ methods take copies, so a section can be written on another thread while the app keeps going.
 
-    def update(
+    def update_jobs(self, api: JobManagerThread, dlthread: JobDownloadThread):
+        self.api_state = api.serialize()
+        # Completed downloads are saved to the ImageIndex as they finish.
+        self.queued_downloads = [x.serialize() for x in dlthread.queued_downloads]
+
+    def update_downloads(self, downloads: DownloadThread):
+        self.download_state = downloads.serialize()
+
+    def update_styles(self, user_saved_styles: List[Style]):
+        self.user_saved_styles = [uss.serialize() for uss in user_saved_styles]
+
+    def update_settings(
         self,
-        api: JobManagerThread,
         nsfw: bool,
         max_jobs: int,
         save_metadata: bool,
-        dlthread: JobDownloadThread,
-        downloads: DownloadThread,
         job_config: dict,
         share_images: bool,
         current_open_tab: int,
@@ -45,14 +177,12 @@ class SavedData:
         warned_models: List[str],
         show_done_images: bool,
         notify_after_n: int,
-        user_saved_styles: List[Style],
+        image_cache_mb: int,
+        watch_image_dir: bool,
+        image_layout: str,
+        history_count: int,
+        history_max_age_hours: int,
     ):
-        self.api_state = api.serialize()
-        self.current_images = (dlv := dlthread.serialize()).get(
-            ("completed_downloads"), []
-        )
-        self.queued_downloads = dlv.get(("queued_downloads"), [])
-        self.download_state = downloads.serialize()
         self.max_jobs = max_jobs
         self.nsfw_allowed = nsfw
         self.share_images = share_images
@@ -60,48 +190,167 @@ class SavedData:
         self.job_config = job_config
         self.current_open_tab = current_open_tab
         self.prefered_format = prefered_format
-        self.warned_models = warned_models
+        self.warned_models = list(warned_models)
         self.show_done_images = show_done_images
         self.notify_after_n = notify_after_n
-        self.user_saved_styles = [uss.serialize() for uss in user_saved_styles]
+        self.image_cache_mb = image_cache_mb
+        self.watch_image_dir = watch_image_dir
+        self.image_layout = image_layout
+        self.history_count = history_count
+        self.history_max_age_hours = history_max_age_hours
 
-    def write(self):
-        d = {
-            "api_state": self.api_state,
-            "max_jobs": self.max_jobs,
-            "nsfw_allowed": self.nsfw_allowed,
-            "save_metadata": self.save_metadata,
-            "current_images": self.current_images,
-            "queued_downloads": self.queued_downloads,
-            "job_config": self.job_config,
-            "share_images": self.share_images,
-            "current_open_tab": self.current_open_tab,
-            "prefered_format": self.prefered_format,
-            "warned_models": self.warned_models,
-            "download_state": self.download_state,
-            "show_done_images": self.show_done_images,
-            "notify_after_n": self.notify_after_n,
-            "user_saved_styles": self.user_saved_styles,
-        }
-        jsondata: str = jsonpickle.encode(d)  # type: ignore
-        with gzip.open(SAVED_DATA_PATH.with_suffix(".json.gz"), "wt") as f:
-            f.write(jsondata)
-        if ISDEBUG:
-            with open(SAVED_DATA_PATH.with_suffix(".readable.json"), "wt") as f:
-                f.write(jsonpickle.encode(d, indent=4) or "")
+    def _settings_rows(self) -> Dict[str, str]:
+        return {key: json.dumps(getattr(self, key)) for key in _SETTINGS}
+
+    def _encode(self, value: Any, schema: Optional[Schema] = None) -> bytes:
+        return encode(value, schema, self.compression, self.level)
+
+    def _ordered_rows(self, table: str) -> List[Tuple[Tuple, bytes]]:
+        if table == "styles":
+            return [
+                ((s["name"],), self._encode(s, STYLE)) for s in self.user_saved_styles
+            ]
+        if table == "downloads":
+            return [
+                ((dl_id,), self._encode([dl_id, req]))
+                for dl_id, req in self.download_state.get("queued_downloads", [])
+            ]
+        jobs = []
+        for queue in _API_QUEUES:
+            for item in self.api_state.get(queue, []):
+                # current_requests items are (priority, counter, job), the schema is used for the job.
+                job = item[2] if queue == "current_requests" else item
+                jobs.append(((queue, job["id"]), self._encode(item, JOB)))
+        for lj in self.queued_downloads:
+            jobs.append((("queued_downloads", lj["id"]), self._encode(lj, LOCAL_JOB)))
+        return jobs
+
+    def write(self, sections: Iterable[SaveSection] = tuple(SaveSection)):
+        """Write the given sections, as they were at their last update."""
+        sections = set(sections)
+        settings = self._settings_rows() if SaveSection.SETTINGS in sections else None
+        new_written: Dict[str, _Rows] = {}
+        with closing(sqlite3.connect(SAVED_DB_PATH)) as conn, conn:
+            conn.executescript(_SCHEMA)
+            if settings is not None:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO settings VALUES (?, ?)",
+                    [
+                        (k, v)
+                        for k, v in settings.items()
+                        if self._written_settings.get(k) != v
+                    ],
+                )
+            for section, table in _SECTION_TABLES.items():
+                if section in sections:
+                    new_written[table] = self._sync(
+                        conn, table, self._ordered_rows(table)
+                    )
+        # Only once the transaction has committed.
+        if settings is not None:
+            self._written_settings = settings
+        self._written.update(new_written)
+
+    def _sync(
+        self, conn: sqlite3.Connection, table: str, rows: List[Tuple[Tuple, bytes]]
+    ) -> _Rows:
+        key_columns = _ORDERED_TABLES[table]
+        old = self._written[table]
+        # Items keep their position, so removing one from the front of a queue doesn't rewrite the rest.
+        next_position = max((pos for pos, _ in old.values()), default=-1) + 1
+        new: _Rows = {}
+        upserts = []
+        for key, data in rows:
+            if key in old:
+                position, old_data = old[key]
+                if old_data != data:
+                    upserts.append((*key, position, data))
+            else:
+                position = next_position
+                next_position += 1
+                upserts.append((*key, position, data))
+            new[key] = (position, data)
+        placeholders = ", ".join("?" * (len(key_columns) + 2))
+        conn.executemany(
+            f"INSERT OR REPLACE INTO {table} VALUES ({placeholders})", upserts
+        )
+        where = " AND ".join(f"{c} = ?" for c in key_columns)
+        conn.executemany(
+            f"DELETE FROM {table} WHERE {where}", [k for k in old if k not in new]
+        )
+        return new
 
     def read(self):
-        if SAVED_DATA_PATH.with_suffix(".json.gz").exists():
-            with gzip.open(SAVED_DATA_PATH.with_suffix(".json.gz"), "rt") as f:
-                j: dict = jsonpickle.decode(f.read())  # type: ignore
-        elif SAVED_DATA_PATH.exists():
-            with open(SAVED_DATA_PATH, "rt") as f:
+        with closing(sqlite3.connect(SAVED_DB_PATH)) as conn:
+            conn.executescript(_SCHEMA)
+            has_settings = conn.execute("SELECT 1 FROM settings LIMIT 1").fetchone()
+            if has_settings is None and self._legacy_paths():
+                self._migrate()
+                return
+            j = self._read_db(conn)
+        self._load(j)
+
+    def _read_db(self, conn: sqlite3.Connection) -> dict:
+        j: dict = {}
+        for key, value in conn.execute("SELECT key, value FROM settings"):
+            self._written_settings[key] = value
+            j[key] = json.loads(value)
+        rows: Dict[str, List[Tuple[Tuple, int, bytes | str]]] = {}
+        for table, key_columns in _ORDERED_TABLES.items():
+            rows[table] = [
+                (tuple(row[:-2]), row[-2], row[-1])
+                for row in conn.execute(
+                    f"SELECT {', '.join(key_columns)}, position, data FROM {table} ORDER BY position"
+                )
+            ]
+            self._written[table] = {key: (pos, data) for key, pos, data in rows[table]}
+        api_state: Dict[str, list] = {queue: [] for queue in _API_QUEUES}
+        queued_downloads = []
+        for (queue, _), _, data in rows["jobs"]:
+            if queue == "queued_downloads":
+                queued_downloads.append(_decode_row(data))
+            else:
+                api_state[queue].append(_decode_row(data))
+        j["api_state"] = api_state
+        j["queued_downloads"] = queued_downloads
+        j["user_saved_styles"] = [_decode_row(data) for _, _, data in rows["styles"]]
+        j["download_state"] = {
+            "queued_downloads": [
+                _decode_row(data, jsonpickle.decode) for _, _, data in rows["downloads"]
+            ]
+        }
+        return j
+
+    def _legacy_paths(self):
+        return [
+            p
+            for p in (SAVED_DATA_PATH.with_suffix(".json.gz"), SAVED_DATA_PATH)
+            if p.exists()
+        ]
+
+    def _migrate(self):
+        """Move everything from saved_data.json.gz (or the older saved_data.json) into the database."""
+        legacy = self._legacy_paths()
+        LOGGER.info(f"Migrating {legacy[0].name} to the database")
+        if legacy[0].suffix == ".gz":
+            with gzip.open(legacy[0], "rt") as f:
                 j: dict = jsonpickle.decode(f.read())  # type: ignore
-            SAVED_DATA_PATH.rename(
-                SAVED_DATA_PATH.with_name("old_" + SAVED_DATA_PATH.name)
-            )
         else:
-            j = dict()
+            with open(legacy[0], "rt") as f:
+                j: dict = jsonpickle.decode(f.read())  # type: ignore
+        self._load(j)
+        index = ImageIndex(SAVED_DB_PATH)
+        try:
+            if len(index) == 0 and self.current_images:
+                index.add_many(LocalJob.deserialize(x) for x in self.current_images)
+        finally:
+            index.close()
+        self.write()
+        # Kept, in case anything needs to be recovered from them.
+        for p in legacy:
+            p.rename(p.with_name("old_" + p.name))
+
+    def _load(self, j: dict):
         self.api_state = j.get("api_state", {})
         self.max_jobs = j.get("max_jobs", 5)
         self.save_metadata = j.get("save_metadata", True)
@@ -117,3 +366,9 @@ class SavedData:
         self.show_done_images = j.get("show_done_images", True)
         self.notify_after_n = j.get("notify_after_n", 10)
         self.user_saved_styles = j.get("user_saved_styles", [])
+        self.image_cache_mb = j.get("image_cache_mb", 512)
+        self.watch_image_dir = j.get("watch_image_dir", True)
+        # Without a saved choice, keep whatever layout the image directory is already in.
+        self.image_layout = j.get("image_layout", target_layout())
+        self.history_count = j.get("history_count", 200)
+        self.history_max_age_hours = j.get("history_max_age_hours", 24)
@@ -5,6 +5,7 @@ from typing import TYPE_CHECKING, Dict, List
 from fuzzywuzzy import process
 
 from hordeqt.classes.Job import Job
+from hordeqt.classes.SavedData import SaveSection
 from hordeqt.classes.Style import Style
 
 if TYPE_CHECKING:
@@ -16,16 +17,19 @@ class StyleLibrary:
     previews: Dict[str, Dict[str, str]]
 
     def __init__(self, styles: List[Style], parent: HordeQt):
-        self.add_styles(styles)
         self.parent = parent
+        self.add_styles(styles)
         self.previews = {}
 
     def add_styles(self, styles: List[Style]):
+        # Loading, so nothing has changed that needs saving.
         for s in styles:
-            self.set_style(s)
+            self.styles[s.name] = s
 
     def set_style(self, s: Style):
         self.styles[s.name] = s
+        if not s.is_built_in:
+            self.parent.mark_dirty(SaveSection.STYLES)
 
     def apply_style_to_job_data(self, style_name: str, job: Job):
         style = self.get_style(style_name)
@@ -57,6 +61,7 @@ class StyleLibrary:
             if self.styles.get(style) is None:
                 return False
             self.styles.pop(style)
+            self.parent.mark_dirty(SaveSection.STYLES)
             return True
         elif isinstance(style, Style):
             return self.delete_style(style.name)
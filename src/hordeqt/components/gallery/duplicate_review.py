@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List
+
+if TYPE_CHECKING:
+    from hordeqt.app import HordeQt
+
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QImage, QPixmap
+from PySide6.QtWidgets import (
+    QCheckBox,
+    QDockWidget,
+    QGridLayout,
+    QGroupBox,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QScrollArea,
+    QVBoxLayout,
+    QWidget,
+)
+
+from hordeqt.classes.LocalJob import LocalJob
+from hordeqt.other.consts import LOGGER
+from hordeqt.threads.image_loader import ImageLoader
+
+_THUMB_SIZE = 256
+
+
+def _keep_first(jobs: List[LocalJob]) -> List[LocalJob]:
+    # The one kept by default is the biggest, then the oldest.
+    return sorted(
+        jobs,
+        key=lambda lj: (
+            -int(lj.original.width) * int(lj.original.height),
+            float(lj.completed_at),
+        ),
+    )
+
+
+class DuplicateReview(QDockWidget):
+    def __init__(self, clusters: List[List[str]], parent: HordeQt):
+        super().__init__("Duplicate images", parent)
+        self._parent = parent
+        self.setAllowedAreas(
+            Qt.DockWidgetArea.LeftDockWidgetArea | Qt.DockWidgetArea.RightDockWidgetArea
+        )
+        self.loader = ImageLoader(self)
+        self.loader.loaded.connect(self.on_image_loaded)
+        self.labels: Dict[str, QLabel] = {}
+        self.checkboxes: Dict[str, QCheckBox] = {}
+        self.jobs: Dict[str, LocalJob] = {}
+
+        known = {lj.id: lj for lj in parent.job_download_thread.completed_downloads}
+        clustersLayout = QVBoxLayout()
+        n_shown = 0
+        for cluster in clusters:
+            jobs = [known[job_id] for job_id in cluster if job_id in known]
+            if len(jobs) < 2:
+                continue
+            n_shown += 1
+            group = QGroupBox(f"{len(jobs)} similar images")
+            grid = QGridLayout()
+            for n, lj in enumerate(_keep_first(jobs)):
+                label = QLabel("Loading...")
+                label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+                label.setFixedSize(_THUMB_SIZE, _THUMB_SIZE)
+                checkbox = QCheckBox(
+                    f"Delete ({lj.original.width}x{lj.original.height})"
+                )
+                checkbox.setChecked(n > 0)
+                grid.addWidget(label, 0, n)
+                grid.addWidget(checkbox, 1, n)
+                self.labels[lj.id] = label
+                self.checkboxes[lj.id] = checkbox
+                self.jobs[lj.id] = lj
+                self.loader.request(lj.id, lj.path, _THUMB_SIZE)
+            group.setLayout(grid)
+            clustersLayout.addWidget(group)
+        clustersLayout.addStretch()
+
+        clustersWidget = QWidget()
+        clustersWidget.setLayout(clustersLayout)
+        scrollArea = QScrollArea()
+        scrollArea.setWidgetResizable(True)
+        scrollArea.setWidget(clustersWidget)
+
+        self.deleteButton = QPushButton("Delete selected")
+        self.deleteButton.clicked.connect(self.delete_selected)
+        closeButton = QPushButton("Close")
+        closeButton.clicked.connect(self.close)
+        buttonLayout = QHBoxLayout()
+        buttonLayout.addWidget(QLabel(f"{n_shown} groups of duplicates"))
+        buttonLayout.addStretch()
+        buttonLayout.addWidget(self.deleteButton)
+        buttonLayout.addWidget(closeButton)
+
+        layout = QVBoxLayout()
+        layout.addWidget(scrollArea)
+        layout.addLayout(buttonLayout)
+        widget = QWidget()
+        widget.setLayout(layout)
+        self.setWidget(widget)
+        self.setFloating(True)
+        self.resize(900, 700)
+
+    def on_image_loaded(self, job_id: str, image: QImage):
+        if (label := self.labels.get(job_id)) is not None:
+            label.setPixmap(QPixmap.fromImage(image))
+
+    def delete_selected(self):
+        selected = [
+            job_id
+            for job_id, checkbox in self.checkboxes.items()
+            if checkbox.isChecked()
+        ]
+        LOGGER.info(f"Deleting {len(selected)} duplicate images")
+        for job_id in selected:
+            self._parent.delete_image(self.jobs[job_id])
+            checkbox = self.checkboxes.pop(job_id)
+            checkbox.setChecked(False)
+            checkbox.setEnabled(False)
+            checkbox.setText("Deleted")
+            self.labels[job_id].setEnabled(False)
+
+    def closeEvent(self, event):
+        self.loader.stop()
+        super().closeEvent(event)
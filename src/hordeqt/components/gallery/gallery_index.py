@@ -0,0 +1,199 @@
+import os
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from enum import IntEnum, auto
+from operator import attrgetter
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from hordeqt.classes.LocalJob import LocalJob
+
+
+class GallerySortOptions(IntEnum):
+    OldestFirst = auto()
+    NewestFirst = auto()
+    LargestFirst = auto()
+    SmallestFirst = auto()
+    ModelNameAZ = auto()
+    ModelNameZA = auto()
+    MostPixelsFirst = auto()
+    FewestPixelsFirst = auto()
+    WorkerNameAZ = auto()
+    SeedAscending = auto()
+    PromptAZ = auto()
+
+
+# Sort option -> (GalleryEntry attribute, descending)
+SORT_KEYS: Dict[GallerySortOptions, Tuple[str, bool]] = {
+    GallerySortOptions.OldestFirst: ("completed_at", False),
+    GallerySortOptions.NewestFirst: ("completed_at", True),
+    GallerySortOptions.LargestFirst: ("file_size", True),
+    GallerySortOptions.SmallestFirst: ("file_size", False),
+    GallerySortOptions.ModelNameAZ: ("model", False),
+    GallerySortOptions.ModelNameZA: ("model", True),
+    GallerySortOptions.MostPixelsFirst: ("pixel_area", True),
+    GallerySortOptions.FewestPixelsFirst: ("pixel_area", False),
+    GallerySortOptions.WorkerNameAZ: ("worker", False),
+    GallerySortOptions.SeedAscending: ("seed", False),
+    GallerySortOptions.PromptAZ: ("prompt", False),
+}
+
+
+def _first(view: List["GalleryEntry"], pred: Callable[["GalleryEntry"], bool]) -> int:
+    # The view is sorted, so pred is False up to some position and True from there on.
+    return bisect_left(view, True, key=pred)
+
+
+@dataclass
+class GalleryEntry:
+    """A LocalJob with every sort and filter key worked out up front, so re-sorting never touches the job or the disk."""
+
+    lj: LocalJob
+    completed_at: float
+    file_size: int
+    pixel_area: int
+    model: str
+    worker: str
+    seed: Tuple[int, int, str]
+    prompt: str
+    nsfw: bool
+
+    @classmethod
+    def from_job(cls, lj: LocalJob, file_size: Optional[int] = None) -> "GalleryEntry":
+        # Only the summary, so loading the gallery doesn't deserialize every job.
+        job = lj.summary
+        if file_size is None:
+            try:
+                file_size = os.stat(lj.path).st_size
+            except OSError:
+                file_size = 0
+        seed = str(job.seed)
+        return cls(
+            lj,
+            float(lj.completed_at),
+            file_size,
+            int(job.width) * int(job.height),
+            str(job.model).casefold(),
+            str(lj.worker_name).casefold(),
+            # Numeric seeds sort by value, before any that aren't numbers.
+            (0, int(seed), "") if seed.isdigit() else (1, 0, seed),
+            job.prompt.casefold(),
+            job.nsfw,
+        )
+
+
+@dataclass(frozen=True)
+class GalleryFilter:
+    # An empty set means every model.
+    models: FrozenSet[str] = field(default_factory=frozenset)
+    after: Optional[float] = None
+    before: Optional[float] = None
+    # None means both, otherwise only images where NSFW was (or wasn't) allowed.
+    nsfw: Optional[bool] = None
+    # Ids of the images matching a prompt search, None when not searching.
+    ids: Optional[FrozenSet[str]] = None
+
+    def matches(self, entry: GalleryEntry) -> bool:
+        if self.models and entry.lj.summary.model not in self.models:
+            return False
+        if self.after is not None and entry.completed_at < self.after:
+            return False
+        if self.before is not None and entry.completed_at > self.before:
+            return False
+        if self.nsfw is not None and entry.nsfw != self.nsfw:
+            return False
+        if self.ids is not None and entry.lj.id not in self.ids:
+            return False
+        return True
+
+
+class GalleryIndex:
+    """The gallery's entries, and the sorted and filtered view of them that is shown."""
+
+    def __init__(self) -> None:
+        self.entries: Dict[str, GalleryEntry] = {}
+        self.sort = GallerySortOptions.OldestFirst
+        self.filter = GalleryFilter()
+        self.view: List[GalleryEntry] = []
+
+    def __len__(self):
+        return len(self.entries)
+
+    def set_jobs(
+        self, jobs: List[LocalJob], file_sizes: Optional[Dict[str, int]] = None
+    ):
+        # file_sizes (from the image index) saves a stat per image.
+        file_sizes = file_sizes or {}
+        self.entries = {
+            lj.id: GalleryEntry.from_job(lj, file_sizes.get(lj.id)) for lj in jobs
+        }
+        self._rebuild()
+
+    def set_sort(self, sort: GallerySortOptions):
+        self.sort = sort
+        self._rebuild()
+
+    def set_filter(self, gallery_filter: GalleryFilter):
+        self.filter = gallery_filter
+        self._rebuild()
+
+    def models(self) -> List[str]:
+        # Images loaded from files without metadata for it have no model.
+        models = {
+            m for e in self.entries.values() if (m := e.lj.summary.model) is not None
+        }
+        return sorted(models, key=str.casefold)
+
+    def jobs(self) -> List[LocalJob]:
+        return [e.lj for e in self.view]
+
+    def add(self, lj: LocalJob) -> Optional[int]:
+        """Add a job, returning where it was inserted into the view, or None if it's filtered out."""
+        entry = GalleryEntry.from_job(lj)
+        self.entries[lj.id] = entry
+        if not self.filter.matches(entry):
+            return None
+        attr, descending = SORT_KEYS[self.sort]
+        key = attrgetter(attr)
+        new_key = key(entry)
+        # After any entries with an equal key, the same place a stable sort would put it.
+        position = _first(
+            self.view,
+            lambda e: new_key > key(e) if descending else new_key < key(e),
+        )
+        self.view.insert(position, entry)
+        return position
+
+    def add_many(self, jobs: List[LocalJob]):
+        # One sort for the lot, inserting each would be quadratic.
+        for lj in jobs:
+            self.entries[lj.id] = GalleryEntry.from_job(lj)
+        self._rebuild()
+
+    def remove(self, job_id: str) -> Optional[int]:
+        """Remove a job, returning where it was in the view, or None if it wasn't shown."""
+        if (entry := self.entries.pop(job_id, None)) is None:
+            return None
+        attr, descending = SORT_KEYS[self.sort]
+        key = attrgetter(attr)
+        old_key = key(entry)
+        # Only the entries with an equal key need checking.
+        start = _first(
+            self.view, lambda e: key(e) <= old_key if descending else key(e) >= old_key
+        )
+        for n in range(start, len(self.view)):
+            e = self.view[n]
+            if e is entry:
+                del self.view[n]
+                return n
+            if key(e) != old_key:
+                break
+        return None
+
+    def _rebuild(self):
+        attr, descending = SORT_KEYS[self.sort]
+        # Entries are kept in insertion order, so equal keys stay in the order they were added.
+        self.view = sorted(
+            (e for e in self.entries.values() if self.filter.matches(e)),
+            key=attrgetter(attr),
+            reverse=descending,
+        )
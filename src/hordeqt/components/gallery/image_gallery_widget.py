@@ -1,26 +1,44 @@
 from __future__ import annotations
 
-from enum import IntEnum, auto
+from dataclasses import replace
+from typing import Dict, FrozenSet, List, Optional
 
-from PySide6.QtWidgets import QComboBox, QHBoxLayout, QLabel, QVBoxLayout, QWidget
+from PySide6.QtCore import QDate, QDateTime, QTime, QTimer, Signal
+from PySide6.QtGui import QDragEnterEvent, QDropEvent
+from PySide6.QtWidgets import (
+    QCheckBox,
+    QComboBox,
+    QDateEdit,
+    QHBoxLayout,
+    QLabel,
+    QLineEdit,
+    QProgressBar,
+    QVBoxLayout,
+    QWidget,
+)
 
-from hordeqt.components.gallery.masonry_layout import MasonryLayout
-
-
-class GallerySortOptions(IntEnum):
-    OldestFirst = auto()
-    NewestFirst = auto()
-    LargestFirst = auto()
-    SmallestFirst = auto()
-    ModelNameAZ = auto()
-    ModelNameZA = auto()
+from hordeqt.classes.ImageCache import ImageCache
+from hordeqt.classes.ImageIndex import ImageIndex
+from hordeqt.classes.LocalJob import LocalJob
+from hordeqt.components.gallery.gallery_index import (
+    GalleryFilter,
+    GalleryIndex,
+    GallerySortOptions,
+)
+from hordeqt.components.gallery.virtual_gallery import VirtualGallery
 
 
 class ImageGalleryWidget(QWidget):
-    def __init__(self):
+    # Local files, folders and zip files dropped on the gallery, to be imported.
+    pathsDropped = Signal(list)
+
+    def __init__(self, image_cache: ImageCache, image_index: ImageIndex):
         super().__init__()
+        self.setAcceptDrops(True)
 
-        self.m_layout = MasonryLayout(self)
+        self.image_index = image_index
+        self.index = GalleryIndex()
+        self.gallery = VirtualGallery(image_cache, self)
         galLayout = QVBoxLayout()
         configLayout = QHBoxLayout()
 
@@ -31,16 +49,180 @@ class ImageGalleryWidget(QWidget):
         self.sortOptionBox.addItem("Newest First", GallerySortOptions.NewestFirst)
         self.sortOptionBox.addItem("Largest First", GallerySortOptions.LargestFirst)
         self.sortOptionBox.addItem("Smallest First", GallerySortOptions.SmallestFirst)
-        self.sortOptionBox.addItem("Model name (A-Z)", GallerySortOptions.LargestFirst)
-        self.sortOptionBox.addItem("Model name (Z-A)", GallerySortOptions.SmallestFirst)
+        self.sortOptionBox.addItem("Model name (A-Z)", GallerySortOptions.ModelNameAZ)
+        self.sortOptionBox.addItem("Model name (Z-A)", GallerySortOptions.ModelNameZA)
+        self.sortOptionBox.addItem(
+            "Most pixels first", GallerySortOptions.MostPixelsFirst
+        )
+        self.sortOptionBox.addItem(
+            "Fewest pixels first", GallerySortOptions.FewestPixelsFirst
+        )
+        self.sortOptionBox.addItem("Worker name (A-Z)", GallerySortOptions.WorkerNameAZ)
+        self.sortOptionBox.addItem("Seed", GallerySortOptions.SeedAscending)
+        self.sortOptionBox.addItem("Prompt (A-Z)", GallerySortOptions.PromptAZ)
+        self.sortOptionBox.currentIndexChanged.connect(self.on_sort_changed)
 
         sortOptionLayout = QHBoxLayout()
         sortOptionLayout.addWidget(sortOptionsLabel)
         sortOptionLayout.addWidget(self.sortOptionBox)
 
+        self.modelFilterBox = QComboBox()
+        self.modelFilterBox.addItem("All models", None)
+        self.modelFilterBox.currentIndexChanged.connect(self.on_filter_changed)
+
+        self.dateFilterCheckBox = QCheckBox("Between")
+        self.dateFilterCheckBox.checkStateChanged.connect(self.on_filter_changed)
+        self.afterDateEdit = QDateEdit(QDate.currentDate().addMonths(-1))
+        self.afterDateEdit.setCalendarPopup(True)
+        self.afterDateEdit.dateChanged.connect(self.on_filter_changed)
+        self.beforeDateEdit = QDateEdit(QDate.currentDate())
+        self.beforeDateEdit.setCalendarPopup(True)
+        self.beforeDateEdit.dateChanged.connect(self.on_filter_changed)
+
+        self.nsfwFilterBox = QComboBox()
+        self.nsfwFilterBox.addItem("NSFW and SFW", None)
+        self.nsfwFilterBox.addItem("NSFW allowed", True)
+        self.nsfwFilterBox.addItem("SFW only", False)
+        self.nsfwFilterBox.currentIndexChanged.connect(self.on_filter_changed)
+
+        self.searchBox = QLineEdit()
+        self.searchBox.setPlaceholderText("Search prompts, models and LoRAs")
+        self.searchBox.setClearButtonEnabled(True)
+        self.searchBox.setStatusTip("Press enter to open the best match")
+        # Searching on every keystroke would re-sort the gallery for each one, so wait for a pause in typing.
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(150)
+        self.search_timer.timeout.connect(self.on_filter_changed)
+        self.searchBox.textChanged.connect(self.search_timer.start)
+        self.searchBox.returnPressed.connect(self.open_best_match)
+
+        filterLayout = QHBoxLayout()
+        filterLayout.addWidget(QLabel("Show"))
+        filterLayout.addWidget(self.modelFilterBox)
+        filterLayout.addWidget(self.dateFilterCheckBox)
+        filterLayout.addWidget(self.afterDateEdit)
+        filterLayout.addWidget(QLabel("and"))
+        filterLayout.addWidget(self.beforeDateEdit)
+        filterLayout.addWidget(self.nsfwFilterBox)
+
         configLayout.addLayout(sortOptionLayout)
+        configLayout.addLayout(filterLayout)
+
+        self.importProgressBar = QProgressBar()
+        self.importProgressBar.setFormat("Importing %v / %m")
+        self.importProgressBar.hide()
 
+        galLayout.addWidget(self.searchBox)
         galLayout.addLayout(configLayout)
-        galLayout.addLayout(self.m_layout)
+        galLayout.addWidget(self.importProgressBar)
+        galLayout.addWidget(self.gallery)
 
         self.setLayout(galLayout)
+
+    def set_jobs(
+        self, jobs: List[LocalJob], file_sizes: Optional[Dict[str, int]] = None
+    ):
+        self.index.set_jobs(jobs, file_sizes)
+        self.update_model_filter()
+        self.gallery.set_jobs(self.index.jobs())
+
+    def add_job(self, lj: LocalJob):
+        if self.index.filter.ids is not None:
+            # The image index already has the new job, so searching again picks it up if it matches.
+            self.index.filter = replace(
+                self.index.filter, ids=self.search_ids(self.searchBox.text())
+            )
+        position = self.index.add(lj)
+        if self.modelFilterBox.findData(lj.summary.model) == -1:
+            self.update_model_filter()
+        if position is not None:
+            self.gallery.insert_job(position, lj)
+
+    def add_jobs(self, jobs: List[LocalJob]):
+        if self.index.filter.ids is not None:
+            self.index.filter = replace(
+                self.index.filter, ids=self.search_ids(self.searchBox.text())
+            )
+        self.index.add_many(jobs)
+        self.update_model_filter()
+        self.gallery.set_jobs(self.index.jobs())
+
+    def remove_job(self, job_id: str):
+        # The gallery shows the index's view, so the position is the same in both.
+        if (position := self.index.remove(job_id)) is not None:
+            self.gallery.remove_job(position)
+
+    def update_model_filter(self):
+        current = self.modelFilterBox.currentData()
+        self.modelFilterBox.blockSignals(True)
+        self.modelFilterBox.clear()
+        self.modelFilterBox.addItem("All models", None)
+        for model in self.index.models():
+            self.modelFilterBox.addItem(model, model)
+        self.modelFilterBox.setCurrentIndex(
+            max(0, self.modelFilterBox.findData(current))
+        )
+        self.modelFilterBox.blockSignals(False)
+
+    def on_sort_changed(self):
+        self.index.set_sort(self.sortOptionBox.currentData())
+        self.show_view()
+
+    def on_filter_changed(self):
+        model = self.modelFilterBox.currentData()
+        after = before = None
+        if self.dateFilterCheckBox.isChecked():
+            # Both ends are inclusive, so "before" is the end of that day.
+            after = QDateTime(self.afterDateEdit.date(), QTime(0, 0)).toSecsSinceEpoch()
+            before = QDateTime(
+                self.beforeDateEdit.date().addDays(1), QTime(0, 0)
+            ).toSecsSinceEpoch()
+        self.index.set_filter(
+            GalleryFilter(
+                frozenset([model]) if model is not None else frozenset(),
+                after,
+                before,
+                self.nsfwFilterBox.currentData(),
+                self.search_ids(self.searchBox.text()),
+            )
+        )
+        self.show_view()
+
+    def search_ids(self, text: str) -> Optional[FrozenSet[str]]:
+        if not text.strip():
+            return None
+        return frozenset(self.image_index.search(text))
+
+    def open_best_match(self):
+        self.search_timer.stop()
+        self.on_filter_changed()
+        if not (text := self.searchBox.text().strip()):
+            return
+        shown = {lj.id: lj for lj in self.index.jobs()}
+        # search() is ordered by relevance, the gallery by the chosen sort.
+        best = next(
+            (shown[i] for i in self.image_index.search(text) if i in shown), None
+        )
+        if best is not None:
+            self.gallery.imageClicked.emit(best)
+
+    def show_view(self):
+        self.gallery.set_jobs(self.index.jobs())
+        self.gallery.verticalScrollBar().setValue(0)
+
+    def set_import_progress(self, done: int, total: int):
+        self.importProgressBar.setMaximum(max(total, 1))
+        self.importProgressBar.setValue(done)
+        self.importProgressBar.show()
+
+    def dragEnterEvent(self, event: QDragEnterEvent):
+        if event.mimeData().hasUrls() and all(
+            url.isLocalFile() for url in event.mimeData().urls()
+        ):
+            event.acceptProposedAction()
+
+    def dropEvent(self, event: QDropEvent):
+        paths = [url.toLocalFile() for url in event.mimeData().urls()]
+        event.acceptProposedAction()
+        self.pathsDropped.emit(paths)
@@ -6,7 +6,7 @@ if TYPE_CHECKING:
     from hordeqt.app import HordeQt
 
 from PySide6.QtCore import Qt, QUrl
-from PySide6.QtGui import QDesktopServices, QPixmap
+from PySide6.QtGui import QDesktopServices
 from PySide6.QtWidgets import (
     QDockWidget,
     QHBoxLayout,
@@ -56,15 +56,15 @@ class ImagePopup(QDockWidget):
     def open_in_native_menu(self):
         QDesktopServices.openUrl(QUrl.fromLocalFile(self.lj.path))
 
-    def __init__(self, pixmap: QPixmap, lj: LocalJob, parent: HordeQt):
+    def __init__(self, lj: LocalJob, parent: HordeQt):
         super().__init__("Image Viewer", parent)
         self._parent = parent
         self.setAllowedAreas(
             Qt.DockWidgetArea.LeftDockWidgetArea | Qt.DockWidgetArea.RightDockWidgetArea
         )
         self.lj = lj
-        # Create a label to display the image
-
+        # Create a label to display the image. It's shown at 512px at most, so the gallery's cached thumbnail is enough.
+        pixmap = parent.image_cache.get_or_load((lj.id, 512), lj.path)
         self.label = QLabel(self)
         self.label.setPixmap(
             pixmap.scaled(
@@ -1,47 +1,76 @@
-from PIL import Image
+from typing import Optional
+
 from PySide6.QtCore import Qt, Signal
 from PySide6.QtGui import QPixmap
-from PySide6.QtWidgets import QLabel, QSizePolicy
+from PySide6.QtWidgets import QLabel, QSizePolicy, QWidget
 
 from hordeqt.classes.LocalJob import LocalJob
 from hordeqt.other.consts import LOGGER
 
 
 class ImageWidget(QLabel):
-    imageClicked = Signal(QPixmap)
+    imageClicked = Signal(LocalJob)
     valid: bool = True
+    original_pixmap: Optional[QPixmap] = None
+    # The width that the shown pixmap was smoothly scaled for, 0 if it's a fast scale.
+    smooth_width: int = 0
 
-    def __init__(self, lj: LocalJob):
-        super().__init__()
-        self.lj = lj
-        if not lj.path.exists():
-            self.valid = False
-            return
-        try:
-            Image.open(lj.path).close()
-        except Image.UnidentifiedImageError:
-            self.valid = False
-            return
-        self.original_pixmap = QPixmap(lj.path)
-        self.setPixmap(self.original_pixmap)
+    def __init__(self, lj: Optional[LocalJob] = None, parent: Optional[QWidget] = None):
+        super().__init__(parent)
         self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         self.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        if lj is not None:
+            self.set_job(lj)
+
+    def set_job(self, lj: LocalJob):
+        # Tiles are recycled by the gallery, so everything about the previous job has to be replaced here.
+        # The image itself comes from the gallery's cache, or is decoded off the GUI thread, and is handed over through set_pixmap.
+        self.lj = lj
+        self.valid = True
+        self.original_pixmap = None
+        self.smooth_width = 0
+        self.clear()
+        self.setStyleSheet("background-color: palette(midlight);")
+        self.setText("Loading...")
+
+    def set_pixmap(self, pixmap: QPixmap):
+        self.setStyleSheet("")
+        self.original_pixmap = pixmap
+        self.smooth_width = 0
+        self.update_pixmap()
+
+    def set_smooth_pixmap(self, pixmap: QPixmap):
+        # original_pixmap, already smoothly scaled to the current width by the gallery.
+        self.smooth_width = self.width()
+        self.setPixmap(pixmap)
+
+    def needs_smooth(self) -> bool:
+        return self.original_pixmap is not None and self.smooth_width != self.width()
+
+    def set_invalid(self):
+        self.valid = False
+        self.original_pixmap = None
+        self.clear()
+        self.setText("Image unavailable")
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
         self.update_pixmap()
 
     def update_pixmap(self):
-        if self.original_pixmap:
-            scaled_pixmap = self.original_pixmap.scaled(
+        # This runs for every tile on every resize event, so it uses the fast transform.
+        # The gallery swaps in a smooth copy once resizing has settled.
+        if self.needs_smooth():
+            self.smooth_width = 0
+            scaled_pixmap = self.original_pixmap.scaled(  # type: ignore
                 self.size(),
                 Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation,
+                Qt.TransformationMode.FastTransformation,
             )
             self.setPixmap(scaled_pixmap)
 
     def mouseReleaseEvent(self, ev):
         if ev.button() == Qt.MouseButton.LeftButton:
             LOGGER.debug(f"Gallery view item for {self.lj.id} was clicked")
-            self.imageClicked.emit(self.original_pixmap)
+            self.imageClicked.emit(self.lj)
         super().mouseReleaseEvent(ev)
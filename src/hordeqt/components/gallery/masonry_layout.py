@@ -1,93 +1,121 @@
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
 from typing import List
 
-from PySide6.QtCore import QRect, QSize
-from PySide6.QtWidgets import QLabel, QLayout, QLayoutItem
+from PySide6.QtCore import QRect
 
-from hordeqt.components.gallery.image_widget import ImageWidget
-from hordeqt.other.consts import LOGGER
 
+@dataclass
+class _Placement:
+    aspect_ratio: float
+    column: int
+    # Sum of 1/aspect_ratio of everything above this item in its column. Multiplying by the column width gives the pixel offset, so placements survive width changes.
+    unit_top: float
+    row: int
 
-class MasonryLayout(QLayout):
-    def __init__(self, parent=None, margin=10, spacing=10) -> None:
-        super(MasonryLayout, self).__init__(parent)
-        self.margin = margin
+
+class MasonryLayout:
+    """Incremental masonry layout over aspect ratios.
+
+    Appending is O(columns), removing only replays the items after the removed one, and resizing only re-places items when the number of columns changes.
+    """
+
+    def __init__(self, spacing=10, min_column_width=200) -> None:
         self.m_spacing = spacing
-        self.items: List[QLayoutItem] = []
-        self.column_heights = []
-
-    def addItem(self, arg__1):
-        self.items.append(arg__1)
-
-    def count(self):
-        return len(self.items)
-
-    def sizeHint(self):
-        if not self.column_heights:
-            self.updateGeometry()
-        total_height = max(self.column_heights, default=0) + self.m_spacing
-        return QSize(self.geometry().width(), total_height)
-
-    def itemAt(self, index) -> QLayoutItem:
-        try:
-            return self.items[index]
-        except IndexError:
-            return None  # type: ignore
-
-    def takeAt(self, index):
-        return self.items.pop(index)
-
-    def setGeometry(self, rect):  # type: ignore
-        super(MasonryLayout, self).setGeometry(rect)
-        self.updateGeometry()
-
-    def updateGeometry(self):
-        if not self.items:
-            return
-        if len(self.items) == 0:
+        self.min_column_width = min_column_width
+        self.num_columns = 1
+        self.column_width = min_column_width
+        self.placements: List[_Placement] = []
+        self.column_units: List[float] = [0.0]
+        self.column_items: List[List[int]] = [[]]
+
+    def __len__(self):
+        return len(self.placements)
+
+    def set_width(self, width: int) -> bool:
+        """Update the available width. Returns True if every item had to be re-placed."""
+        num_columns = max(1, width // (self.min_column_width + self.m_spacing))
+        self.column_width = max(
+            1, (width - (num_columns - 1) * self.m_spacing) // num_columns
+        )
+        if num_columns == self.num_columns:
             return False
-        width = self.geometry().width()
-        self.calculateColumnLayout(width)
-        self.arrangeItems()
+        self.num_columns = num_columns
+        self.set_items([p.aspect_ratio for p in self.placements])
         return True
 
-    def calculateColumnLayout(self, width):
-        self.num_columns = max(1, width // (200 + self.m_spacing))
-        self.column_width = (
-            width - (self.num_columns - 1) * self.m_spacing
-        ) // self.num_columns
-        self.column_heights = [0] * self.num_columns
-
-    def delete_image(self, id: str):
-        index = -1
-        for i in range(len(self.items)):
-            widget: ImageWidget = self.items[i].widget()  # type: ignore
-            if id == widget.lj.id:
-                index = i
-                break
-        if index == -1:
-            LOGGER.warning("Image couldn't be found in gallery.")
-            return
-        del self.items[index]
-
-    def arrangeItems(self):
-        x_offsets = [
-            i * (self.column_width + self.m_spacing) for i in range(self.num_columns)
-        ]
-        for item in self.items:
-            widget: QLabel = item.widget()  # type: ignore
-            pixmap = widget.pixmap()
-            aspect_ratio = (
-                pixmap.width() / pixmap.height()
-                if pixmap
-                else widget.sizeHint().width() / widget.sizeHint().height()
+    def set_items(self, aspect_ratios: List[float]):
+        self.placements = []
+        self.column_units = [0.0] * self.num_columns
+        self.column_items = [[] for _ in range(self.num_columns)]
+        for aspect_ratio in aspect_ratios:
+            self.append(aspect_ratio)
+
+    def _column_height(self, column: int) -> int:
+        return round(self.column_units[column] * self.column_width) + (
+            len(self.column_items[column]) * self.m_spacing
+        )
+
+    def append(self, aspect_ratio: float):
+        if aspect_ratio <= 0:
+            aspect_ratio = 1.0
+        heights = [self._column_height(c) for c in range(self.num_columns)]
+        column = heights.index(min(heights))
+        self.column_items[column].append(len(self.placements))
+        self.placements.append(
+            _Placement(
+                aspect_ratio,
+                column,
+                self.column_units[column],
+                len(self.column_items[column]) - 1,
             )
-            height = self.column_width / aspect_ratio
-            min_col = self.column_heights.index(min(self.column_heights))
-
-            x = x_offsets[min_col]
-            y = self.column_heights[min_col]
-            widget.setGeometry(QRect(x, y, self.column_width, height))
-            self.column_heights[min_col] += height + self.m_spacing
-
-        # Ensure the container widget height is adjusted based on the tallest column
-        self.parentWidget().setMinimumHeight(max(self.column_heights) + self.m_spacing)
+        )
+        self.column_units[column] += 1 / aspect_ratio
+
+    def _truncate(self, index: int) -> List[float]:
+        # Undo placements back to index, returning the aspect ratios that were removed (in order).
+        removed: List[float] = []
+        while len(self.placements) > index:
+            p = self.placements.pop()
+            self.column_items[p.column].pop()
+            self.column_units[p.column] = p.unit_top
+            removed.append(p.aspect_ratio)
+        removed.reverse()
+        return removed
+
+    def remove(self, index: int):
+        suffix = self._truncate(index)
+        for aspect_ratio in suffix[1:]:
+            self.append(aspect_ratio)
+
+    def insert(self, index: int, aspect_ratio: float):
+        suffix = self._truncate(index)
+        self.append(aspect_ratio)
+        for ar in suffix:
+            self.append(ar)
+
+    def rect(self, index: int) -> QRect:
+        p = self.placements[index]
+        return QRect(
+            p.column * (self.column_width + self.m_spacing),
+            round(p.unit_top * self.column_width) + p.row * self.m_spacing,
+            self.column_width,
+            round(self.column_width / p.aspect_ratio),
+        )
+
+    def items_in(self, top: int, bottom: int) -> List[int]:
+        """Indices of the items that overlap the vertical span [top, bottom]."""
+        found: List[int] = []
+        for items in self.column_items:
+            # Items in a column are stacked, so both edges are sorted and can be bisected.
+            first = bisect_left(items, top, key=lambda i: self.rect(i).bottom())
+            last = bisect_right(items, bottom, key=lambda i: self.rect(i).top())
+            found.extend(items[first:last])
+        found.sort()
+        return found
+
+    def total_height(self) -> int:
+        return (
+            max((self._column_height(c) for c in range(self.num_columns)), default=0)
+            + self.m_spacing
+        )
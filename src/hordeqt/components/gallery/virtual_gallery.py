@@ -0,0 +1,189 @@
+from typing import Dict, List, Optional, Tuple
+
+from PySide6.QtCore import QTimer, Signal
+from PySide6.QtGui import QImage, QPixmap
+from PySide6.QtWidgets import QFrame, QScrollArea, QSizePolicy, QWidget
+
+from hordeqt.classes.ImageCache import ImageCache
+from hordeqt.classes.LocalJob import LocalJob
+from hordeqt.components.gallery.image_widget import ImageWidget
+from hordeqt.components.gallery.masonry_layout import MasonryLayout
+from hordeqt.other.thumbnail_cache import THUMBNAIL_SIZE
+from hordeqt.threads.image_loader import ImageLoader
+
+
+class VirtualGallery(QScrollArea):
+    """Masonry gallery that only creates tiles for the viewport (plus some overscan), recycling them as it scrolls."""
+
+    imageClicked = Signal(LocalJob)
+
+    def __init__(
+        self, image_cache: ImageCache, parent=None, spacing=10, min_column_width=200
+    ) -> None:
+        super().__init__(parent)
+        self.image_cache = image_cache
+        self.image_size = THUMBNAIL_SIZE
+        self.setFrameShape(QFrame.Shape.NoFrame)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        # The canvas is sized by hand, so that the scroll range is up to date before the anchor is restored.
+        self.setWidgetResizable(False)
+        self.canvas = QWidget()
+        self.setWidget(self.canvas)
+        self.masonry = MasonryLayout(spacing, min_column_width)
+        self.jobs: List[LocalJob] = []
+        self.tiles: Dict[str, ImageWidget] = {}
+        self.spare_tiles: List[ImageWidget] = []
+        self.loader = ImageLoader(self)
+        self.loader.loaded.connect(self.on_image_loaded)
+        self.loader.failed.connect(self.on_image_failed)
+        self.scaler = ImageLoader(self, max_threads=2)
+        self.scaler.loaded.connect(self.on_image_scaled)
+        # Tiles use a fast scale while the window is being resized, and get a smooth one once it has stopped for a moment.
+        self.smooth_timer = QTimer(self)
+        self.smooth_timer.setSingleShot(True)
+        self.smooth_timer.setInterval(150)
+        self.smooth_timer.timeout.connect(self.render_smooth)
+        self.verticalScrollBar().valueChanged.connect(self.update_visible)
+
+    def set_jobs(self, jobs: List[LocalJob]):
+        # Tiles are keyed by job id, so a reordered job that's still on screen keeps its tile (and its pixmap).
+        self.jobs = list(jobs)
+        self.masonry.set_width(self.viewport().width())
+        self.masonry.set_items([lj.aspect_ratio for lj in self.jobs])
+        self._update_canvas()
+
+    def add_job(self, lj: LocalJob):
+        self.insert_job(len(self.jobs), lj)
+
+    def insert_job(self, index: int, lj: LocalJob):
+        anchor = self._anchor()
+        if anchor is not None and anchor[0] >= index:
+            anchor = (anchor[0] + 1, anchor[1])
+        self.jobs.insert(index, lj)
+        self.masonry.insert(index, lj.aspect_ratio)
+        self._update_canvas(anchor)
+
+    def remove_job(self, index: int):
+        job_id = self.jobs[index].id
+        anchor = self._anchor()
+        if anchor is not None and anchor[0] >= index:
+            # Nothing to keep in place if the anchor is the one going away.
+            anchor = None if anchor[0] == index else (anchor[0] - 1, anchor[1])
+        del self.jobs[index]
+        self.masonry.remove(index)
+        if (tile := self.tiles.pop(job_id, None)) is not None:
+            self._recycle(tile)
+        self._update_canvas(anchor)
+
+    def _visible_span(self) -> Tuple[int, int]:
+        top = self.verticalScrollBar().value()
+        return (top, top + self.viewport().height())
+
+    def _anchor(self) -> Optional[Tuple[int, int]]:
+        # The first tile that is at least partially on screen, and how far it is from the top of the viewport.
+        top, bottom = self._visible_span()
+        indices = self.masonry.items_in(top, bottom)
+        if not indices:
+            return None
+        y, index = min((self.masonry.rect(i).top(), i) for i in indices)
+        return (index, y - top)
+
+    def _update_canvas(self, anchor: Optional[Tuple[int, int]] = None):
+        self.canvas.resize(self.viewport().width(), self.masonry.total_height())
+        if anchor is not None:
+            index, offset = anchor
+            self.verticalScrollBar().setValue(self.masonry.rect(index).top() - offset)
+        self.update_visible()
+
+    def update_visible(self):
+        top, bottom = self._visible_span()
+        height = bottom - top
+        # One screen of overscan on either side keeps tiles ready before they scroll into view.
+        wanted = {
+            self.jobs[i].id: i
+            for i in self.masonry.items_in(top - height, bottom + height)
+        }
+        for job_id in list(self.tiles.keys()):
+            if job_id not in wanted:
+                self._recycle(self.tiles.pop(job_id))
+        for job_id, index in wanted.items():
+            tile = self.tiles.get(job_id)
+            if tile is None:
+                tile = self._get_tile()
+                tile.set_job(self.jobs[index])
+                self.tiles[job_id] = tile
+                if (pixmap := self.image_cache.get((job_id, self.image_size))) is None:
+                    self.loader.request(job_id, self.jobs[index].path, self.image_size)
+                else:
+                    tile.set_pixmap(pixmap)
+            else:
+                self.image_cache.touch((job_id, self.image_size))
+            tile.setGeometry(self.masonry.rect(index))
+            tile.show()
+            if tile.needs_smooth():
+                self.smooth_timer.start()
+
+    def on_image_loaded(self, job_id: str, image: QImage):
+        # The tile may have been recycled while the image was decoding, in which case there's nothing to do.
+        if (tile := self.tiles.get(job_id)) is not None:
+            pixmap = QPixmap.fromImage(image)
+            self.image_cache.put((job_id, self.image_size), pixmap)
+            tile.set_pixmap(pixmap)
+            self.smooth_timer.start()
+
+    def render_smooth(self):
+        for job_id, tile in self.tiles.items():
+            if not tile.needs_smooth():
+                continue
+            key = (job_id, self.image_size, tile.width())
+            if (pixmap := self.image_cache.get(key)) is not None:
+                tile.set_smooth_pixmap(pixmap)
+            else:
+                # Anything still queued was for an older size.
+                self.scaler.cancel(job_id)
+                self.scaler.scale(
+                    job_id,
+                    tile.original_pixmap.toImage(),  # type: ignore
+                    tile.size(),
+                )
+
+    def on_image_scaled(self, job_id: str, image: QImage):
+        tile = self.tiles.get(job_id)
+        if tile is None or not tile.needs_smooth():
+            return
+        # The image fits the size it was scaled for in one dimension, if the tile changed since then it's stale.
+        if image.width() != tile.width() and image.height() != tile.height():
+            return
+        pixmap = QPixmap.fromImage(image)
+        self.image_cache.put((job_id, self.image_size, tile.width()), pixmap)
+        tile.set_smooth_pixmap(pixmap)
+
+    def on_image_failed(self, job_id: str):
+        if (tile := self.tiles.get(job_id)) is not None:
+            tile.set_invalid()
+
+    def _get_tile(self) -> ImageWidget:
+        if self.spare_tiles:
+            return self.spare_tiles.pop()
+        tile = ImageWidget(parent=self.canvas)
+        tile.imageClicked.connect(self.imageClicked)
+        return tile
+
+    def _recycle(self, tile: ImageWidget):
+        self.loader.cancel(tile.lj.id)
+        self.scaler.cancel(tile.lj.id)
+        tile.hide()
+        tile.clear()
+        tile.original_pixmap = None
+        self.spare_tiles.append(tile)
+
+    def resizeEvent(self, arg__1):
+        super().resizeEvent(arg__1)
+        anchor = self._anchor()
+        self.masonry.set_width(self.viewport().width())
+        self._update_canvas(anchor)
+
+    def stop(self):
+        self.smooth_timer.stop()
+        self.loader.stop()
+        self.scaler.stop()
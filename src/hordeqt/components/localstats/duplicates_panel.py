@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, List
+
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import (
+    QFormLayout,
+    QGroupBox,
+    QLabel,
+    QProgressBar,
+    QPushButton,
+    QSpinBox,
+)
+
+from hordeqt.components.gallery.duplicate_review import DuplicateReview
+
+if TYPE_CHECKING:
+    from hordeqt.app import HordeQt
+
+
+class DuplicatesPanel(QGroupBox):
+    def __init__(self, parent: HordeQt) -> None:
+        super().__init__("Find duplicates", parent)
+        self._parent = parent
+        self.duplicate_thread = parent.duplicate_thread
+        self.clusters: List[List[str]] = []
+
+        self.distanceSpinBox = QSpinBox()
+        # Out of the 64 bits in a hash. Much past 10 starts matching images that only share a layout.
+        self.distanceSpinBox.setRange(0, 16)
+        self.distanceSpinBox.setValue(self.duplicate_thread.max_distance)
+        self.distanceSpinBox.setToolTip(
+            "How many bits of the perceptual hash can differ. 0 only finds exact duplicates."
+        )
+        self.progressBar = QProgressBar()
+        self.progressBar.setValue(0)
+        self.foundLabel = QLabel("Not scanned")
+        self.startButton = QPushButton("Scan for duplicates")
+        self.startButton.clicked.connect(self.toggle)
+        self.reviewButton = QPushButton("Review duplicates")
+        self.reviewButton.setEnabled(False)
+        self.reviewButton.clicked.connect(self.open_review)
+
+        layout = QFormLayout()
+        layout.addRow("Max difference", self.distanceSpinBox)
+        layout.addRow("Progress", self.progressBar)
+        layout.addRow("Found", self.foundLabel)
+        layout.addWidget(self.startButton)
+        layout.addWidget(self.reviewButton)
+        self.setLayout(layout)
+
+        self.duplicate_thread.progress.connect(self.on_progress)
+        self.duplicate_thread.clusters_found.connect(self.on_clusters_found)
+        self.duplicate_thread.finished.connect(self.on_finished)
+
+    def toggle(self):
+        if self.duplicate_thread.isRunning():
+            self.startButton.setEnabled(False)
+            self.startButton.setText("Stopping...")
+            self.duplicate_thread.running = False
+        else:
+            self.duplicate_thread.max_distance = self.distanceSpinBox.value()
+            self.distanceSpinBox.setEnabled(False)
+            self.reviewButton.setEnabled(False)
+            self.startButton.setText("Stop scanning")
+            self.duplicate_thread.start()
+
+    def on_progress(self, done: int, total: int):
+        self.progressBar.setMaximum(max(total, 1))
+        self.progressBar.setValue(done)
+
+    def on_clusters_found(self, clusters: List[List[str]]):
+        self.clusters = clusters
+        n_images = sum(len(c) for c in clusters)
+        self.foundLabel.setText(f"{n_images} images in {len(clusters)} groups")
+
+    def on_finished(self):
+        self.distanceSpinBox.setEnabled(True)
+        self.startButton.setEnabled(True)
+        self.startButton.setText("Scan for duplicates")
+        self.reviewButton.setEnabled(len(self.clusters) > 0)
+
+    def open_review(self):
+        review = DuplicateReview(self.clusters, self._parent)
+        self._parent.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, review)
+        review.show()
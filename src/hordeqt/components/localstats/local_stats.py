@@ -2,16 +2,17 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, List
 
+import human_readable as hr
 from PySide6.QtWidgets import QFormLayout, QPushButton
 
+from hordeqt.components.localstats.duplicates_panel import DuplicatesPanel
 from hordeqt.components.localstats.local_stat_item import LocalStatItem
+from hordeqt.components.localstats.recompress_panel import RecompressPanel
 from hordeqt.components.localstats.stats import (
     calculate_average_image_size,
     calculate_cache_size,
-    calculate_compression_ratio,
     calculate_images_size,
     calculate_largest_image,
-    calculate_size_of_compressed_save_file,
     calculate_size_of_save_file,
     calculate_smallest_image,
     calculate_total_images,
@@ -32,21 +33,41 @@ class LocalStats(QFrame):
         self._layout = QFormLayout()
         self.stats: List[LocalStatItem] = [
             LocalStatItem(self, "Cache Size", calculate_cache_size),
-            LocalStatItem(self, "Total images size", calculate_images_size),
-            LocalStatItem(self, "Total number of images", calculate_total_images),
-            LocalStatItem(self, "Average image size", calculate_average_image_size),
-            LocalStatItem(self, "Largest image", calculate_largest_image),
-            LocalStatItem(self, "Smallest image", calculate_smallest_image),
             LocalStatItem(
-                self, "Saved data size (uncompressed)", calculate_size_of_save_file
+                self,
+                "Total images size",
+                lambda: calculate_images_size(parent.image_index),
+            ),
+            LocalStatItem(
+                self,
+                "Total number of images",
+                lambda: calculate_total_images(parent.image_index),
+            ),
+            LocalStatItem(
+                self,
+                "Average image size",
+                lambda: calculate_average_image_size(parent.image_index),
             ),
             LocalStatItem(
                 self,
-                "Saved data size (compressed)",
-                calculate_size_of_compressed_save_file,
+                "Largest image",
+                lambda: calculate_largest_image(parent.image_index),
             ),
             LocalStatItem(
-                self, "Saved data compression ratio", calculate_compression_ratio
+                self,
+                "Smallest image",
+                lambda: calculate_smallest_image(parent.image_index),
+            ),
+            LocalStatItem(self, "Saved data size", calculate_size_of_save_file),
+            LocalStatItem(
+                self,
+                "Image memory cache",
+                lambda: f"{hr.file_size(parent.image_cache.size)} of {hr.file_size(parent.image_cache.budget)} ({len(parent.image_cache)} images)",
+            ),
+            LocalStatItem(
+                self,
+                "Image memory cache hits/misses/evictions",
+                lambda: f"{parent.image_cache.hits}/{parent.image_cache.misses}/{parent.image_cache.evictions}",
             ),
         ]
         for widget in self.stats:
@@ -57,12 +78,18 @@ class LocalStats(QFrame):
         self.refresh_button = QPushButton("Refresh statistics")
         self.refresh_button.clicked.connect(self.update_stats)
         self._layout.addWidget(self.refresh_button)
+        self._layout.addRow(RecompressPanel(parent))
+        self._layout.addRow(DuplicatesPanel(parent))
         self.setLayout(self._layout)
 
     def update_stats(self):
         for stat in self.stats:
             old = stat.display_value.text()
+            old_widget = stat.display_value
             stat.update_value()
+            # update_value makes a new widget, so swap it into the form in place of the old one.
+            self._layout.replaceWidget(old_widget, stat.display_value)
+            old_widget.deleteLater()
             LOGGER.debug(
                 f"Refreshing {stat.label.text()}  OLD: {old} NEW: {stat.display_value.text()}"
             )
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import human_readable as hr
+from PySide6.QtWidgets import (
+    QComboBox,
+    QFormLayout,
+    QGroupBox,
+    QLabel,
+    QProgressBar,
+    QPushButton,
+    QSpinBox,
+)
+
+from hordeqt.other.recompress import RECOMPRESS_CODECS
+
+if TYPE_CHECKING:
+    from hordeqt.app import HordeQt
+
+
+class RecompressPanel(QGroupBox):
+    def __init__(self, parent: HordeQt) -> None:
+        super().__init__("Recompress library", parent)
+        self._parent = parent
+        self.recompress_thread = parent.recompress_thread
+
+        self.codecBox = QComboBox()
+        self.codecBox.addItems(RECOMPRESS_CODECS)
+        self.codecBox.setCurrentText(self.recompress_thread.codec)
+        self.qualitySpinBox = QSpinBox()
+        self.qualitySpinBox.setRange(1, 100)
+        self.qualitySpinBox.setValue(self.recompress_thread.quality)
+        self.progressBar = QProgressBar()
+        self.progressBar.setValue(0)
+        self.savedLabel = QLabel(hr.file_size(self.recompress_thread.total_saved))
+        self.startButton = QPushButton("Start recompression")
+        self.startButton.clicked.connect(self.toggle)
+
+        layout = QFormLayout()
+        layout.addRow("Codec", self.codecBox)
+        layout.addRow("Quality", self.qualitySpinBox)
+        layout.addRow("Progress", self.progressBar)
+        layout.addRow("Space saved", self.savedLabel)
+        layout.addWidget(self.startButton)
+        self.setLayout(layout)
+
+        self.recompress_thread.progress.connect(self.on_progress)
+        self.recompress_thread.bytes_saved.connect(self.on_bytes_saved)
+        self.recompress_thread.finished.connect(self.on_finished)
+
+    def toggle(self):
+        if self.recompress_thread.isRunning():
+            self.startButton.setEnabled(False)
+            self.startButton.setText("Stopping...")
+            self.recompress_thread.running = False
+        elif self._parent.layout_migration_thread.isRunning():
+            # Both rename image files, so they can't run at the same time.
+            self._parent.show_info_toast(
+                "Images are being moved",
+                "Recompression can start once saved images have been moved",
+            )
+        else:
+            self.recompress_thread.configure(
+                self.codecBox.currentText(), self.qualitySpinBox.value()
+            )
+            self.codecBox.setEnabled(False)
+            self.qualitySpinBox.setEnabled(False)
+            self.startButton.setText("Stop recompression")
+            self.recompress_thread.start()
+
+    def on_progress(self, done: int, total: int):
+        self.progressBar.setMaximum(max(total, 1))
+        self.progressBar.setValue(done)
+
+    def on_bytes_saved(self, saved: int):
+        self.savedLabel.setText(hr.file_size(saved))
+
+    def on_finished(self):
+        self.codecBox.setEnabled(True)
+        self.qualitySpinBox.setEnabled(True)
+        self.startButton.setEnabled(True)
+        self.startButton.setText("Start recompression")
@@ -96,13 +96,19 @@ class LoRAItem(QFrame):
     def serialize(self) -> dict:
         return {
             "loraModel": self.loraModel.serialize(),
-            "loraVersion": self.loraVersion.serialize(),
+            # The model has the version already
+            "loraVersion": self.loraVersion.id,
         }
 
     @classmethod
     def deserialize(cls, val: dict, parent: SelectedLoRAs) -> Self:
-        return cls(
-            parent,
-            CivitModel.deserialize(val.get("loraModel", {})),
-            ModelVersion.deserialize(val.get("loraVersion", {})),
-        )
+        model = CivitModel.deserialize(val.get("loraModel", {}))
+        version = val.get("loraVersion", {})
+        if isinstance(version, dict):
+            # Saved before versions were stored by id
+            version = ModelVersion.deserialize(version)
+        else:
+            version = ModelVersion.get(version) or ModelVersion.deserialize(
+                {"id": version}
+            )
+        return cls(parent, model, version)
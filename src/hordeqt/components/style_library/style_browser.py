@@ -47,7 +47,7 @@ class StyleBrowser(QDockWidget):
         )
         style.name = "New Style"
         n = 0
-        while self._parent.styleLibrary.get_style(style.name) is not None:
+        while self._parent.style_library.get_style(style.name) is not None:
             n += 1
             style.name = f"New Style ({n})"
         StyleViewer(style, self._parent)
@@ -115,16 +115,16 @@ class StyleBrowser(QDockWidget):
 
         self.curr_widgets = []
         best_match_styles: Sequence[Tuple[str, int]] = process.extract(
-            query, self._parent.styleLibrary.get_available_style_names(), limit=10
+            query, self._parent.style_library.get_available_style_names(), limit=10
         )  # type: ignore
         LOGGER.debug(f"Best matches for {query}: {best_match_styles}")
         for style, ranking in best_match_styles:
-            s = self._parent.styleLibrary.get_style(style)
+            s = self._parent.style_library.get_style(style)
             if s is not None and ranking > 10:  # Keep intellisense happy.
                 self.styleListLayout.addWidget(self.create_widget_from_style(s))
         if len(query) == 0:
             styles = random.choices(
-                self._parent.styleLibrary.get_available_styles(), k=10
+                self._parent.style_library.get_available_styles(), k=10
             )
             for style in styles:
                 self.styleListLayout.addWidget(self.create_widget_from_style(style))
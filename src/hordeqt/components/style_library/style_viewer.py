@@ -82,7 +82,7 @@ class StyleViewer(QDockWidget):
             save_name_confirmation.setDefaultButton(QMessageBox.StandardButton.Abort)
             ret = save_name_confirmation.exec()
             if ret == QMessageBox.StandardButton.Yes:
-                self._parent.styleLibrary.delete_style(old_style_name)
+                self._parent.style_library.delete_style(old_style_name)
             elif ret == QMessageBox.StandardButton.No:
                 pass
             elif ret == QMessageBox.StandardButton.Abort:
@@ -91,7 +91,7 @@ class StyleViewer(QDockWidget):
                     f"{self.style_data.name} was not deleted",
                 )
                 return
-        self._parent.styleLibrary.set_style(new_style)
+        self._parent.style_library.set_style(new_style)
         self.style_data = new_style
         self.reinitialize(new_style)
         self._parent.show_success_toast(
@@ -104,11 +104,11 @@ class StyleViewer(QDockWidget):
         base_name = copy.copy(new_style.name)
         new_style.name = base_name + " copy"
         n = 0
-        while self._parent.styleLibrary.get_style(new_style.name) is not None:
+        while self._parent.style_library.get_style(new_style.name) is not None:
             n += 1
             new_style.name = base_name + " copy " + str(n)
         new_style.is_built_in = False
-        self._parent.styleLibrary.set_style(new_style)
+        self._parent.style_library.set_style(new_style)
         self._parent.show_success_toast(
             "Duplicated style",
             f'Copy of style "{self.style_data.name}" created, "{new_style.name}"',
@@ -142,7 +142,7 @@ class StyleViewer(QDockWidget):
             )
 
     def _delete_style(self):
-        self._parent.styleLibrary.delete_style(self.style_data)
+        self._parent.style_library.delete_style(self.style_data)
         self.close()
 
     def use_style(self):
@@ -194,7 +194,7 @@ class StyleViewer(QDockWidget):
             self.style_data.clip_skip, "CLIP skip", 1, 1, 12
         )
         self.previews_layout = QHBoxLayout()
-        previews = self._parent.styleLibrary.previews.get(self.style_data.name, None)
+        previews = self._parent.style_library.previews.get(self.style_data.name, None)
         if previews is None:
             LOGGER.info(f"No previews for {self.style_data.name}")
         else:
@@ -51,6 +51,7 @@ SAVED_DATA_DIR_PATH = Path(
 SAVED_LOG_PATH = SAVED_DATA_DIR_PATH / "logs"
 SAVED_IMAGE_DIR_PATH = SAVED_DATA_DIR_PATH / "images"
 SAVED_DATA_PATH = SAVED_DATA_DIR_PATH / "saved_data.json"
+SAVED_DB_PATH = SAVED_DATA_DIR_PATH / "hordeqt.sqlite3"
 CACHE_PATH = Path(
     QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation)
 )
@@ -1,17 +1,79 @@
+from __future__ import annotations
+
 import json
 import re
+from dataclasses import dataclass
 from enum import IntEnum, auto
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from PIL import Image
 from PIL.ExifTags import Base
 
-from hordeqt.classes.Job import Job
-from hordeqt.classes.LocalJob import LocalJob
+# NOTE: The import process pool runs get_job_config in worker processes. Job and LocalJob pull in hordeqt.other.consts, which creates the QApplication, so they're only imported where they're used.
+if TYPE_CHECKING:
+    from hordeqt.classes.Job import Job
+    from hordeqt.classes.LocalJob import LocalJob
+
+
+@dataclass(frozen=True)
+class ImageMetadata:
+    """The parts of an image's header that any of the formats keep generation data in. Read once, then shared by every parser."""
+
+    # EXIF (JPEG, WebP, and PNG eXIf chunks)
+    software: str = ""
+    description: Optional[str] = None
+    description_json: Optional[dict] = None
+    # PNG text chunks
+    info_software: Optional[str] = None
+    comment: Optional[str] = None
+    comment_json: Optional[dict] = None
+
+
+def _try_json(s: Optional[str]) -> Optional[dict]:
+    if s is None:
+        return None
+    try:
+        j = json.loads(s)
+    except ValueError:
+        return None
+    return j if isinstance(j, dict) else None
 
 
-def _artbot(img: Image.Image):
-    lines = str(img.info.get("Comment", "")).strip().splitlines()
+def _read_exif(img: Image.Image) -> Image.Exif:
+    # img.getexif() would do, but a PNG without an eXIf chunk is fully decoded looking for one after the pixel data.
+    exif = Image.Exif()
+    raw = img.info.get("exif")
+    if raw is None and "Raw profile type exif" in img.info:
+        raw = bytes.fromhex("".join(img.info["Raw profile type exif"].split("\n")[3:]))
+    if raw:
+        try:
+            exif.load(raw)
+        except Exception:
+            # A broken EXIF block is treated as no EXIF block.
+            return Image.Exif()
+    return exif
+
+
+def read_metadata(img: Image.Image) -> ImageMetadata:
+    """Read the metadata of an opened image, without decoding the pixels."""
+    e = _read_exif(img)
+    desc = e.get(Base.ImageDescription)
+    desc = str(desc) if desc is not None else None
+    sw = img.info.get("Software")
+    comment = img.info.get("Comment")
+    comment = str(comment) if comment is not None else None
+    return ImageMetadata(
+        software=str(e.get(Base.Software, "")),
+        description=desc,
+        description_json=_try_json(desc),
+        info_software=str(sw) if sw is not None else None,
+        comment=comment,
+        comment_json=_try_json(comment),
+    )
+
+
+def _artbot(meta: ImageMetadata):
+    lines = (meta.comment or "").strip().splitlines()
 
     prompt = lines[0].strip()
     param_line = 1
@@ -40,12 +102,10 @@ def _artbot(img: Image.Image):
     return output_dict
 
 
-def _hordeng(img: Image.Image):
-    e = img.getexif()
-    desc = e.get(Base.ImageDescription.value, None)
-    if desc is not None:
+def _hordeng(meta: ImageMetadata):
+    j = meta.description_json
+    if j is not None:
         try:
-            j: dict = json.loads(desc)
             return {
                 "prompt": j.get("prompt", ""),
                 "negative_prompt": j.get("negative_prompt", ""),
@@ -60,9 +120,6 @@ def _hordeng(img: Image.Image):
                 "hires_fix": j.get("highresFix", False),
             }
 
-        except json.JSONDecodeError:
-            # Canary
-            raise ValueError("Invalid HordeNG jpeg")
         except KeyError:
             raise ValueError("Invalid HordeNG jpg")
 
@@ -113,9 +170,8 @@ def _from_nai_prompt(prompt: str):
     return process_weight(cleaned_description)
 
 
-def _nai_png(img: Image.Image):
-    line = str(img.info.get("Comment", "")).strip()
-    j: dict = json.loads(line)
+def _nai_png(meta: ImageMetadata):
+    j = meta.comment_json or {}
     return {
         "prompt": _from_nai_prompt(j.get("prompt", "")),
         "negative_prompt": _from_nai_prompt(j.get("uc", "")),
@@ -127,9 +183,8 @@ def _nai_png(img: Image.Image):
     }
 
 
-def _hordeqt_image(img: Image.Image):
-    exif = img.getexif()
-    d = json.loads(exif[Base.ImageDescription])["job"]
+def _hordeqt_image(meta: ImageMetadata):
+    d = (meta.description_json or {})["job"]
     k = d.get("prompt").split("###")
     params = d.get("params", {})
     prompt = "Error while formatting prompt"
@@ -146,7 +201,7 @@ def _hordeqt_image(img: Image.Image):
         "sampler_name": params.get("sampler_name", "k_euler"),
         "cfg_scale": params.get("cfg_scale", 5),
         "seed": int(params.get("seed", 0)),
-        "model": d.get("Model")[0],
+        "model": d.get("models", [None])[0],
         "clip_skip": int(params.get("clip_skip", 1)),
         "steps": params.get("steps", 20),
         "width": params.get("width", 1024),
@@ -163,45 +218,43 @@ class ImageType(IntEnum):
     HORDEQT = auto()
 
 
-def detect_format(img: Image.Image) -> Optional[ImageType]:
-    e = img.getexif()
-    desc = e.get(Base.ImageDescription.value, None)
-    if desc is not None:
-        try:
-            json.loads(desc)
-            return ImageType.HORDENG_JPG
-        except:
-            pass
-    sw = e[Base.Software]
-    if "hordeqt" in sw:
+def detect_format(meta: ImageMetadata) -> Optional[ImageType]:
+    # HordeQt's own metadata is JSON too, so it has to be checked for before HordeNG's.
+    if "hordeqt" in meta.software.lower():
         return ImageType.HORDEQT
-    i = img.info
-    if (sw := i.get("Software", None)) is not None:
-        if "artbot" in str(sw).lower():
-            return ImageType.ARTBOT
-    if (comm := i.get("Comment", None)) is not None:
-        try:
-            json.loads(comm)
-            return ImageType.NAI_PNG
-        except:
-            pass
+    if meta.description_json is not None:
+        return ImageType.HORDENG_JPG
+    if meta.info_software is not None and "artbot" in meta.info_software.lower():
+        return ImageType.ARTBOT
+    if meta.comment_json is not None:
+        return ImageType.NAI_PNG
+    return None
 
 
-def get_data(img: Image.Image):
-    img_format = detect_format(img)
-    match img_format:
-        case ImageType.HORDENG_JPG:
-            return _hordeng(img)
-        case ImageType.ARTBOT:
-            return _artbot(img)
-        case ImageType.NAI_PNG:
-            return _nai_png(img)
-        case ImageType.HORDEQT:
-            return _hordeqt_image(img)
+def get_data(meta: ImageMetadata) -> Optional[dict]:
+    img_format = detect_format(meta)
+    try:
+        match img_format:
+            case ImageType.HORDENG_JPG:
+                return _hordeng(meta)
+            case ImageType.ARTBOT:
+                return _artbot(meta)
+            case ImageType.NAI_PNG:
+                return _nai_png(meta)
+            case ImageType.HORDEQT:
+                return _hordeqt_image(meta)
+    except (ValueError, KeyError, IndexError, TypeError, AttributeError):
+        # The metadata looked like the format, but wasn't quite.
+        return None
+    return None
 
 
 def get_job_config(img: Image.Image) -> Optional[dict]:
-    d = get_data(img)
+    return get_job_config_from_metadata(read_metadata(img))
+
+
+def get_job_config_from_metadata(meta: ImageMetadata) -> Optional[dict]:
+    d = get_data(meta)
     if d is not None:
         try:
             return {
@@ -214,7 +267,7 @@ def get_job_config(img: Image.Image) -> Optional[dict]:
                 "height": d.get("height", 1024),
                 "clip_skip": d.get("clip_skip", 1),
                 "steps": d.get("steps", 20),
-                "model": d.get("Model"),
+                "model": d.get("model"),
                 "images": 1,
                 "hires_fix": d.get("hires_fix", True),
                 "karras": d.get("karras", True),
@@ -226,7 +279,12 @@ def get_job_config(img: Image.Image) -> Optional[dict]:
 
 
 def get_job(img: Image.Image) -> Optional[Job]:
-    j = get_job_config(img)
+    return job_from_config(get_job_config(img))
+
+
+def job_from_config(j: Optional[dict]) -> Optional[Job]:
+    from hordeqt.classes.Job import Job
+
     if j is not None:
         try:
             return Job(
@@ -246,6 +304,8 @@ def get_job(img: Image.Image) -> Optional[Job]:
 
 
 def get_local_job(img: Image.Image) -> Optional[LocalJob]:
+    from hordeqt.classes.LocalJob import LocalJob
+
     j = get_job(img)
     if j is not None:
         try:
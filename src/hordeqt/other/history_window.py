@@ -0,0 +1,26 @@
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class HistoryWindow:
+    """How much finished work is kept at hand: the newest count entries, none older than max_age seconds (0 for any age)."""
+
+    count: int = 200
+    max_age: float = 0
+
+    def keep(
+        self,
+        items: List[T],
+        timestamp: Callable[[T], float],
+        now: Optional[float] = None,
+    ) -> List[T]:
+        """The items inside the window, from items in the order they were added. Only the last count items are looked at."""
+        kept = items[-self.count :] if self.count > 0 else []
+        if self.max_age > 0:
+            cutoff = (time.time() if now is None else now) - self.max_age
+            kept = [item for item in kept if timestamp(item) >= cutoff]
+        return kept
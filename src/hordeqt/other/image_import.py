@@ -0,0 +1,95 @@
+import datetime as dt
+import os
+import shutil
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from PIL import Image
+
+from hordeqt.other.format_loader import get_job_config
+
+# NOTE: This module is run inside worker processes. It must not import anything that pulls in hordeqt.other.consts, as that creates the QApplication.
+
+IMPORT_SUFFIXES = {".png", ".jpeg", ".jpg", ".webp"}
+
+# A file to import: (path on disk, or the zip file it's in, name inside the zip or None)
+ImportSource = Tuple[str, Optional[str]]
+
+
+def find_import_sources(paths: List[str]) -> Iterator[ImportSource]:
+    """Every image in paths, looking inside folders (recursively) and zip files."""
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, _, filenames in os.walk(path):
+                for name in sorted(filenames):
+                    full = os.path.join(dirpath, name)
+                    if Path(name).suffix.lower() in IMPORT_SUFFIXES:
+                        yield full, None
+                    elif zipfile.is_zipfile(full):
+                        yield from _zip_sources(full)
+        elif Path(path).suffix.lower() in IMPORT_SUFFIXES:
+            yield path, None
+        elif zipfile.is_zipfile(path):
+            yield from _zip_sources(path)
+
+
+def _zip_sources(path: str) -> Iterator[ImportSource]:
+    with zipfile.ZipFile(path) as zf:
+        for info in zf.infolist():
+            if (
+                not info.is_dir()
+                and Path(info.filename).suffix.lower() in IMPORT_SUFFIXES
+            ):
+                yield path, info.filename
+
+
+def _place_file(source: ImportSource, dst: str):
+    path, member = source
+    if member is None:
+        try:
+            # No copy at all when the library is on the same filesystem.
+            os.link(path, dst)
+        except OSError:
+            shutil.copy2(path, dst)
+        return
+    fd, tmp_name = tempfile.mkstemp(prefix=".import-", dir=os.path.dirname(dst))
+    try:
+        with os.fdopen(fd, "wb") as f, zipfile.ZipFile(path) as zf:
+            with zf.open(member) as src:
+                shutil.copyfileobj(src, f)
+        os.replace(tmp_name, dst)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+def _read_config(im: Image.Image) -> Optional[dict]:
+    try:
+        return get_job_config(im)
+    except Exception:
+        # The metadata was written by other programs, so it can be wrong in any number of ways.
+        return None
+
+
+def import_image(source: ImportSource, dst: str) -> Optional[Tuple[dict, float]]:
+    """Read the generation metadata from source and, if there is any, put the file at dst.
+
+    Returns the job config and when the image was made, or None if the image has no metadata HordeQt can read. Only headers are read, the pixels are never decoded.
+    """
+    path, member = source
+    if member is None:
+        with Image.open(path) as im:
+            config = _read_config(im)
+        mtime = os.stat(path).st_mtime
+    else:
+        with zipfile.ZipFile(path) as zf, zf.open(member) as f:
+            with Image.open(f) as im:
+                config = _read_config(im)
+            mtime = dt.datetime(*zf.getinfo(member).date_time).timestamp()
+    if config is None:
+        return None
+    _place_file(source, dst)
+    return config, mtime
@@ -0,0 +1,97 @@
+import threading
+from enum import StrEnum
+from pathlib import Path
+from typing import Optional, Set
+
+from hordeqt.other.consts import SAVED_IMAGE_DIR_PATH
+
+
+class ImageLayout(StrEnum):
+    # Every image directly in the image directory.
+    FLAT = "flat"
+    # In a subdirectory named after the first two characters of the id, like the cache's buckets.
+    SHARDED = "sharded"
+
+
+# Records which layout every file is in, so the directory describes itself even without the save file.
+# While files are being moved it says "mixed", so an interrupted move is picked up again on the next launch.
+_LAYOUT_MARKER = SAVED_IMAGE_DIR_PATH / ".layout"
+_MIXED = "mixed"
+
+_made_dirs: Set[Path] = set()
+_made_dirs_lock = threading.Lock()
+
+
+def _read_marker() -> Optional[ImageLayout]:
+    try:
+        text = _LAYOUT_MARKER.read_text().strip()
+    except OSError:
+        # Libraries from before layouts existed are flat.
+        return ImageLayout.FLAT
+    return None if text == _MIXED else ImageLayout(text)
+
+
+# The layout new and moved files go in, and the one every file is known to be in (None if they might be in either).
+_on_disk = _read_marker()
+_target = _on_disk or ImageLayout.FLAT
+
+
+def image_path(job_id: str, file_type: str, layout: ImageLayout) -> Path:
+    name = f"{job_id}.{file_type}"
+    if layout == ImageLayout.FLAT:
+        return SAVED_IMAGE_DIR_PATH / name
+    return SAVED_IMAGE_DIR_PATH / job_id[:2] / name
+
+
+def ensure_parent(path: Path):
+    # At most one mkdir per shard, update_path runs for every job on startup.
+    if path.parent not in _made_dirs:
+        with _made_dirs_lock:
+            path.parent.mkdir(exist_ok=True)
+            _made_dirs.add(path.parent)
+
+
+def locate_image(job_id: str, file_type: str) -> Path:
+    """Where the image for job_id is, or where a new one should be saved.
+
+    While files are being moved, one could be in any layout, so each is checked. Otherwise this doesn't touch the disk.
+    """
+    path = image_path(job_id, file_type, _target)
+    if _on_disk == _target or path.exists():
+        ensure_parent(path)
+        return path
+    for layout in ImageLayout:
+        if (
+            layout != _target
+            and (old := image_path(job_id, file_type, layout)).exists()
+        ):
+            return old
+    ensure_parent(path)
+    return path
+
+
+def target_layout() -> ImageLayout:
+    return _target
+
+
+def migration_pending() -> bool:
+    return _on_disk != _target
+
+
+def set_target_layout(layout: ImageLayout):
+    global _target, _on_disk
+    if layout == _target:
+        return
+    _target = layout
+    # Empty shards are removed after moving back to flat, so they can't be assumed to still be there.
+    with _made_dirs_lock:
+        _made_dirs.clear()
+    if _on_disk is not None and _on_disk != layout:
+        _LAYOUT_MARKER.write_text(_MIXED)
+        _on_disk = None
+
+
+def mark_migrated(layout: ImageLayout):
+    global _on_disk
+    _LAYOUT_MARKER.write_text(layout)
+    _on_disk = layout
@@ -0,0 +1,106 @@
+from pathlib import Path
+from typing import Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+import numpy as np
+from PIL import Image
+
+K = TypeVar("K", bound=Hashable)
+
+_DCT_SIZE = 32
+_HASH_SIZE = 8
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    # Orthonormal DCT-II, so a 2D DCT is just M @ X @ M.T
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    m = np.sqrt(2 / n) * np.cos(np.pi * (2 * i + 1) * k / (2 * n))
+    m[0] /= np.sqrt(2)
+    return m
+
+
+_DCT = _dct_matrix(_DCT_SIZE)
+
+
+def phash_pixels(pixels: np.ndarray) -> int:
+    """64 bit perceptual hash of a 32x32 grayscale image."""
+    dct = _DCT @ pixels @ _DCT.T
+    low = dct[:_HASH_SIZE, :_HASH_SIZE].ravel()
+    # The DC term is just the average brightness, so it's left out of the median.
+    bits = low > np.median(low[1:])
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def phash_image(path: Path) -> int:
+    with Image.open(path) as im:
+        # Lets JPEGs decode at a fraction of their size, other formats ignore it.
+        im.draft("L", (_DCT_SIZE * 2, _DCT_SIZE * 2))
+        small = im.convert("L").resize(
+            (_DCT_SIZE, _DCT_SIZE), Image.Resampling.BILINEAR, reducing_gap=2.0
+        )
+    return phash_pixels(np.asarray(small, dtype=np.float64))
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class BKTree(Generic[K]):
+    """BK-tree over 64 bit hashes, for finding everything within a Hamming distance without comparing every pair."""
+
+    def __init__(self) -> None:
+        # node: (hash, keys with that hash, children by distance)
+        self.root: Optional[Tuple[int, List[K], Dict[int, tuple]]] = None
+
+    def add(self, h: int, key: K):
+        if self.root is None:
+            self.root = (h, [key], {})
+            return
+        node = self.root
+        while True:
+            d = hamming(h, node[0])
+            if d == 0:
+                node[1].append(key)
+                return
+            if d not in node[2]:
+                node[2][d] = (h, [key], {})
+                return
+            node = node[2][d]
+
+    def search(self, h: int, max_distance: int) -> List[Tuple[int, K]]:
+        found: List[Tuple[int, K]] = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node_hash, keys, children = stack.pop()
+            d = hamming(h, node_hash)
+            if d <= max_distance:
+                found.extend((d, key) for key in keys)
+            # Triangle inequality: only children between d - max and d + max can hold matches.
+            for child_d, child in children.items():
+                if d - max_distance <= child_d <= d + max_distance:
+                    stack.append(child)
+        return found
+
+
+def find_clusters(hashes: Dict[K, int], max_distance: int) -> List[List[K]]:
+    """Group keys whose hashes are within max_distance of each other (transitively). Only groups of 2 or more are returned, biggest first."""
+    tree: BKTree[K] = BKTree()
+    for key, h in hashes.items():
+        tree.add(h, key)
+    parent: Dict[K, K] = {key: key for key in hashes}
+
+    def find(key: K) -> K:
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    for key, h in hashes.items():
+        for _, other in tree.search(h, max_distance):
+            a, b = find(key), find(other)
+            if a != b:
+                parent[b] = a
+    groups: Dict[K, List[K]] = {}
+    for key in hashes:
+        groups.setdefault(find(key), []).append(key)
+    return sorted((g for g in groups.values() if len(g) > 1), key=len, reverse=True)
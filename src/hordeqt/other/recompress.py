@@ -0,0 +1,61 @@
+import os
+import tempfile
+from pathlib import Path
+from typing import Tuple
+
+from PIL import Image
+
+# NOTE: This module is run inside worker processes. It must not import anything that pulls in hordeqt.other.consts, as that creates the QApplication.
+
+RECOMPRESS_CODECS = ["webp", "jpeg", "png"]
+
+
+def _save_kwargs(codec: str, quality: int) -> dict:
+    match codec:
+        case "webp":
+            return {"format": "WEBP", "quality": quality, "method": 6}
+        case "jpeg":
+            return {"format": "JPEG", "quality": quality, "optimize": True}
+        case "png":
+            return {"format": "PNG", "optimize": True, "compress_level": 9}
+    raise ValueError(f"Unsupported codec: {codec}")
+
+
+def recompress_image(
+    src: str, dst: str, codec: str, quality: int
+) -> Tuple[int, int, bool]:
+    """Re-encode src as codec, writing the result atomically to dst.
+
+    Returns (old size, new size, replaced). If the re-encoded file isn't smaller, nothing is written and replaced is False.
+    """
+    old_size = os.stat(src).st_size
+    with Image.open(src) as im:
+        exif = im.getexif()
+        icc_profile = im.info.get("icc_profile")
+        im.load()
+        if codec == "jpeg" and im.mode not in ("RGB", "L"):
+            im = im.convert("RGB")
+        kwargs = _save_kwargs(codec, quality)
+        if len(exif) > 0:
+            kwargs["exif"] = exif
+        if icc_profile is not None:
+            kwargs["icc_profile"] = icc_profile
+        # Write next to the destination, so that the final rename can't cross filesystems.
+        fd, tmp_name = tempfile.mkstemp(
+            prefix=".recompress-", suffix="." + codec, dir=Path(dst).parent
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                im.save(f, **kwargs)
+                f.flush()
+                os.fsync(f.fileno())
+            new_size = os.stat(tmp_name).st_size
+            if new_size >= old_size:
+                os.unlink(tmp_name)
+                return (old_size, old_size, False)
+            os.replace(tmp_name, dst)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+    return (old_size, new_size, True)
@@ -0,0 +1,96 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import requests
+
+
+def _write_atomic(path: Path, data: bytes):
+    os.makedirs(path.parent, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+class ReferenceCache:
+    """A JSON file downloaded from url and kept at path.
+
+    The parsed copy is shared with everything that asks for it, so don't change it. Once the copy on disk is older than max_age, it's revalidated with the ETag and Last-Modified of the last download, so an unchanged file isn't downloaded again.
+    """
+
+    def __init__(self, url: str, path: Path, max_age: float = 60 * 60) -> None:
+        self.url = url
+        self.path = path
+        self.max_age = max_age
+        self.meta_path = path.with_name(path.name + ".meta")
+        self.lock = threading.Lock()
+        self.data: Any = None
+
+    def cached(self) -> Optional[Any]:
+        """The parsed copy, read from disk the first time. None if there isn't a readable one, however old."""
+        with self.lock:
+            if self.data is None:
+                try:
+                    with open(self.path, "rt") as f:
+                        self.data = json.load(f)
+                except (OSError, ValueError):
+                    return None
+            return self.data
+
+    def is_fresh(self) -> bool:
+        try:
+            return time.time() - self.path.stat().st_mtime < self.max_age
+        except OSError:
+            return False
+
+    def validators(self) -> Dict[str, str]:
+        """Headers asking for the file only if it changed since the copy on disk."""
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.meta_path, "rt") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        headers = {}
+        if etag := meta.get("etag"):
+            headers["If-None-Match"] = etag
+        if last_modified := meta.get("last_modified"):
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def revalidate(self) -> bool:
+        """Check the file with the server, storing it if it changed. True if there's new data."""
+        r = requests.get(self.url, headers=self.validators(), timeout=30)
+        if r.status_code == 304:
+            # Unchanged, so the copy on disk is good for another max_age.
+            os.utime(self.path)
+            return False
+        r.raise_for_status()
+        data = r.json()
+        self.store(
+            r.content,
+            data,
+            {
+                "etag": r.headers.get("ETag"),
+                "last_modified": r.headers.get("Last-Modified"),
+            },
+        )
+        return True
+
+    def store(self, content: bytes, data: Any, meta: Dict[str, Optional[str]]):
+        # The data first, so a crash in between only leaves validators that don't match, and the next check downloads it again.
+        _write_atomic(self.path, content)
+        _write_atomic(self.meta_path, json.dumps(meta).encode())
+        with self.lock:
+            self.data = data
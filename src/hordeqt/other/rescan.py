@@ -1,39 +1,77 @@
 import os
 from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 
 from PIL import Image
 
-from hordeqt.classes.LocalJob import LocalJob
+from hordeqt.classes.ImageIndex import FileStamp
+from hordeqt.classes.LocalJob import LocalJob, read_metadata_from_image
 from hordeqt.other.consts import LOGGER, SAVED_IMAGE_DIR_PATH
-from hordeqt.other.format_loader import get_local_job
-
-
-def _get_possible_path(base: Path):
-    suffixes = [".png", ".jpeg", ".jpg", ".webp"]
-    for suffix in suffixes:
-        if (t := base.with_suffix(suffix)).exists():
-            return t
-
-
-def rescan_jobs(current_jobs: list[LocalJob]):
-    saved_images = os.listdir(SAVED_IMAGE_DIR_PATH)
-    saved_id_set = set([(SAVED_IMAGE_DIR_PATH / x).stem for x in saved_images])
-    curr_known_saved_images = set([job.id for job in current_jobs])
-    unknown_images = list(saved_id_set - curr_known_saved_images)
-    new_data = current_jobs
-    for img_id in unknown_images:
-        base = (SAVED_IMAGE_DIR_PATH / img_id).resolve()
-        possible_path = _get_possible_path(base)
-        if possible_path is None:
-            # we will continue to try to scan for this and fail every time, but I'm not sure if there's an elegant way to solve it (non-destructively)
-            LOGGER.warning(f'Unknown or invalid file in image directory: "{base}"')
+
+IMAGE_SUFFIXES = {".png", ".jpeg", ".jpg", ".webp"}
+
+
+def _image_files(image_dir: Path) -> Iterator[Tuple[str, os.DirEntry]]:
+    # (name relative to image_dir, entry), looking one level into subdirectories for the sharded layout.
+    with os.scandir(image_dir) as it:
+        for entry in it:
+            # Dotfiles are temporaries, like the ones recompression writes before renaming.
+            if entry.name.startswith("."):
+                continue
+            if entry.is_file():
+                yield entry.name, entry
+            elif entry.is_dir():
+                with os.scandir(entry.path) as sub:
+                    for sub_entry in sub:
+                        if not sub_entry.name.startswith(".") and sub_entry.is_file():
+                            yield f"{entry.name}/{sub_entry.name}", sub_entry
+
+
+def find_unknown_files(
+    known_ids: Set[str],
+    scanned: Dict[str, Tuple[FileStamp, Optional[str]]],
+    image_dir: Path = SAVED_IMAGE_DIR_PATH,
+) -> Tuple[List[Tuple[Path, FileStamp]], List[str]]:
+    """Files in image_dir that aren't a known job and have changed since they were last scanned, and the names of scanned files that are gone.
+
+    Only unknown files are stat'd, so this is one directory listing (per shard) when nothing's been added.
+    """
+    unknown: List[Tuple[Path, FileStamp]] = []
+    present: Set[str] = set()
+    for name, entry in _image_files(image_dir):
+        stem, _ = os.path.splitext(entry.name)
+        if stem in known_ids:
             continue
-        possible_path = possible_path.resolve()
-        local_job = get_local_job(Image.open(possible_path))
-        if local_job is not None:
-            new_data.append(local_job)
-        else:
-            LOGGER.warning(
-                f'Unknown or invalid image type in image directory: "{str(possible_path)}"'
-            )
-    return new_data
+        present.add(name)
+        st = entry.stat()
+        stamp = (st.st_size, st.st_mtime_ns, st.st_ino)
+        previous = scanned.get(name)
+        # Files that couldn't be loaded stay that way until they change.
+        if previous is not None and previous == (stamp, None):
+            continue
+        unknown.append((Path(entry.path), stamp))
+    return unknown, [name for name in scanned if name not in present]
+
+
+def find_missing_files(
+    file_names: Dict[str, str], image_dir: Path = SAVED_IMAGE_DIR_PATH
+) -> List[str]:
+    """The ids in file_names (id -> file name) whose file isn't in image_dir, from one directory listing (per shard) rather than a stat each."""
+    present = {entry.name for _, entry in _image_files(image_dir)}
+    return [job_id for job_id, name in file_names.items() if name not in present]
+
+
+def load_image_file(path: Path) -> Optional[LocalJob]:
+    if path.suffix.lower() not in IMAGE_SUFFIXES:
+        return None
+    try:
+        lj = read_metadata_from_image(path)
+    except (OSError, Image.UnidentifiedImageError) as e:
+        LOGGER.debug(f'Couldn\'t open "{path}": {e}')
+        return None
+    if lj is not None:
+        # The job gets a new id, point it at the file it came from instead. LocalJob.deserialize takes the id from the Job.
+        lj.id = lj.original.job_id = path.stem
+        lj.file_type = path.suffix[1:]
+        lj.update_path()
+    return lj
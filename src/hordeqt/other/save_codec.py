@@ -0,0 +1,337 @@
+import gzip
+import lzma
+import struct
+import zlib
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Dict, List, Optional, Tuple
+
+# NOTE: Keep this free of Qt and hordeqt.other.consts, the benchmark and the tests use it on its own.
+
+MAGIC = b"HQS"
+FORMAT_VERSION = 1
+
+
+class Compression(IntEnum):
+    NONE = 0
+    ZLIB = 1
+    GZIP = 2
+    LZMA = 3
+
+
+@dataclass(frozen=True)
+class Schema:
+    """The fields of one kind of serialized dict, stored by position so the keys aren't repeated.
+
+    Schemas are append only. If a serialize method changes shape, keys a schema doesn't know still round trip (as extras), and a new schema needs a new id so old data keeps decoding.
+    """
+
+    id: int
+    fields: Tuple[str, ...]
+    # Field -> schema of the dict in it, or of every dict in the list in it.
+    children: Dict[str, "Schema"] = field(default_factory=dict)
+
+
+# The LoRAs in a Job, as LoRA.to_job_format makes them
+JOB_LORA = Schema(
+    4, ("name", "model", "clip", "is_version", "_hordeqt_name", "inject_trigger")
+)
+JOB_PARAMS = Schema(
+    3,
+    (
+        "sampler_name",
+        "cfg_scale",
+        "seed",
+        "height",
+        "width",
+        "post_processing",
+        "karras",
+        "hires_fix",
+        "clip_skip",
+        "steps",
+        "n",
+        "loras",
+    ),
+    {"loras": JOB_LORA},
+)
+# Job.serialize
+JOB = Schema(
+    1,
+    (
+        "prompt",
+        "params",
+        "nsfw",
+        "trusted_workers",
+        "slow_workers",
+        "censor_nsfw",
+        "models",
+        "r2",
+        "shared",
+        "replacement_filter",
+        "dry_run",
+        "done",
+        "faulted",
+        "kudos",
+        "id",
+        "horde_job_id",
+        "queue_position",
+        "wait_time",
+        "mod_time",
+        "creation_time",
+    ),
+    {"params": JOB_PARAMS},
+)
+# LocalJob.serialize
+LOCAL_JOB = Schema(
+    2,
+    (
+        "id",
+        "original",
+        "fileType",
+        "path",
+        "completed_at",
+        "worker_id",
+        "worker_name",
+    ),
+    {"original": JOB},
+)
+STYLE_LORA = Schema(6, ("name", "is_version", "strength", "clip_strength"))
+# Style.serialize
+STYLE = Schema(
+    5,
+    (
+        "name",
+        "prompt_format",
+        "model",
+        "width",
+        "height",
+        "cfg_scale",
+        "karras",
+        "sampler",
+        "steps",
+        "clip_skip",
+        "hires_fix",
+        "loras",
+    ),
+    {"loras": STYLE_LORA},
+)
+
+_SCHEMAS: Dict[int, Schema] = {
+    s.id: s for s in (JOB, LOCAL_JOB, JOB_PARAMS, JOB_LORA, STYLE, STYLE_LORA)
+}
+
+# Value tags
+_NONE = 0
+_FALSE = 1
+_TRUE = 2
+_INT = 3
+_FLOAT = 4
+_STR = 5
+_LIST = 6
+_DICT = 7
+_RECORD = 8
+_MISSING = 9
+_STR_REF = 10
+_BYTES = 11
+
+_CONSTANTS = (None, False, True)
+_DOUBLE = struct.Struct("<d")
+
+
+class _Encoder:
+    def __init__(self) -> None:
+        self.out = bytearray()
+        # Each distinct string is written once, after that by its index.
+        self.strings: Dict[str, int] = {}
+
+    def varint(self, n: int):
+        while n >= 0x80:
+            self.out.append((n & 0x7F) | 0x80)
+            n >>= 7
+        self.out.append(n)
+
+    def value(self, v: Any, schema: Optional[Schema] = None):
+        out = self.out
+        if v is None:
+            out.append(_NONE)
+        elif v is True:
+            out.append(_TRUE)
+        elif v is False:
+            out.append(_FALSE)
+        elif isinstance(v, int):
+            out.append(_INT)
+            # Zigzag, so small negative numbers are small too.
+            self.varint((v << 1) if v >= 0 else ((-v << 1) - 1))
+        elif isinstance(v, float):
+            out.append(_FLOAT)
+            out += _DOUBLE.pack(v)
+        elif isinstance(v, str):
+            if (ref := self.strings.get(v)) is not None:
+                out.append(_STR_REF)
+                self.varint(ref)
+            else:
+                self.strings[v] = len(self.strings)
+                b = v.encode()
+                out.append(_STR)
+                self.varint(len(b))
+                out += b
+        elif isinstance(v, dict):
+            if schema is not None:
+                self.record(v, schema)
+            else:
+                out.append(_DICT)
+                self.varint(len(v))
+                for k, item in v.items():
+                    self.value(str(k))
+                    self.value(item)
+        elif isinstance(v, (list, tuple)):
+            out.append(_LIST)
+            self.varint(len(v))
+            for item in v:
+                self.value(item, schema)
+        elif isinstance(v, (bytes, bytearray)):
+            out.append(_BYTES)
+            self.varint(len(v))
+            out += v
+        else:
+            raise TypeError(f"Can't encode {type(v).__name__}")
+
+    def record(self, d: dict, schema: Schema):
+        self.out.append(_RECORD)
+        self.varint(schema.id)
+        for name in schema.fields:
+            if name in d:
+                self.value(d[name], schema.children.get(name))
+            else:
+                self.out.append(_MISSING)
+        extras = {k: v for k, v in d.items() if k not in schema.fields}
+        self.value(extras or None)
+
+
+class _Decoder:
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.pos = 0
+        self.strings: List[str] = []
+
+    def varint(self) -> int:
+        data = self.data
+        n = data[self.pos]
+        self.pos += 1
+        if n < 0x80:
+            return n
+        n &= 0x7F
+        shift = 7
+        while True:
+            b = data[self.pos]
+            self.pos += 1
+            n |= (b & 0x7F) << shift
+            if b < 0x80:
+                return n
+            shift += 7
+
+    def value(self) -> Any:
+        # Most frequent tags first, this is the hot loop when loading the image index.
+        data = self.data
+        tag = data[self.pos]
+        self.pos += 1
+        if tag == _STR_REF:
+            return self.strings[self.varint()]
+        if tag <= _TRUE:
+            return _CONSTANTS[tag]
+        if tag == _STR:
+            size = self.varint()
+            start = self.pos
+            self.pos += size
+            s = data[start : self.pos].decode()
+            self.strings.append(s)
+            return s
+        if tag == _INT:
+            n = self.varint()
+            return (n >> 1) if not n & 1 else -((n + 1) >> 1)
+        if tag == _RECORD:
+            schema = _SCHEMAS[self.varint()]
+            d = {}
+            for name in schema.fields:
+                if data[self.pos] == _MISSING:
+                    self.pos += 1
+                else:
+                    d[name] = self.value()
+            if (extras := self.value()) is not None:
+                d.update(extras)
+            return d
+        if tag == _FLOAT:
+            (f,) = _DOUBLE.unpack_from(data, self.pos)
+            self.pos += 8
+            return f
+        if tag == _LIST:
+            return [self.value() for _ in range(self.varint())]
+        if tag == _DICT:
+            n = self.varint()
+            d = {}
+            for _ in range(n):
+                k = self.value()
+                d[k] = self.value()
+            return d
+        if tag == _BYTES:
+            size = self.varint()
+            start = self.pos
+            self.pos += size
+            return data[start : self.pos]
+        raise ValueError(f"Unknown tag {tag} at {self.pos - 1}")
+
+
+def _compress(payload: bytes, compression: Compression, level: Optional[int]) -> bytes:
+    match compression:
+        case Compression.NONE:
+            return payload
+        case Compression.ZLIB:
+            return zlib.compress(payload, 6 if level is None else level)
+        case Compression.GZIP:
+            return gzip.compress(payload, 9 if level is None else level, mtime=0)
+        case Compression.LZMA:
+            return lzma.compress(payload, preset=6 if level is None else level)
+
+
+def _decompress(payload: bytes, compression: Compression) -> bytes:
+    match compression:
+        case Compression.NONE:
+            return payload
+        case Compression.ZLIB:
+            return zlib.decompress(payload)
+        case Compression.GZIP:
+            return gzip.decompress(payload)
+        case Compression.LZMA:
+            return lzma.decompress(payload)
+
+
+def encode(
+    value: Any,
+    schema: Optional[Schema] = None,
+    compression: Compression = Compression.NONE,
+    level: Optional[int] = None,
+) -> bytes:
+    """Encode JSON-like data (plus bytes). Dicts shaped like schema, or lists of them, are stored by position.
+
+    Payloads that compression wouldn't make smaller are stored uncompressed.
+    """
+    enc = _Encoder()
+    enc.value(value, schema)
+    payload = bytes(enc.out)
+    compressed = _compress(payload, compression, level)
+    if len(compressed) >= len(payload):
+        compression, compressed = Compression.NONE, payload
+    return MAGIC + bytes((FORMAT_VERSION, compression)) + compressed
+
+
+def decode(data: bytes) -> Any:
+    if data[:3] != MAGIC:
+        raise ValueError("Not HordeQt save data")
+    version, compression = data[3], Compression(data[4])
+    if version > FORMAT_VERSION:
+        raise ValueError(f"Save data is from a newer HordeQt (format {version})")
+    return _Decoder(_decompress(data[5:], compression)).value()
+
+
+def is_encoded(data: Any) -> bool:
+    return isinstance(data, bytes) and data[:3] == MAGIC
@@ -0,0 +1,76 @@
+import os
+import tempfile
+from pathlib import Path
+from typing import List
+
+from PIL import Image
+from PySide6.QtGui import QImage
+
+from hordeqt.other.util import get_bucketized_cache_path
+
+THUMBNAIL_SIZE = 512
+
+
+def get_thumbnail_cache_path(path: Path, size: int) -> Path:
+    st = os.stat(path)
+    # mtime and size are part of the key, so a changed image never hits a stale thumbnail.
+    # The file name (the job id) is unique on its own, so thumbnails survive the image moving to another layout.
+    key = f"{Path(path).name}:{st.st_mtime_ns}:{st.st_size}:{size}"
+    return get_bucketized_cache_path(key, "thumbnails").with_suffix(".webp")
+
+
+def thumbnail_paths(path: Path) -> List[Path]:
+    """Where the thumbnails of the image at path are cached. They're keyed on its size and mtime, so find them before it changes."""
+    try:
+        return [get_thumbnail_cache_path(path, THUMBNAIL_SIZE)]
+    except OSError:
+        return []
+
+
+def remove_thumbnails(paths: List[Path]):
+    for p in paths:
+        p.unlink(missing_ok=True)
+
+
+def _create_thumbnail(path: Path, dest: Path, size: int) -> Image.Image:
+    with Image.open(path) as im:
+        # reducing_gap lets PIL decode at reduced scale (draft/reduce) before the final resample.
+        im.thumbnail((size, size), Image.Resampling.LANCZOS, reducing_gap=2.0)
+        if im.mode not in ("RGB", "RGBA"):
+            im = im.convert("RGBA" if "A" in im.getbands() else "RGB")
+        fd, tmp_name = tempfile.mkstemp(suffix=".webp", dir=dest.parent)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                im.save(f, format="WEBP", quality=85)
+            os.replace(tmp_name, dest)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+        return im
+
+
+def get_thumbnail(path: Path, size: int) -> Path:
+    """Get the path to a thumbnail of the image at path, no larger than size x size, creating it if needed."""
+    dest = get_thumbnail_cache_path(path, size)
+    if not dest.exists():
+        _create_thumbnail(path, dest, size)
+    return dest
+
+
+def load_thumbnail_image(path: Path, size: int) -> QImage:
+    """Decode a thumbnail of path into a QImage. Safe to call from worker threads.
+
+    Each call decodes exactly one file: the cached thumbnail if there is one, otherwise the original (which is then cached).
+    """
+    dest = get_thumbnail_cache_path(path, size)
+    if dest.exists():
+        image = QImage(str(dest))
+        if not image.isNull():
+            return image
+    im = _create_thumbnail(path, dest, size).convert("RGBA")
+    data = im.tobytes("raw", "RGBA")
+    # copy() so that the QImage owns its pixels once data goes out of scope.
+    return QImage(
+        data, im.width, im.height, im.width * 4, QImage.Format.Format_RGBA8888
+    ).copy()
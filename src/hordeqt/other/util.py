@@ -4,7 +4,7 @@ import importlib.metadata
 import os
 import sys
 import uuid
-from typing import Tuple
+from typing import Optional, Tuple, overload
 
 from hordeqt.civit.civit_api import BaseModel
 from hordeqt.classes.Model import Model
@@ -25,6 +25,17 @@ def create_uuid():
     return str(uuid.uuid4())
 
 
+@overload
+def intern_str(s: str) -> str: ...
+@overload
+def intern_str(s: None) -> None: ...
+
+
+def intern_str(s: Optional[str]) -> Optional[str]:
+    # Model, sampler and worker names repeat across thousands of jobs, so they share one string each.
+    return sys.intern(s) if isinstance(s, str) else s
+
+
 def get_hash(b: bytes | str) -> str:
     if isinstance(b, bytes):
         return hashlib.sha256(b).hexdigest()
@@ -32,11 +43,11 @@ def get_hash(b: bytes | str) -> str:
         return get_hash(str(b).encode("utf-8"))
 
 
-def get_bucketized_cache_path(s: str):
+def get_bucketized_cache_path(s: str, bucket: str = "bucketized"):
     h = get_hash(s)
     pdir = h[0:2]
     cfile = h[2:]
-    bdir = CACHE_PATH / "bucketized"
+    bdir = CACHE_PATH / bucket
     npdir = bdir / pdir
     npdir.mkdir(parents=True, exist_ok=True)
     return npdir / cfile
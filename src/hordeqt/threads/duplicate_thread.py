@@ -0,0 +1,64 @@
+import os
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from PIL import Image
+from PySide6.QtCore import QThread, Signal
+
+from hordeqt.classes.ImageIndex import ImageIndex
+from hordeqt.other.consts import LOGGER
+from hordeqt.other.phash import find_clusters, phash_image
+
+
+class DuplicateScanThread(QThread):
+    progress = Signal(int, int)  # (hashed, total)
+    clusters_found = Signal(list)  # List[List[str]] of job ids
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.max_distance = 4
+        self.running = False
+        # PIL releases the GIL while decoding and resizing, so threads are enough here.
+        self.max_workers = max(1, (os.cpu_count() or 2) - 1)
+
+    def run(self):
+        self.running = True
+        # sqlite connections can't be shared between threads, so this one is separate from the app's.
+        index = ImageIndex()
+        pool = ThreadPoolExecutor(self.max_workers)
+        try:
+            todo = index.unhashed_images()
+            total = len(todo)
+            LOGGER.info(f"Hashing {total} images for duplicate detection")
+            self.progress.emit(0, total)
+            futures: Dict[Future, Tuple[str, int]] = {
+                pool.submit(phash_image, Path(path)): (job_id, size)
+                for job_id, path, size in todo
+            }
+            batch: List[Tuple[str, int, int]] = []
+            for done, fut in enumerate(as_completed(futures), 1):
+                if not self.running:
+                    break
+                job_id, size = futures[fut]
+                try:
+                    batch.append((job_id, size, fut.result()))
+                except (OSError, Image.UnidentifiedImageError) as e:
+                    LOGGER.warning(f"Couldn't hash {job_id}: {e}")
+                if len(batch) >= 100:
+                    index.set_hashes(batch)
+                    batch = []
+                    self.progress.emit(done, total)
+            index.set_hashes(batch)
+            if self.running:
+                self.progress.emit(total, total)
+                self.clusters_found.emit(
+                    find_clusters(index.hashes(), self.max_distance)
+                )
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+            index.close()
+
+    def stop(self):
+        self.running = False
+        self.wait()
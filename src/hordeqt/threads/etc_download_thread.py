@@ -3,7 +3,7 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 import requests
-from PySide6.QtCore import QMutex, QThread, QWaitCondition
+from PySide6.QtCore import QMutex, QThread, QWaitCondition, Signal
 
 from hordeqt.other.consts import LOGGER, SAVED_DATA_DIR_PATH
 from hordeqt.other.util import get_bucketized_cache_path, get_hash
@@ -12,9 +12,17 @@ dl_callback = Callable[[requests.Response], None]
 queued_dl = Tuple[str, requests.Request, Optional[dl_callback]]
 
 
+def _to_request(req: requests.Request | dict) -> requests.Request:
+    # Older saves have the Request itself, from jsonpickle.
+    if isinstance(req, requests.Request):
+        return req
+    return requests.Request(req["method"], req["url"], data=req.get("data") or {})
+
+
 class DownloadThread(QThread):
     queued_downloads: List[queued_dl]
     pause_downloads = False
+    queue_changed = Signal()
 
     def __init__(
         self,
@@ -31,6 +39,7 @@ class DownloadThread(QThread):
     def add_dl(self, request: requests.Request, cb: Optional[dl_callback]) -> str:
         dl_id = get_hash(request.url)
         self.queued_downloads.append((dl_id, request, cb))
+        self.queue_changed.emit()
         return dl_id
 
     def prepare_dl(
@@ -44,6 +53,7 @@ class DownloadThread(QThread):
         dl_id = get_hash(url)
 
         self.queued_downloads.append((dl_id, req, cb))
+        self.queue_changed.emit()
         return dl_id
 
     def download_to_cache(self, url: str, cb: Optional[Callable[[Path], Any]]):
@@ -75,6 +85,7 @@ class DownloadThread(QThread):
     def pop_downloads(self):
         if len(self.queued_downloads) > 0:
             dl_id, req, cb = self.queued_downloads.pop()
+            self.queue_changed.emit()
             LOGGER.info(f"Downloading {req.url} ({dl_id})")
             prep_req = req.prepare()
             s = requests.session()
@@ -86,7 +97,8 @@ class DownloadThread(QThread):
 
     def serialize(self):
         new_queued_download_list = [
-            (dl_id, req) for dl_id, req, _ in self.queued_downloads
+            (dl_id, {"method": req.method, "url": req.url, "data": req.data})
+            for dl_id, req, _ in self.queued_downloads
         ]
         return {
             "queued_downloads": new_queued_download_list,
@@ -100,7 +112,9 @@ class DownloadThread(QThread):
 
         s = cls()
 
-        s.queued_downloads = [(dl_id, req, None) for dl_id, req in queued_downloads]
+        s.queued_downloads = [
+            (dl_id, _to_request(req), None) for dl_id, req in queued_downloads
+        ]
 
         return s
 
@@ -0,0 +1,107 @@
+import threading
+from pathlib import Path
+from typing import Callable, Dict
+
+from PIL import Image
+from PySide6.QtCore import QObject, QRunnable, QSize, Qt, QThread, QThreadPool, Signal
+from PySide6.QtGui import QImage
+
+from hordeqt.other.consts import LOGGER
+from hordeqt.other.thumbnail_cache import THUMBNAIL_SIZE, load_thumbnail_image
+
+
+class _LoaderSignals(QObject):
+    loaded = Signal(str, QImage)
+    failed = Signal(str)
+
+
+class _ImageTask(QRunnable):
+    def __init__(
+        self, key: str, work: Callable[[], QImage], signals: _LoaderSignals
+    ) -> None:
+        super().__init__()
+        self.key = key
+        self.work = work
+        self.signals = signals
+        # Guards started/cancelled. The pool deletes the task once run returns, so tryTake is only safe while it hasn't started.
+        self.lock = threading.Lock()
+        self.started = False
+        self.cancelled = False
+
+    def cancel(self, pool: QThreadPool):
+        with self.lock:
+            self.cancelled = True
+            if not self.started:
+                pool.tryTake(self)
+
+    def run(self):
+        with self.lock:
+            self.started = True
+            if self.cancelled:
+                return
+        try:
+            image = self.work()
+        except (Image.UnidentifiedImageError, OSError) as e:
+            LOGGER.warning(f"Couldn't load image for {self.key}: {e}")
+            self.signals.failed.emit(self.key)
+            return
+        if image.isNull():
+            self.signals.failed.emit(self.key)
+        else:
+            self.signals.loaded.emit(self.key, image)
+
+
+class ImageLoader(QObject):
+    """Decodes or scales images to QImages on a thread pool. Results are delivered on the GUI thread through loaded/failed."""
+
+    loaded = Signal(str, QImage)
+    failed = Signal(str)
+
+    def __init__(self, parent=None, max_threads: int = 0) -> None:
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(
+            max_threads or max(2, QThread.idealThreadCount() - 1)
+        )
+        self.pending: Dict[str, _ImageTask] = {}
+        # Worker threads emit on this object, Qt queues the signal over to the thread it lives in.
+        self.signals = _LoaderSignals()
+        self.signals.loaded.connect(self._on_loaded)
+        self.signals.failed.connect(self._on_failed)
+
+    def request(self, key: str, path: Path, size: int = THUMBNAIL_SIZE):
+        self._submit(key, lambda: load_thumbnail_image(path, size))
+
+    def scale(self, key: str, image: QImage, size: QSize):
+        # A smooth scale of a large image is too slow for the GUI thread when there are dozens of them.
+        self._submit(
+            key,
+            lambda: image.scaled(
+                size,
+                Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.SmoothTransformation,
+            ),
+        )
+
+    def _submit(self, key: str, work: Callable[[], QImage]):
+        if key in self.pending:
+            return
+        task = _ImageTask(key, work, self.signals)
+        self.pending[key] = task
+        self.pool.start(task)
+
+    def cancel(self, key: str):
+        if (task := self.pending.pop(key, None)) is not None:
+            task.cancel(self.pool)
+
+    def _on_loaded(self, key: str, image: QImage):
+        if self.pending.pop(key, None) is not None:
+            self.loaded.emit(key, image)
+
+    def _on_failed(self, key: str):
+        if self.pending.pop(key, None) is not None:
+            self.failed.emit(key)
+
+    def stop(self):
+        self.pool.clear()
+        self.pool.waitForDone()
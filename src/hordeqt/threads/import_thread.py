@@ -0,0 +1,133 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from PySide6.QtCore import QThread, Signal
+
+from hordeqt.classes.ImageIndex import ImageIndex
+from hordeqt.classes.LocalJob import LocalJob
+from hordeqt.other.consts import LOGGER
+from hordeqt.other.format_loader import job_from_config
+from hordeqt.other.image_import import find_import_sources, import_image
+from hordeqt.other.image_layout import ensure_parent, image_path, target_layout
+from hordeqt.other.util import create_uuid
+
+
+class ImportThread(QThread):
+    """Imports images made elsewhere (ArtBot, HordeNG, NovelAI...) from files, folders and zip files into the library."""
+
+    progress = Signal(int, int)  # (done, total)
+    imported = Signal(list)  # List[LocalJob], already in the image index
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.queued_paths: List[str] = []
+        # Ids of files being copied into the image directory, so the rescan doesn't load them too.
+        self.pending_ids: Set[str] = set()
+        self.running = False
+        self.n_imported = 0
+        self.n_skipped = 0
+        self.max_workers = max(1, (os.cpu_count() or 2) - 1)
+        self.finished.connect(self._restart_if_queued)
+
+    def add_paths(self, paths: List[str]):
+        self.queued_paths.extend(paths)
+        if not self.isRunning():
+            self.start()
+
+    def _restart_if_queued(self):
+        # Paths added just as run was returning would otherwise wait for the next drop.
+        if self.queued_paths and self.running:
+            self.start()
+
+    def run(self):
+        self.running = True
+        self.n_imported = self.n_skipped = 0
+        # sqlite connections can't be shared between threads, so this one is separate from the app's.
+        index = ImageIndex()
+        # Spawn rather than fork, forking a process with live Qt threads isn't safe.
+        pool = ProcessPoolExecutor(
+            self.max_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        try:
+            while self.running and self.queued_paths:
+                paths, self.queued_paths = self.queued_paths, []
+                self.import_paths(paths, pool, index)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+            index.close()
+            self.pending_ids.clear()
+        LOGGER.info(
+            f"Import finished, {self.n_imported} imported, {self.n_skipped} skipped"
+        )
+
+    def import_paths(
+        self, paths: List[str], pool: ProcessPoolExecutor, index: ImageIndex
+    ):
+        sources = list(find_import_sources(paths))
+        total = len(sources)
+        LOGGER.info(f"Importing {total} images")
+        self.progress.emit(0, total)
+        layout = target_layout()
+        pending: Dict[Future, Tuple[str, str, Path]] = {}
+        for source in sources:
+            job_id = create_uuid()
+            file_type = Path(source[1] or source[0]).suffix[1:].lower()
+            dst = image_path(job_id, file_type, layout)
+            ensure_parent(dst)
+            self.pending_ids.add(job_id)
+            fut = pool.submit(import_image, source, str(dst))
+            pending[fut] = (job_id, file_type, dst)
+        batch: List[LocalJob] = []
+        last_batch = time.monotonic()
+        for done, fut in enumerate(as_completed(pending), 1):
+            if not self.running:
+                break
+            job_id, file_type, dst = pending[fut]
+            try:
+                result = fut.result()
+            except Exception as e:
+                LOGGER.warning(f"Couldn't import {job_id}: {e}")
+                result = None
+            lj = self.make_job(job_id, file_type, *result) if result else None
+            if lj is None:
+                self.n_skipped += 1
+                if result:
+                    # The file was copied, but a Job couldn't be made from its metadata.
+                    dst.unlink(missing_ok=True)
+            else:
+                batch.append(lj)
+            # Batched, so the index and the gallery are updated once per hundred images rather than for each.
+            if batch and (len(batch) >= 100 or time.monotonic() - last_batch > 0.5):
+                self.add_batch(batch, index)
+                batch = []
+                last_batch = time.monotonic()
+            if done % 50 == 0:
+                self.progress.emit(done, total)
+        self.add_batch(batch, index)
+        self.progress.emit(total, total)
+
+    def make_job(
+        self, job_id: str, file_type: str, config: dict, made_at: float
+    ) -> Optional[LocalJob]:
+        job = job_from_config(config)
+        if job is None:
+            return None
+        job.job_id = job_id
+        lj = LocalJob(job, file_type)
+        lj.completed_at = made_at
+        return lj
+
+    def add_batch(self, batch: List[LocalJob], index: ImageIndex):
+        if not batch:
+            return
+        index.add_many(batch)
+        self.n_imported += len(batch)
+        self.imported.emit(batch)
+
+    def stop(self):
+        self.running = False
+        self.wait()
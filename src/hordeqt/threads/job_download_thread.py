@@ -9,6 +9,7 @@ from PySide6.QtCore import QMutex, QThread, QWaitCondition, Signal
 
 from hordeqt.classes.LocalJob import LocalJob, apply_metadata_to_image
 from hordeqt.other.consts import LOGGER, SAVED_IMAGE_DIR_PATH
+from hordeqt.other.thumbnail_cache import remove_thumbnails, thumbnail_paths
 
 
 class JobDownloadThread(QThread):
@@ -88,6 +89,7 @@ class JobDownloadThread(QThread):
                 LOGGER.warning(f"Failed to delete {lj.id} due to AttributeError: {e}")
             if os.path.exists(lj.path):
                 if lj.path.is_file():
+                    remove_thumbnails(thumbnail_paths(lj.path))
                     lj.path.unlink()
                 else:
                     LOGGER.warning(
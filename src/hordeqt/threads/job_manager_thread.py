@@ -1,6 +1,7 @@
 import copy
 import json
 import time
+from operator import attrgetter
 from queue import PriorityQueue, Queue
 from typing import Dict, List, Optional, Tuple
 
@@ -10,6 +11,7 @@ from PySide6.QtCore import QMutex, QThread, QWaitCondition, Signal
 from hordeqt.classes.Job import Job
 from hordeqt.classes.LocalJob import LocalJob
 from hordeqt.other.consts import BASE_URL, LOGGER
+from hordeqt.other.history_window import HistoryWindow
 from hordeqt.other.util import get_headers
 
 
@@ -19,6 +21,8 @@ class JobManagerThread(QThread):
     job_info = Signal(dict)
 
     updated = Signal()
+    # Only when a job is added, sent, updated or finished, updated is also emitted every second.
+    jobs_changed = Signal()
     kudos_cost_updated = Signal(type(Optional[float]))
     job_count = 1
     pause_requests = False
@@ -45,6 +49,8 @@ class JobManagerThread(QThread):
         self.mutex = QMutex()  # Mutex for synchronization
 
         self.errored_jobs: List[Job] = []
+        # Errored jobs outside this are dropped, they've been logged and are only shown in the status table.
+        self.history = HistoryWindow()
 
     def run(self):
         LOGGER.debug("API thread started")
@@ -140,6 +146,20 @@ class JobManagerThread(QThread):
         if current_time - self.generate_rl_reset > 0:
             self.generate_rl_remaining = 2
 
+    def add_errored(self, job: Job):
+        self.errored_jobs.append(job)
+        self.trim_history()
+
+    def set_history(self, history: HistoryWindow):
+        self.history = history
+        self.trim_history()
+
+    def trim_history(self):
+        # Replaced rather than changed in place, the GUI thread reads it.
+        self.errored_jobs = self.history.keep(
+            self.errored_jobs, attrgetter("creation_time")
+        )
+
     @classmethod
     def deserialize(
         cls,
@@ -209,6 +229,7 @@ class JobManagerThread(QThread):
                         response.headers.get("x-ratelimit-remaining") or 1
                     )
                     self.updated.emit()
+                    self.jobs_changed.emit()
 
                 except requests.RequestException as e:
                     LOGGER.error(e)
@@ -219,7 +240,8 @@ class JobManagerThread(QThread):
                         pass
                     except json.JSONDecodeError:
                         pass
-                    self.errored_jobs.append(job)
+                    self.add_errored(job)
+                    self.jobs_changed.emit()
             else:
                 LOGGER.debug(
                     "Too many requests would be made, skipping a possible new job"
@@ -246,7 +268,7 @@ class JobManagerThread(QThread):
                     self.completed_jobs.append(job)
                 elif job.faulted:
                     LOGGER.error(f"Job {job_id} Errored")
-                    self.errored_jobs.append(job)
+                    self.add_errored(job)
                 else:
                     self.current_requests.put(
                         (
@@ -257,6 +279,7 @@ class JobManagerThread(QThread):
                         )
                     )
                 self.updated.emit()
+                self.jobs_changed.emit()
 
             except requests.RequestException as e:
                 LOGGER.error(e)
@@ -295,6 +318,7 @@ class JobManagerThread(QThread):
                             lj.completed_at = time.time()
                             self.job_completed.emit(lj)
                         self.updated.emit()
+                        self.jobs_changed.emit()
 
                     else:
                         self.log_error(lj.original, r)
@@ -325,3 +349,4 @@ class JobManagerThread(QThread):
 
     def add_job(self, job: Job):
         self.job_queue.put(job)
+        self.jobs_changed.emit()
@@ -0,0 +1,112 @@
+import os
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from PySide6.QtCore import QThread
+
+from hordeqt.classes.ImageIndex import ImageIndex
+from hordeqt.classes.LocalJob import LocalJob
+from hordeqt.other.consts import LOGGER, SAVED_IMAGE_DIR_PATH
+from hordeqt.other.image_layout import (
+    ImageLayout,
+    ensure_parent,
+    image_path,
+    mark_migrated,
+    target_layout,
+)
+
+
+class LayoutMigrationThread(QThread):
+    """Moves saved images into the target layout while the app is running.
+
+    Each job is repointed right after its file is renamed, and LocalJob.update_path checks both layouts until the move is finished, so images can still be found (and loaded, deleted...) part way through.
+    """
+
+    def __init__(
+        self,
+        get_jobs: Callable[[], List[LocalJob]],
+        is_busy: Callable[[], bool],
+        parent=None,
+    ) -> None:
+        super().__init__(parent)
+        self.get_jobs = get_jobs
+        self.is_busy = is_busy
+        self.running = False
+        self.failed = 0
+        # Set when the target changes while a move is running, the app starts it again once it has finished.
+        self.target_changed = False
+
+    def retarget(self):
+        """Move images to the current target layout. A move that's already running stops at the next image, without waiting for it."""
+        if self.isRunning():
+            self.target_changed = True
+        else:
+            self.start()
+
+    def run(self):
+        self.running = True
+        self.target_changed = False
+        self.failed = 0
+        layout = target_layout()
+        # sqlite connections can't be shared between threads, so this one is separate from the app's.
+        index = ImageIndex()
+        try:
+            # Recompression renames files too, so wait for it rather than racing it.
+            while self.running and self.is_busy():
+                self.msleep(500)
+            # Jobs can be repointed by recompression or added by downloads while a pass runs, so go again until nothing moves.
+            while self.running and self.migrate(index, layout) > 0:
+                pass
+            # Anything that failed to move is still in the old layout, so both have to keep being checked.
+            if self.running and target_layout() == layout and self.failed == 0:
+                mark_migrated(layout)
+                if layout == ImageLayout.FLAT:
+                    self.remove_empty_shards()
+                LOGGER.success(f"Images are now in the {layout} layout")
+        finally:
+            index.close()
+
+    def migrate(self, index: ImageIndex, layout: ImageLayout) -> int:
+        jobs = list(self.get_jobs())
+        moved: List[Tuple[str, Path]] = []
+        n_moved = 0
+        for lj in jobs:
+            if not self.running or target_layout() != layout:
+                break
+            dst = image_path(lj.id, lj.file_type, layout)
+            if lj.path == dst:
+                continue
+            if not lj.path.exists():
+                LOGGER.warning(f"Can't move {lj.id}, file is missing")
+                continue
+            ensure_parent(dst)
+            try:
+                os.replace(lj.path, dst)
+            except OSError as e:
+                LOGGER.error(f"Failed to move {lj.id}: {e}")
+                self.failed += 1
+                continue
+            lj.path = dst
+            moved.append((lj.id, dst))
+            n_moved += 1
+            if len(moved) >= 100:
+                index.update_paths(moved)
+                moved = []
+        index.update_paths(moved)
+        if n_moved:
+            LOGGER.info(f"Moved {n_moved} images")
+        return n_moved
+
+    def remove_empty_shards(self):
+        for entry in os.scandir(SAVED_IMAGE_DIR_PATH):
+            if entry.is_dir() and not entry.name.startswith("."):
+                try:
+                    os.rmdir(entry.path)
+                except OSError:
+                    # Not empty, so something other than HordeQt put files in it.
+                    pass
+
+    def stop(self):
+        self.running = False
+        self.target_changed = False
+        self.wait()
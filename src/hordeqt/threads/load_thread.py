@@ -1,13 +1,12 @@
-import json
-import os
-import time
-from typing import List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import requests
 from PySide6.QtCore import QObject, QThread, Signal
 
 from hordeqt.classes.Style import Style
 from hordeqt.other.consts import BASE_URL, LOGGER
+from hordeqt.other.reference_cache import ReferenceCache
 from hordeqt.other.util import CACHE_PATH, get_headers
 
 
@@ -15,26 +14,50 @@ class LoadThread(QThread):
     progress = Signal(int)
     model_info = Signal(dict)
     style_info = Signal(list)
-    style_preview = Signal()
+    style_preview = Signal(dict)
     user_info = Signal(requests.Response)
     horde_info = Signal(type(Tuple[requests.Response, requests.Response]))
+    # The name of each load method, after its data has been emitted.
+    loaded = Signal(str)
 
     def __init__(self, api_key: str, parent: QObject | None = None) -> None:
         super().__init__(parent)
         self.api_key = api_key
+        self.model_reference = ReferenceCache(
+            "https://raw.githubusercontent.com/Haidra-Org/AI-Horde-image-model-reference/main/stable_diffusion.json",
+            CACHE_PATH / "model_ref.json",
+        )
+        self.style_reference = ReferenceCache(
+            "https://raw.githubusercontent.com/Haidra-Org/AI-Horde-Styles/refs/heads/main/styles.json",
+            CACHE_PATH / "style_ref.json",
+        )
+        self.style_previews = ReferenceCache(
+            "https://raw.githubusercontent.com/amiantos/AI-Horde-Styles-Previews/refs/heads/main/previews.json",
+            CACHE_PATH / "style_preview.json",
+        )
 
     def run(self):
-        t = [
+        # Each load runs on its own thread, so startup waits for the slowest request rather than all of them in turn.
+        loads: List[Callable[[], None]] = [
             self.reload_user_info,
             self.reload_horde_info,
             self.load_model_file,
             self.load_style_file,
             self.load_style_preview,
         ]
-        for n in range(len(t)):
-            # I don't love this, but it's fine.
-            t[n]()
-            self.progress.emit((n + 1) * 100 / (len(t)))
+        with ThreadPoolExecutor(len(loads)) as pool:
+            futures = [pool.submit(self.run_load, load) for load in loads]
+            for n, fut in enumerate(as_completed(futures), 1):
+                try:
+                    fut.result()
+                except (requests.RequestException, OSError, ValueError) as e:
+                    # Whatever needed it stays disabled, the rest of the app still loads.
+                    LOGGER.error(f"Loading failed: {e}")
+                self.progress.emit(n * 100 // len(loads))
+
+    def run_load(self, load: Callable[[], None]):
+        load()
+        self.loaded.emit(load.__name__)
 
     def reload_user_info(self, api_key: Optional[str] = None):
         if api_key is not None:
@@ -48,88 +71,49 @@ class LoadThread(QThread):
     def reload_horde_info(self):
         LOGGER.debug("Loading horde info")
 
-        self.horde_info.emit(
-            (
-                requests.get(
-                    BASE_URL + "stats/img/totals",
-                    headers=get_headers(self.api_key, False),
-                ),
-                requests.get(
-                    BASE_URL + "status/performance",
-                    headers=get_headers(self.api_key, False),
-                ),
+        with ThreadPoolExecutor(2) as pool:
+            totals = pool.submit(
+                requests.get,
+                BASE_URL + "stats/img/totals",
+                headers=get_headers(self.api_key, False),
             )
-        )
+            performance = pool.submit(
+                requests.get,
+                BASE_URL + "status/performance",
+                headers=get_headers(self.api_key, False),
+            )
+            self.horde_info.emit((totals.result(), performance.result()))
         LOGGER.debug("Horde info loaded")
 
-    # FIXME: The following should absolutely be refactored.
-    def load_style_file(self):
-        style_cache_path = CACHE_PATH / "style_ref.json"
-        if (
-            not style_cache_path.exists()
-        ) or time.time() - style_cache_path.stat().st_mtime > 60 * 60:
-            LOGGER.debug(f"Refreshing style cache at {style_cache_path}")
-            os.makedirs(style_cache_path.parent, exist_ok=True)
-            r = requests.get(
-                "https://raw.githubusercontent.com/Haidra-Org/AI-Horde-Styles/refs/heads/main/styles.json"
+    def load_reference(self, cache: ReferenceCache, emit: Callable[[Any], None]):
+        """Emit the cached copy straight away, however old, then revalidate it if it's stale and emit again if it changed."""
+        data = cache.cached()
+        if data is not None:
+            emit(data)
+            if cache.is_fresh():
+                LOGGER.debug(f"Cache at {cache.path} is fresh, not reloading")
+                return
+        LOGGER.debug(f"Revalidating cache at {cache.path}")
+        try:
+            if cache.revalidate():
+                emit(cache.cached())
+        except (requests.RequestException, OSError, ValueError) as e:
+            if data is None:
+                raise
+            LOGGER.warning(
+                f"Couldn't revalidate {cache.url}, using the cached copy: {e}"
             )
-            j: dict[str, dict] = r.json()
-            with open(style_cache_path, "wt") as f:
-                json.dump(j, f)
-        else:
-            LOGGER.debug(f"Style cache at {style_cache_path} is fresh, not reloading")
 
-            with open(style_cache_path, "rt") as f:
-                j: dict[str, dict] = json.load(f)
-        styles: List[Style] = []
-        for k, v in j.items():
-            styles.append(Style.parse_from_json(k, v, True))
+    def load_style_file(self):
+        def emit(j: Dict[str, dict]):
+            self.style_info.emit(
+                [Style.parse_from_json(k, v, True) for k, v in j.items()]
+            )
 
-        self.style_info.emit(styles)
+        self.load_reference(self.style_reference, emit)
 
     def load_style_preview(self):
-
-        self.style_preview_cache_path = CACHE_PATH / "style_preview.json"
-        if (
-            not self.style_preview_cache_path.exists()
-        ) or time.time() - self.style_preview_cache_path.stat().st_mtime > 60 * 60:
-            LOGGER.debug(
-                f"Refreshing style preview cache at {self.style_preview_cache_path}"
-            )
-            os.makedirs(self.style_preview_cache_path.parent, exist_ok=True)
-            r = requests.get(
-                "https://raw.githubusercontent.com/amiantos/AI-Horde-Styles-Previews/refs/heads/main/previews.json"
-            )
-            j: dict[str, str] = r.json()
-            with open(self.style_preview_cache_path, "wt") as f:
-                json.dump(j, f)
-        else:
-            LOGGER.debug(
-                f"Style preview cache at {self.style_preview_cache_path} is fresh, not reloading"
-            )
-
-            with open(self.style_preview_cache_path, "rt") as f:
-                j: dict[str, str] = json.load(f)
-        self.style_preview.emit()
+        self.load_reference(self.style_previews, self.style_preview.emit)
 
     def load_model_file(self):
-        model_cache_path = CACHE_PATH / "model_ref.json"
-
-        if (
-            not model_cache_path.exists()
-        ) or time.time() - model_cache_path.stat().st_mtime > 60 * 60:
-            LOGGER.debug(f"Refreshing model cache at {model_cache_path}")
-            os.makedirs(model_cache_path.parent, exist_ok=True)
-            r = requests.get(
-                "https://raw.githubusercontent.com/Haidra-Org/AI-Horde-image-model-reference/main/stable_diffusion.json"
-            )
-            j = r.json()
-            with open(model_cache_path, "wt") as f:
-                json.dump(j, f)
-        else:
-            LOGGER.debug(f"Model cache at {model_cache_path} is fresh, not reloading")
-
-            with open(model_cache_path, "rt") as f:
-                j = json.load(f)
-
-        self.model_info.emit(j)
+        self.load_reference(self.model_reference, self.model_info.emit)
@@ -0,0 +1,75 @@
+import json
+import time
+from typing import List
+
+import requests
+from PySide6.QtCore import QMutex, QThread, QWaitCondition, Signal
+
+from hordeqt.other.consts import BASE_URL, LOGGER
+from hordeqt.other.reference_cache import _write_atomic
+from hordeqt.other.util import CACHE_PATH
+
+MODEL_STATUS_CACHE_PATH = CACHE_PATH / "model_status.json"
+
+
+class ModelStatusThread(QThread):
+    """Keeps the status of the horde's image models up to date. The last status is kept on disk, so startup doesn't wait for it."""
+
+    models = Signal(list)
+
+    def __init__(self, interval: float = 60, parent=None) -> None:
+        super().__init__(parent)
+        # Seconds between refreshes, and how long the cached status goes without one.
+        self.interval = interval
+        self.running = True
+        self.wait_condition = QWaitCondition()
+        self.mutex = QMutex()
+
+    def run(self):
+        next_refresh = 0.0
+        # The last status is shown straight away, however old, so the models don't wait for the network (or work without it).
+        try:
+            cached_at = MODEL_STATUS_CACHE_PATH.stat().st_mtime
+            with open(MODEL_STATUS_CACHE_PATH, "rt") as f:
+                self.models.emit(json.load(f))
+            # If it's stale, this has passed already and it's refreshed right away.
+            next_refresh = cached_at + self.interval
+        except (OSError, ValueError):
+            pass
+        while self.running:
+            if time.time() >= next_refresh:
+                try:
+                    self.models.emit(self.fetch())
+                except (requests.RequestException, ValueError) as e:
+                    LOGGER.warning(f"Couldn't refresh model status: {e}")
+                next_refresh = time.time() + self.interval
+            self.mutex.lock()
+            if self.running:
+                self.wait_condition.wait(
+                    self.mutex, max(0, int((next_refresh - time.time()) * 1000))
+                )
+            self.mutex.unlock()
+
+    def fetch(self) -> List[dict]:
+        LOGGER.debug("Refreshing model status")
+        r = requests.get(
+            BASE_URL + "status/models",
+            params={"type": "image", "min_count": 1, "model_state": "all"},
+            # stop waits for this, and closing the app waits for stop.
+            timeout=30,
+        )
+        r.raise_for_status()
+        models = r.json()
+        try:
+            # A crash part way through leaves the old status, not half a file.
+            _write_atomic(MODEL_STATUS_CACHE_PATH, r.content)
+        except OSError as e:
+            LOGGER.warning(f"Couldn't cache model status: {e}")
+        return models
+
+    def stop(self):
+        self.mutex.lock()
+        self.running = False
+        self.wait_condition.wakeAll()  # Wake the thread immediately to exit
+        self.mutex.unlock()
+        self.wait()
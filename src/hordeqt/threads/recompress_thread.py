@@ -0,0 +1,159 @@
+import json
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, List, Set, Tuple
+
+from PySide6.QtCore import QThread, Signal
+
+from hordeqt.classes.LocalJob import LocalJob
+from hordeqt.other.consts import LOGGER, SAVED_DATA_DIR_PATH
+from hordeqt.other.recompress import recompress_image
+from hordeqt.other.thumbnail_cache import remove_thumbnails, thumbnail_paths
+
+RECOMPRESS_STATE_PATH = SAVED_DATA_DIR_PATH / "recompress_state.json"
+
+
+class RecompressThread(QThread):
+    progress = Signal(int, int)  # (done, total)
+    bytes_saved = Signal(int)
+    # The job and its new file type. Jobs are shared with the GUI thread, so the app repoints them there.
+    recompressed = Signal(LocalJob, str)
+
+    def __init__(
+        self,
+        get_jobs: Callable[[], List[LocalJob]],
+        is_busy: Callable[[], bool],
+        parent=None,
+    ) -> None:
+        super().__init__(parent)
+        self.get_jobs = get_jobs
+        self.is_busy = is_busy
+        self.codec = "webp"
+        self.quality = 80
+        self.running = False
+        self.max_workers = max(1, (os.cpu_count() or 2) - 1)
+        self.done_ids: Set[str] = set()
+        self.total_saved = 0
+        # Stays set until finished has been handled, by then every result has been applied on the GUI thread too.
+        self.busy = False
+        self.finished.connect(self.on_finished)
+        self.load_state()
+
+    def configure(self, codec: str, quality: int):
+        if codec != self.codec or quality != self.quality:
+            # Different settings means every image is a candidate again.
+            self.done_ids = set()
+            self.total_saved = 0
+        self.codec = codec
+        self.quality = quality
+
+    def load_state(self):
+        try:
+            with open(RECOMPRESS_STATE_PATH, "rt") as f:
+                j: dict = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        self.codec = j.get("codec", self.codec)
+        self.quality = j.get("quality", self.quality)
+        self.done_ids = set(j.get("done", []))
+        self.total_saved = j.get("bytes_saved", 0)
+
+    def save_state(self):
+        tmp_path = RECOMPRESS_STATE_PATH.with_suffix(".tmp")
+        with open(tmp_path, "wt") as f:
+            json.dump(
+                {
+                    "codec": self.codec,
+                    "quality": self.quality,
+                    "done": list(self.done_ids),
+                    "bytes_saved": self.total_saved,
+                },
+                f,
+            )
+        os.replace(tmp_path, RECOMPRESS_STATE_PATH)
+
+    def run(self):
+        self.running = True
+        jobs = list(self.get_jobs())
+        total = len(jobs)
+        todo = [lj for lj in jobs if lj.id not in self.done_ids]
+        done = total - len(todo)
+        LOGGER.info(
+            f"Recompressing {len(todo)} images to {self.codec} (quality {self.quality}), {done} already done"
+        )
+        self.progress.emit(done, total)
+        self.bytes_saved.emit(self.total_saved)
+        # The job, and its thumbnails from before the file changes.
+        pending: Dict[Future, Tuple[LocalJob, List[Path]]] = {}
+        # Spawn rather than fork, forking a process with live Qt threads isn't safe.
+        pool = ProcessPoolExecutor(
+            self.max_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        try:
+            while self.running and (todo or pending):
+                busy = self.is_busy()
+                # While generating, only keep a single image in flight.
+                limit = 1 if busy else self.max_workers
+                while todo and len(pending) < limit:
+                    lj = todo.pop()
+                    if not lj.path.exists():
+                        LOGGER.warning(f"Can't recompress {lj.id}, file is missing")
+                        done += 1
+                        continue
+                    dst = lj.path.with_suffix("." + self.codec)
+                    fut = pool.submit(
+                        recompress_image,
+                        str(lj.path),
+                        str(dst),
+                        self.codec,
+                        self.quality,
+                    )
+                    pending[fut] = (lj, thumbnail_paths(lj.path))
+                if not pending:
+                    continue
+                finished, _ = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    lj, thumbnails = pending.pop(fut)
+                    done += 1
+                    self._handle_result(fut, lj, thumbnails)
+                    if done % 25 == 0:
+                        self.save_state()
+                if finished:
+                    self.progress.emit(done, total)
+                    self.bytes_saved.emit(self.total_saved)
+                if busy:
+                    self.msleep(500)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+            self.save_state()
+        self.progress.emit(done, total)
+        self.bytes_saved.emit(self.total_saved)
+        LOGGER.info(f"Recompression stopped, {self.total_saved} bytes saved")
+
+    def _handle_result(self, fut: Future, lj: LocalJob, thumbnails: List[Path]):
+        try:
+            old_size, new_size, replaced = fut.result()
+        except Exception as e:
+            LOGGER.error(f"Failed to recompress {lj.id}: {e}")
+            return
+        self.done_ids.add(lj.id)
+        if not replaced:
+            LOGGER.debug(f"Recompressing {lj.id} wouldn't save space, skipped")
+            return
+        remove_thumbnails(thumbnails)
+        self.total_saved += old_size - new_size
+        self.recompressed.emit(lj, self.codec)
+        LOGGER.debug(f"Recompressed {lj.id}: {old_size} -> {new_size} bytes")
+
+    def start(self, *args, **kwargs):
+        self.busy = True
+        super().start(*args, **kwargs)
+
+    def on_finished(self):
+        self.busy = False
+
+    def stop(self):
+        self.running = False
+        self.wait()
@@ -0,0 +1,107 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Set
+
+from PySide6.QtCore import QThread, Signal
+
+from hordeqt.classes.ImageIndex import ImageIndex
+from hordeqt.classes.LocalJob import LocalJob
+from hordeqt.other.consts import LOGGER, SAVED_IMAGE_DIR_PATH
+from hordeqt.other.rescan import find_missing_files, find_unknown_files, load_image_file
+
+
+class RescanThread(QThread):
+    """Finds images in the image directory that aren't in the library yet, and loads their jobs from the file metadata."""
+
+    found = Signal(list)  # List[LocalJob], already in the image index
+    # Ids of jobs given to check_missing whose file is gone
+    missing = Signal(list)
+
+    def __init__(self, known_ids: Callable[[], Set[str]], parent=None) -> None:
+        super().__init__(parent)
+        self.known_ids = known_ids
+        self.running = False
+        self.scan_again = False
+        # Checked on the next scan
+        self.expected_jobs: List[LocalJob] = []
+        self.max_workers = max(1, (os.cpu_count() or 2) - 1)
+
+    def trigger(self):
+        if self.isRunning():
+            # Whatever changed might already have been listed, so go round once more.
+            self.scan_again = True
+        else:
+            self.start()
+
+    def check_missing(self, jobs: List[LocalJob]):
+        """Look for the files of jobs on the next scan, and emit missing with the ones that aren't there."""
+        self.expected_jobs = list(jobs)
+
+    def run(self):
+        self.running = True
+        self.scan_again = False
+        # sqlite connections can't be shared between threads, so this one is separate from the app's.
+        index = ImageIndex()
+        try:
+            if self.expected_jobs:
+                jobs, self.expected_jobs = self.expected_jobs, []
+                # Lazily loaded jobs work out their paths here, rather than all at once on startup.
+                expected = {lj.id: lj.path.name for lj in jobs}
+                if missing := find_missing_files(expected):
+                    self.missing.emit(missing)
+            self.scan(index)
+            while self.scan_again and self.running:
+                self.scan_again = False
+                self.scan(index)
+        finally:
+            index.close()
+
+    def scan(self, index: ImageIndex):
+        scanned = index.scanned_files()
+        unknown, gone = find_unknown_files(self.known_ids(), scanned)
+        index.forget_scanned_files(gone)
+        if not unknown:
+            return
+        LOGGER.info(f"Loading {len(unknown)} new files from the image directory")
+        results = []
+        batch: List[LocalJob] = []
+        # The same job can be in more than one file, e.g. left behind in both layouts.
+        seen: Set[str] = set()
+        with ThreadPoolExecutor(self.max_workers) as pool:
+            for (path, stamp), lj in zip(
+                unknown, pool.map(load_image_file, (path for path, _ in unknown))
+            ):
+                if not self.running:
+                    pool.shutdown(cancel_futures=True)
+                    break
+                if lj is None:
+                    LOGGER.warning(
+                        f'Unknown or invalid file in image directory: "{path}"'
+                    )
+                elif lj.id not in seen:
+                    seen.add(lj.id)
+                    if lj.path != path:
+                        # update_path only looks where the layout says the file should be.
+                        try:
+                            os.replace(path, lj.path)
+                        except OSError as e:
+                            LOGGER.warning(f'Couldn\'t move "{path}" into place: {e}')
+                            lj.path = path
+                    batch.append(lj)
+                    if len(batch) >= 100:
+                        self.add_batch(batch, index)
+                        batch = []
+                name = path.relative_to(SAVED_IMAGE_DIR_PATH).as_posix()
+                results.append((name, stamp, lj.id if lj is not None else None))
+        self.add_batch(batch, index)
+        index.set_scanned_files(results)
+
+    def add_batch(self, batch: List[LocalJob], index: ImageIndex):
+        if not batch:
+            return
+        index.add_many(batch)
+        self.found.emit(batch)
+
+    def stop(self):
+        self.running = False
+        self.wait()
@@ -60,7 +60,8 @@ def test_serialize():
     assert serialized["strength"] == 0.5
     assert serialized["clip_strength"] == 0.5
     assert serialized["inject_trigger"] is None
-    assert isinstance(serialized["model_version"], dict)
+    # Referenced by id only
+    assert "model_version" not in serialized
 
 
 def test_deserialize():
@@ -79,3 +80,21 @@ def test_deserialize():
     assert lora.clip_strength == 0.5
     assert lora.inject_trigger == "test_trigger"
     assert isinstance(lora.model_version, ModelVersion)
+
+
+def test_model_versions_are_interned():
+    data = {"id": 4521, "name": "interned_version"}
+    first = ModelVersion.deserialize(data)
+    assert ModelVersion.deserialize(data) is first
+    assert ModelVersion.get(4521) is first
+    # Jobs and saved LoRAs only have the id, and get the same object
+    assert LoRA.from_job_format({"name": "4521"}).model_version is first
+    restored = LoRA.deserialize(LoRA("test_name", 4521, 1, 1, first).serialize())
+    assert restored.model_version is first
+    # Placeholders from missing data aren't shared
+    assert ModelVersion.deserialize({}) is not ModelVersion.deserialize({})
+
+
+def test_deserialize_without_model_version():
+    lora = LoRA.deserialize({"name": "test_name", "id": 98765, "model_version": {}})
+    assert lora.model_version is None
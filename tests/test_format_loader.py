@@ -0,0 +1,61 @@
+import json
+
+from PIL import Image, PngImagePlugin
+from PIL.ExifTags import Base
+
+from hordeqt.other.format_loader import (
+    ImageType,
+    detect_format,
+    get_job_config,
+    read_metadata,
+)
+
+
+def _png(path, **text):
+    info = PngImagePlugin.PngInfo()
+    for k, v in text.items():
+        info.add_text(k, v)
+    Image.new("RGB", (16, 16)).save(path, pnginfo=info)
+    return path
+
+
+def test_pixels_are_never_decoded(tmp_path):
+    _png(tmp_path / "plain.png")
+    with Image.open(tmp_path / "plain.png") as im:
+        assert get_job_config(im) is None
+        # Image.getexif() would have loaded the image looking for an eXIf chunk.
+        assert im._im is None
+
+
+def test_formats_are_detected_from_one_read(tmp_path):
+    exif = Image.Exif()
+    exif[Base.ImageDescription] = json.dumps({"prompt": "a lighthouse", "seed": 7})
+    Image.new("RGB", (16, 16)).save(tmp_path / "ng.webp", exif=exif)
+    _png(
+        tmp_path / "artbot.png",
+        Software="ArtBot",
+        Comment="a lighthouse\nNegative Prompt: fog\nSteps: 30, Sampler: k_euler, CFG scale: 7, Seed: 1, Size: 512x768, model: AlbedoBase XL",
+    )
+    _png(tmp_path / "nai.png", Comment=json.dumps({"prompt": "{lighthouse}"}))
+
+    expected = {
+        "ng.webp": ImageType.HORDENG_JPG,
+        "artbot.png": ImageType.ARTBOT,
+        "nai.png": ImageType.NAI_PNG,
+    }
+    for name, image_type in expected.items():
+        with Image.open(tmp_path / name) as im:
+            assert detect_format(read_metadata(im)) == image_type
+            assert get_job_config(im) is not None
+
+    with Image.open(tmp_path / "artbot.png") as im:
+        config = get_job_config(im)
+    assert config["negative_prompt"] == "fog"
+    assert (config["width"], config["height"]) == (512, 768)
+
+
+def test_broken_metadata_is_skipped(tmp_path):
+    # Looks like ArtBot, but the parameter line is missing.
+    _png(tmp_path / "artbot.png", Software="ArtBot", Comment="a lighthouse\n")
+    with Image.open(tmp_path / "artbot.png") as im:
+        assert get_job_config(im) is None
@@ -0,0 +1,89 @@
+from hordeqt.classes.Job import Job
+from hordeqt.classes.LocalJob import LocalJob
+from hordeqt.components.gallery.gallery_index import (
+    GalleryFilter,
+    GalleryIndex,
+    GallerySortOptions,
+)
+
+
+def _local_job(model, completed_at, seed="1", width=512, nsfw=False):
+    job = Job(
+        prompt="test prompt",
+        model=model,
+        steps=10,
+        sampler_name="k_euler",
+        cfg_scale=7.0,
+        clip_skip=1,
+        width=width,
+        height=512,
+        seed=seed,
+        allow_nsfw=nsfw,
+    )
+    lj = LocalJob(job)
+    lj.completed_at = completed_at
+    return lj
+
+
+def _jobs():
+    return [
+        _local_job("b model", 3, seed="20", width=768),
+        _local_job("A model", 1, seed="3", nsfw=True),
+        _local_job("c model", 2, seed="100", width=1024),
+    ]
+
+
+def test_sort_options():
+    jobs = _jobs()
+    index = GalleryIndex()
+    index.set_jobs(jobs)
+    expected = {
+        GallerySortOptions.OldestFirst: [1, 2, 0],
+        GallerySortOptions.NewestFirst: [0, 2, 1],
+        GallerySortOptions.ModelNameAZ: [1, 0, 2],
+        GallerySortOptions.ModelNameZA: [2, 0, 1],
+        GallerySortOptions.MostPixelsFirst: [2, 0, 1],
+        GallerySortOptions.SeedAscending: [1, 0, 2],
+    }
+    for sort, order in expected.items():
+        index.set_sort(sort)
+        assert index.jobs() == [jobs[n] for n in order], sort
+
+
+def test_filters_stack():
+    jobs = _jobs()
+    index = GalleryIndex()
+    index.set_jobs(jobs)
+    index.set_filter(GalleryFilter(after=2))
+    assert index.jobs() == [jobs[2], jobs[0]]
+    index.set_filter(GalleryFilter(frozenset(["b model", "A model"]), nsfw=False))
+    assert index.jobs() == [jobs[0]]
+
+
+def test_add_keeps_view_sorted():
+    jobs = _jobs()
+    index = GalleryIndex()
+    index.set_sort(GallerySortOptions.NewestFirst)
+    index.set_filter(GalleryFilter(nsfw=False))
+    for lj in jobs:
+        index.add(lj)
+    assert index.jobs() == [jobs[0], jobs[2]]
+    newest = _local_job("d model", 2.5)
+    assert index.add(newest) == 1
+    assert index.remove(jobs[1].id) is None
+    assert index.remove(jobs[0].id) == 0
+    assert index.jobs() == [newest, jobs[2]]
+
+
+def test_equal_keys_keep_insertion_order():
+    index = GalleryIndex()
+    index.set_sort(GallerySortOptions.NewestFirst)
+    jobs = [_local_job("a model", t) for t in (2, 1, 1, 1, 0)]
+    for lj in jobs:
+        index.add(lj)
+    assert index.jobs() == jobs
+    later = _local_job("a model", 1)
+    assert index.add(later) == 4
+    assert index.remove(jobs[2].id) == 2
+    assert index.remove(later.id) == 3
+    assert index.jobs() == [jobs[0], jobs[1], jobs[3], jobs[4]]
@@ -0,0 +1,16 @@
+from hordeqt.other.history_window import HistoryWindow
+
+
+def test_count():
+    items = list(range(10))
+    assert HistoryWindow(3).keep(items, float) == [7, 8, 9]
+    assert HistoryWindow(0).keep(items, float) == []
+    assert HistoryWindow(20).keep(items, float) == items
+
+
+def test_age():
+    # (added, timestamp), imported items can be older than ones added before them
+    items = [(0, 100.0), (1, 195.0), (2, 50.0), (3, 199.0)]
+    window = HistoryWindow(3, max_age=10)
+    assert window.keep(items, lambda i: i[1], now=200) == [(1, 195.0), (3, 199.0)]
+    assert window.keep(items, lambda i: i[1], now=1000) == []
@@ -0,0 +1,50 @@
+from PySide6.QtGui import QPixmap
+
+from hordeqt.classes.ImageCache import ImageCache
+
+# 100x100 at 32bpp
+PIXMAP_COST = 100 * 100 * 4
+
+
+def _pixmap():
+    pixmap = QPixmap(100, 100)
+    assert ImageCache.cost(pixmap) == PIXMAP_COST
+    return pixmap
+
+
+def test_evicts_least_recently_viewed():
+    cache = ImageCache(PIXMAP_COST * 3)
+    for n in range(3):
+        cache.put((str(n), 512), _pixmap())
+    cache.touch(("0", 512))
+    cache.put(("3", 512), _pixmap())
+    assert list(cache.entries) == [("2", 512), ("0", 512), ("3", 512)]
+    assert cache.evictions == 1
+    assert cache.size == PIXMAP_COST * 3
+
+
+def test_counts_hits_and_misses():
+    cache = ImageCache(PIXMAP_COST * 3)
+    cache.put(("a", 512), _pixmap())
+    assert cache.get(("a", 512)) is not None
+    assert cache.get(("b", 512)) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_shrinking_budget_evicts():
+    cache = ImageCache(PIXMAP_COST * 4)
+    for n in range(4):
+        cache.put((str(n), 512), _pixmap())
+    cache.set_budget(PIXMAP_COST)
+    assert list(cache.entries) == [("3", 512)]
+    cache.remove_job("3")
+    assert len(cache) == 0 and cache.size == 0
+
+
+def test_keeps_one_scaled_width_per_image():
+    cache = ImageCache(PIXMAP_COST * 10)
+    cache.put(("a", 512), _pixmap())
+    cache.put(("a", 512, 100), _pixmap())
+    cache.put(("a", 512, 120), _pixmap())
+    assert list(cache.entries) == [("a", 512), ("a", 512, 120)]
+    assert cache.size == PIXMAP_COST * 2
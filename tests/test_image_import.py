@@ -0,0 +1,73 @@
+import json
+import zipfile
+
+from PIL import Image
+from PIL.ExifTags import Base
+
+from hordeqt.other.image_import import find_import_sources, import_image
+
+
+def _hordeng_jpeg(path):
+    exif = Image.Exif()
+    exif[Base.ImageDescription] = json.dumps(
+        {"prompt": "a lighthouse", "model": "AlbedoBase XL", "seed": 42}
+    )
+    Image.new("RGB", (16, 16)).save(path, exif=exif)
+    return path
+
+
+def test_imports_from_folders_and_zips(tmp_path):
+    src = tmp_path / "src"
+    (src / "nested").mkdir(parents=True)
+    _hordeng_jpeg(src / "nested" / "a.jpg")
+    Image.new("RGB", (16, 16)).save(src / "plain.png")
+    (src / "readme.txt").write_text("not an image")
+    with zipfile.ZipFile(tmp_path / "more.zip", "w") as zf:
+        zf.write(src / "nested" / "a.jpg", "inner/b.jpg")
+
+    sources = list(find_import_sources([str(src), str(tmp_path / "more.zip")]))
+    assert sorted(sources) == sorted(
+        [
+            (str(src / "nested" / "a.jpg"), None),
+            (str(src / "plain.png"), None),
+            (str(tmp_path / "more.zip"), "inner/b.jpg"),
+        ]
+    )
+
+    library = tmp_path / "library"
+    library.mkdir()
+    for n, source in enumerate(sources):
+        result = import_image(source, str(library / f"{n}.img"))
+        if source[0].endswith("plain.png"):
+            # No metadata, so it's not copied.
+            assert result is None
+            assert not (library / f"{n}.img").exists()
+        else:
+            config, _ = result
+            assert config["prompt"] == "a lighthouse"
+            assert config["model"] == "AlbedoBase XL"
+            assert (library / f"{n}.img").read_bytes() == (
+                src / "nested" / "a.jpg"
+            ).read_bytes()
+
+
+def test_hordeqt_metadata_is_not_read_as_hordeng(tmp_path):
+    exif = Image.Exif()
+    exif[Base.Software] = "HordeQT"
+    exif[Base.ImageDescription] = json.dumps(
+        {
+            "Application": "HordeQT",
+            "job": {
+                "prompt": "a lighthouse###fog",
+                "params": {"seed": "42", "steps": 30},
+                "models": ["AlbedoBase XL"],
+            },
+        }
+    )
+    Image.new("RGB", (16, 16)).save(tmp_path / "a.webp", exif=exif)
+
+    config, _ = import_image((str(tmp_path / "a.webp"), None), str(tmp_path / "b"))
+    assert config["prompt"] == "a lighthouse"
+    assert config["negative_prompt"] == "fog\n"
+    assert config["model"] == "AlbedoBase XL"
+    assert config["steps"] == 30
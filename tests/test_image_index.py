@@ -0,0 +1,117 @@
+from PIL import Image
+
+from hordeqt.classes.ImageIndex import ImageIndex
+from hordeqt.classes.Job import Job
+from hordeqt.classes.LocalJob import JobSummary, LocalJob, set_loaded_limit
+
+
+def _local_job(tmp_path, size, prompt="test prompt", model="test model"):
+    job = Job(
+        prompt=prompt,
+        model=model,
+        steps=10,
+        sampler_name="k_euler",
+        cfg_scale=7.0,
+        clip_skip=1,
+        width=512,
+        height=512,
+        seed="1",
+    )
+    lj = LocalJob(job)
+    lj.path = tmp_path / f"{lj.id}.png"
+    Image.new("RGB", (size, size // 2)).save(lj.path)
+    return lj
+
+
+def test_add_load_remove(tmp_path):
+    index = ImageIndex(tmp_path / "index.sqlite3")
+    small, large = _local_job(tmp_path, 16), _local_job(tmp_path, 256)
+    index.add_many([small, large])
+    assert len(index) == 2
+    assert [lj.id for lj in index.load_jobs()] == [small.id, large.id]
+    assert index.conn.execute(
+        "SELECT width, height FROM images WHERE id = ?", (large.id,)
+    ).fetchone() == (256, 128)
+    index.remove(small.id)
+    assert [lj.id for lj in index.load_jobs()] == [large.id]
+
+
+def test_stats_queries(tmp_path):
+    index = ImageIndex(tmp_path / "index.sqlite3")
+    jobs = [_local_job(tmp_path, size) for size in (16, 512, 64)]
+    index.add_many(jobs)
+    sizes = {lj.id: lj.path.stat().st_size for lj in jobs}
+    assert index.file_sizes() == sizes
+    assert index.total_bytes() == sum(sizes.values())
+    assert index.largest() == (str(jobs[1].path), sizes[jobs[1].id])
+    assert index.smallest() == (str(jobs[0].path), sizes[jobs[0].id])
+
+
+def test_search(tmp_path):
+    index = ImageIndex(tmp_path / "index.sqlite3")
+    cat = _local_job(tmp_path, 16, "a cat on a sofa###blurry, dog")
+    dog = _local_job(tmp_path, 16, "a dog in a field", model="Deliberate")
+    index.add_many([cat, dog])
+    assert index.search("sofa") == [cat.id]
+    assert index.search("DOG") == [dog.id, cat.id]
+    assert index.search("dog field") == [dog.id]
+    assert index.search("delib") == [dog.id]
+    # FTS5 syntax is treated as plain text
+    assert index.search('cat" OR "dog') == []
+    index.remove(cat.id)
+    assert index.search("cat") == []
+    # A fresh connection finds the search index already up to date
+    assert ImageIndex(tmp_path / "index.sqlite3").search("field") == [dog.id]
+
+
+def test_jobs_load_lazily(tmp_path, monkeypatch):
+    index = ImageIndex(tmp_path / "index.sqlite3")
+    lj = _local_job(tmp_path, 256, "a cat###blurry")
+    lj.original.allow_nsfw = True
+    index.add(lj)
+
+    deserialized = []
+    deserialize = Job.deserialize
+    monkeypatch.setattr(
+        Job,
+        "deserialize",
+        classmethod(lambda cls, v: deserialized.append(v) or deserialize(v)),
+    )
+    (loaded,) = index.load_jobs()
+    # The summary comes from the columns, so the size is the file's
+    assert loaded.summary == JobSummary(
+        "test model", 256, 128, "1", "a cat###blurry", True
+    )
+    assert loaded.aspect_ratio == 2.0
+    assert deserialized == []
+    assert loaded.original.prompt == "a cat###blurry"
+    assert loaded.original.job_id == lj.id
+    assert loaded.original.width == 512
+    assert len(deserialized) == 1
+
+
+def test_loaded_jobs_are_bounded(tmp_path):
+    index = ImageIndex(tmp_path / "index.sqlite3")
+    index.add_many(_local_job(tmp_path, 16, f"prompt {n}") for n in range(3))
+    jobs = index.load_jobs()
+    set_loaded_limit(2)
+    try:
+        for lj in jobs:
+            lj.original
+        # The least recently used one is dropped, and read again when it's needed.
+        assert [lj._original is not None for lj in jobs] == [False, True, True]
+        assert jobs[0].original.prompt == "prompt 0"
+        assert [lj._original is not None for lj in jobs] == [True, False, True]
+    finally:
+        set_loaded_limit(200)
+
+
+def test_broken_job_falls_back_to_summary(tmp_path):
+    index = ImageIndex(tmp_path / "index.sqlite3")
+    lj = _local_job(tmp_path, 16)
+    index.add(lj)
+    index.conn.execute("UPDATE images SET job = '{not json'")
+    (loaded,) = index.load_jobs()
+    assert loaded.original.job_id == lj.id
+    assert loaded.original.prompt == "test prompt"
+    assert loaded.original.model == "test model"
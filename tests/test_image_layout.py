@@ -0,0 +1,29 @@
+from hordeqt.other import image_layout
+from hordeqt.other.image_layout import ImageLayout
+
+
+def test_images_are_found_part_way_through_a_move(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_layout, "SAVED_IMAGE_DIR_PATH", tmp_path)
+    monkeypatch.setattr(image_layout, "_LAYOUT_MARKER", tmp_path / ".layout")
+    monkeypatch.setattr(image_layout, "_on_disk", ImageLayout.FLAT)
+    monkeypatch.setattr(image_layout, "_target", ImageLayout.FLAT)
+    monkeypatch.setattr(image_layout, "_made_dirs", set())
+    (tmp_path / "abcd.webp").write_bytes(b"")
+    (tmp_path / "efgh.webp").write_bytes(b"")
+
+    image_layout.set_target_layout(ImageLayout.SHARDED)
+    assert image_layout.migration_pending()
+    assert (tmp_path / ".layout").read_text() == "mixed"
+    moved = image_layout.image_path("abcd", "webp", ImageLayout.SHARDED)
+    assert moved == tmp_path / "ab" / "abcd.webp"
+    image_layout.ensure_parent(moved)
+    (tmp_path / "abcd.webp").rename(moved)
+
+    assert image_layout.locate_image("abcd", "webp") == moved
+    assert image_layout.locate_image("efgh", "webp") == tmp_path / "efgh.webp"
+    # New images go straight into the new layout.
+    assert image_layout.locate_image("ijkl", "png") == tmp_path / "ij" / "ijkl.png"
+
+    image_layout.mark_migrated(ImageLayout.SHARDED)
+    assert not image_layout.migration_pending()
+    assert (tmp_path / ".layout").read_text() == "sharded"
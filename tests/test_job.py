@@ -1,9 +1,11 @@
 # tests/test_job.py
 
+import copy
 import time
 
 from hordeqt.civit.civit_api import BaseModel, ModelVersion, ModelVersionStats
 from hordeqt.classes.Job import Job
+from hordeqt.classes.LoRA import LoRA
 
 test_model_version = ModelVersion(
     10,
@@ -212,3 +214,51 @@ def test_update_status():
     assert job.queue_position == 2
     assert job.wait_time == 20
     assert job.mod_time != job.creation_time
+
+
+def test_to_json_is_memoized_until_changed():
+    job = Job(
+        prompt="test prompt",
+        sampler_name="test sampler",
+        cfg_scale=1.0,
+        seed="123",
+        width=512,
+        height=512,
+        clip_skip=1,
+        steps=10,
+        model="test model",
+    )
+    first = job.to_json()
+    # serialize adds to the dict it gets, which mustn't change the memoized one
+    assert "id" in job.serialize()
+    assert job.to_json() == first
+    job.steps = 30
+    assert job.to_json()["params"]["steps"] == 30
+    # The kudos preview changes a copy of the job
+    kudos = copy.deepcopy(job)
+    kudos.dry_run = True
+    assert kudos.to_json()["dry_run"] is True
+    assert job.to_json()["dry_run"] is False
+
+
+def test_to_json_copies_are_independent():
+    job = Job(
+        prompt="test prompt",
+        sampler_name="test sampler",
+        cfg_scale=1.0,
+        seed="123",
+        width=512,
+        height=512,
+        clip_skip=1,
+        steps=10,
+        model="test model",
+        loras=[],
+    )
+    first = job.to_json()
+    first["params"]["steps"] = 99
+    first["params"]["loras"].append({})
+    assert job.to_json()["params"]["steps"] == 10
+    assert job.to_json()["params"]["loras"] == []
+    # Changing the list in place doesn't go through __setattr__
+    job.loras.append(LoRA("Film grain", 123456, 0.8, 1.0, None))
+    assert job.to_json()["params"]["loras"][0]["name"] == "123456"
@@ -0,0 +1,74 @@
+import random
+
+import pytest
+
+from hordeqt.components.gallery.masonry_layout import MasonryLayout
+
+
+def _rects(layout: MasonryLayout):
+    return [layout.rect(i).getRect() for i in range(len(layout))]
+
+
+def _fresh(aspect_ratios, width):
+    layout = MasonryLayout()
+    layout.set_width(width)
+    layout.set_items(aspect_ratios)
+    return layout
+
+
+@pytest.fixture
+def aspect_ratios():
+    rng = random.Random(1208)
+    return [rng.choice([1.0, 2 / 3, 3 / 2, 16 / 9, 9 / 21]) for _ in range(200)]
+
+
+def test_append_matches_full_layout(aspect_ratios):
+    layout = MasonryLayout()
+    layout.set_width(1000)
+    for ar in aspect_ratios:
+        layout.append(ar)
+    assert _rects(layout) == _rects(_fresh(aspect_ratios, 1000))
+
+
+@pytest.mark.parametrize("index", [0, 57, 199])
+def test_remove_matches_full_layout(aspect_ratios, index):
+    layout = _fresh(aspect_ratios, 1000)
+    layout.remove(index)
+    expected = aspect_ratios[:index] + aspect_ratios[index + 1 :]
+    assert _rects(layout) == _rects(_fresh(expected, 1000))
+
+
+def test_insert_matches_full_layout(aspect_ratios):
+    layout = _fresh(aspect_ratios, 1000)
+    layout.insert(10, 1.0)
+    expected = aspect_ratios[:10] + [1.0] + aspect_ratios[10:]
+    assert _rects(layout) == _rects(_fresh(expected, 1000))
+
+
+def test_set_width_only_replaces_on_column_change(aspect_ratios):
+    layout = _fresh(aspect_ratios, 1000)
+    assert layout.num_columns == 4
+    columns = [p.column for p in layout.placements]
+    assert layout.set_width(1030) is False
+    assert [p.column for p in layout.placements] == columns
+    assert layout.set_width(500) is True
+    assert layout.num_columns == 2
+
+
+def test_items_in_matches_brute_force(aspect_ratios):
+    layout = _fresh(aspect_ratios, 1000)
+    for top in range(0, layout.total_height(), 337):
+        bottom = top + 800
+        expected = [
+            i
+            for i in range(len(layout))
+            if layout.rect(i).bottom() >= top and layout.rect(i).top() <= bottom
+        ]
+        assert layout.items_in(top, bottom) == expected
+
+
+def test_columns_do_not_overlap(aspect_ratios):
+    layout = _fresh(aspect_ratios, 1000)
+    for items in layout.column_items:
+        for a, b in zip(items, items[1:]):
+            assert layout.rect(a).bottom() < layout.rect(b).top()
@@ -0,0 +1,30 @@
+from hordeqt.classes.Model import Model, apply_status
+
+
+def test_apply_status():
+    reference = {"Deliberate": {"baseline": "stable_diffusion_1"}}
+    models = apply_status(
+        {},
+        [
+            {"name": "Deliberate", "count": 2, "eta": 10},
+            {"name": "Custom", "count": 5, "details": {"nsfw": True}},
+        ],
+        reference,
+    )
+    assert list(models) == ["Custom", "Deliberate"]
+    assert models["Deliberate"].details == reference["Deliberate"]
+    assert models["Custom"].details == {"nsfw": True}
+
+    deliberate = models["Deliberate"]
+    models = apply_status(
+        models, [{"name": "Deliberate", "count": 8, "eta": 3}], reference
+    )
+    assert list(models) == ["Deliberate"]
+    # Updated in place
+    assert models["Deliberate"] is deliberate
+    assert (deliberate.count, deliberate.eta) == (8, 3)
+
+
+def test_from_status_defaults():
+    m = Model.from_status({}, {})
+    assert (m.name, m.count, m.type) == ("Unknown", 1, "image")
@@ -0,0 +1,42 @@
+import random
+
+import numpy as np
+from PIL import Image
+
+from hordeqt.other.phash import BKTree, find_clusters, hamming, phash_image
+
+
+def _image(path, size, seed=0):
+    # Smoothly varying colour, like a photo rather than noise.
+    pixels = np.random.default_rng(seed).integers(0, 256, (16, 16, 3), np.uint8)
+    Image.fromarray(pixels).resize((size, size), Image.Resampling.BICUBIC).save(path)
+    return path
+
+
+def test_resized_and_recompressed_images_cluster(tmp_path):
+    original = phash_image(_image(tmp_path / "a.png", 512))
+    smaller = phash_image(_image(tmp_path / "b.png", 300))
+    with Image.open(tmp_path / "a.png") as im:
+        im.save(tmp_path / "c.jpg", quality=40)
+    jpeg = phash_image(tmp_path / "c.jpg")
+    different = phash_image(_image(tmp_path / "d.png", 512, seed=1))
+    assert hamming(original, smaller) <= 4
+    assert hamming(original, jpeg) <= 4
+    assert hamming(original, different) > 16
+    clusters = find_clusters(
+        {"a": original, "b": smaller, "c": jpeg, "d": different}, 4
+    )
+    assert [sorted(c) for c in clusters] == [["a", "b", "c"]]
+
+
+def test_bk_tree_matches_brute_force():
+    rng = random.Random(0)
+    hashes = [rng.getrandbits(64) for _ in range(300)]
+    # Some near copies, so there is something within range.
+    hashes += [h ^ (1 << rng.randrange(64)) for h in hashes[:50]]
+    tree: BKTree[int] = BKTree()
+    for n, h in enumerate(hashes):
+        tree.add(h, n)
+    for query in hashes[:40]:
+        expected = {n for n, h in enumerate(hashes) if hamming(query, h) <= 3}
+        assert {n for _, n in tree.search(query, 3)} == expected
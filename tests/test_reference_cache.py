@@ -0,0 +1,42 @@
+import json
+import os
+import time
+
+from hordeqt.other.reference_cache import ReferenceCache
+
+
+def test_store_and_validators(tmp_path):
+    cache = ReferenceCache("https://example.invalid/ref.json", tmp_path / "ref.json")
+    assert cache.cached() is None
+    assert cache.validators() == {}
+    assert not cache.is_fresh()
+
+    cache.store(
+        json.dumps({"a": 1}).encode(),
+        {"a": 1},
+        {"etag": '"abc"', "last_modified": "Wed, 01 Jan 2025 00:00:00 GMT"},
+    )
+    assert cache.is_fresh()
+    assert cache.validators() == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Wed, 01 Jan 2025 00:00:00 GMT",
+    }
+    # No temporary files left behind
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["ref.json", "ref.json.meta"]
+
+    # A new cache, as on the next start, reads the copy on disk once and shares it.
+    again = ReferenceCache(cache.url, cache.path)
+    assert again.cached() == {"a": 1}
+    assert again.cached() is again.cached()
+
+
+def test_stale_copy_is_still_used(tmp_path):
+    path = tmp_path / "ref.json"
+    path.write_text(json.dumps([1, 2]))
+    old = time.time() - 2 * 60 * 60
+    os.utime(path, (old, old))
+    cache = ReferenceCache("https://example.invalid/ref.json", path)
+    assert not cache.is_fresh()
+    assert cache.cached() == [1, 2]
+    # Without the headers from a download, revalidating downloads the whole file.
+    assert cache.validators() == {}
@@ -0,0 +1,58 @@
+import os
+
+from PIL import Image
+
+from hordeqt.other.rescan import find_missing_files, find_unknown_files, load_image_file
+
+
+def test_only_changed_unknown_files_are_scanned(tmp_path):
+    Image.new("RGB", (8, 8)).save(tmp_path / "known.png")
+    Image.new("RGB", (8, 8)).save(tmp_path / "new.png")
+    (tmp_path / "notes.txt").write_text("not an image")
+    (tmp_path / ".recompress-123.webp").write_bytes(b"")
+
+    unknown, gone = find_unknown_files({"known"}, {}, tmp_path)
+    assert sorted(p.name for p, _ in unknown) == ["new.png", "notes.txt"]
+    assert gone == []
+
+    # Neither has HordeQt metadata, so both are remembered as invalid and skipped next time.
+    assert all(load_image_file(p) is None for p, _ in unknown)
+    scanned = {p.name: (stamp, None) for p, stamp in unknown}
+    scanned["deleted.png"] = ((1, 1, 1), None)
+    unknown, gone = find_unknown_files({"known"}, scanned, tmp_path)
+    assert unknown == []
+    assert gone == ["deleted.png"]
+
+    with open(tmp_path / "notes.txt", "a") as f:
+        f.write(", still not an image")
+    os.utime(tmp_path / "notes.txt", ns=(0, 0))
+    unknown, _ = find_unknown_files({"known"}, scanned, tmp_path)
+    assert [p.name for p, _ in unknown] == ["notes.txt"]
+
+
+def test_sharded_files_are_scanned(tmp_path):
+    (tmp_path / "ab").mkdir()
+    Image.new("RGB", (8, 8)).save(tmp_path / "ab" / "abcd.png")
+    Image.new("RGB", (8, 8)).save(tmp_path / "ab" / "abef.png")
+    unknown, gone = find_unknown_files(
+        {"abcd"}, {"ab/old.png": ((1, 1, 1), None)}, tmp_path
+    )
+    assert [p for p, _ in unknown] == [tmp_path / "ab" / "abef.png"]
+    assert gone == ["ab/old.png"]
+
+
+def test_missing_files(tmp_path):
+    (tmp_path / "ab").mkdir()
+    Image.new("RGB", (8, 8)).save(tmp_path / "ab" / "abcd.webp")
+    Image.new("RGB", (8, 8)).save(tmp_path / "flat.png")
+    missing = find_missing_files(
+        {
+            "abcd": "abcd.webp",
+            "flat": "flat.png",
+            "gone": "gone.png",
+            # Recompressed since, under a different suffix
+            "flat2": "flat.webp",
+        },
+        tmp_path,
+    )
+    assert missing == ["gone", "flat2"]
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from hordeqt.classes.Job import Job
+from hordeqt.classes.LocalJob import LocalJob
+from hordeqt.classes.LoRA import LoRA
+from hordeqt.other.save_codec import (
+    JOB,
+    LOCAL_JOB,
+    Compression,
+    decode,
+    encode,
+    is_encoded,
+)
+
+
+def _local_job():
+    job = Job(
+        prompt="a lighthouse###fog",
+        model="test model",
+        steps=10,
+        sampler_name="k_euler",
+        cfg_scale=7.5,
+        clip_skip=1,
+        width=512,
+        height=512,
+        seed="-1",
+        loras=[LoRA("Film grain", 123456, 0.8, 1.0, None, "grainy", True)],
+    )
+    lj = LocalJob(job)
+    lj.worker_name = "Wörker ✨"
+    return lj
+
+
+@pytest.mark.parametrize("compression", list(Compression))
+def test_round_trip(compression):
+    data = _local_job().serialize()
+    encoded = encode(data, LOCAL_JOB, compression)
+    assert is_encoded(encoded)
+    assert decode(encoded) == data
+
+
+def test_schema_changes_still_round_trip():
+    job = _local_job().original.serialize()
+    # A key the schema doesn't know, and one it does that's missing.
+    job["new_field"] = {"nested": [1, -2, 3.5, None]}
+    del job["kudos"]
+    decoded = decode(encode(job, JOB))
+    assert decoded == job
+    assert "kudos" not in decoded
+
+
+def test_smaller_than_json():
+    jobs = [_local_job().serialize() for _ in range(20)]
+    assert len(encode(jobs, LOCAL_JOB)) < len(json.dumps(jobs)) / 2
+
+
+def test_newer_format_is_refused():
+    encoded = bytearray(encode({"a": 1}))
+    encoded[3] += 1
+    with pytest.raises(ValueError):
+        decode(bytes(encoded))
+
+
+def test_compression_is_skipped_when_it_doesnt_help():
+    assert decode(encoded := encode({"a": 1}, compression=Compression.LZMA)) == {"a": 1}
+    assert encoded[4] == Compression.NONE
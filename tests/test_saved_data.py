@@ -0,0 +1,109 @@
+import gzip
+import json
+import sqlite3
+
+import jsonpickle
+
+from hordeqt.classes import SavedData as saved_data_module
+from hordeqt.classes.SavedData import SavedData, SaveSection
+from hordeqt.other.save_codec import Compression
+
+
+def _job(job_id, prompt="a lighthouse"):
+    return {"id": job_id, "prompt": prompt, "params": {}, "models": ["test model"]}
+
+
+def test_migrate_then_write_incrementally(tmp_path, monkeypatch):
+    monkeypatch.setattr(saved_data_module, "SAVED_DB_PATH", tmp_path / "db.sqlite3")
+    monkeypatch.setattr(saved_data_module, "SAVED_DATA_PATH", tmp_path / "saved.json")
+    legacy = {
+        "max_jobs": 3,
+        "job_config": {"prompt": "a lighthouse"},
+        "api_state": {
+            "job_queue": [_job("a"), _job("b")],
+            "current_requests": [[0, 1, _job("c")]],
+        },
+        "user_saved_styles": [{"name": "mine", "prompt_format": "{p}"}],
+    }
+    with gzip.open(tmp_path / "saved.json.gz", "wt") as f:
+        f.write(jsonpickle.encode(legacy))
+
+    sd = SavedData()
+    sd.read()
+    assert sd.max_jobs == 3
+    assert not (tmp_path / "saved.json.gz").exists()
+    assert (tmp_path / "old_saved.json.gz").exists()
+
+    sd = SavedData()
+    sd.read()
+    assert sd.job_config == {"prompt": "a lighthouse"}
+    assert [j["id"] for j in sd.api_state["job_queue"]] == ["a", "b"]
+    assert sd.api_state["current_requests"] == [[0, 1, _job("c")]]
+    assert sd.user_saved_styles == [{"name": "mine", "prompt_format": "{p}"}]
+
+    # "a" was sent, and a job was queued.
+    sd.api_state["job_queue"] = [_job("b"), _job("d")]
+    sd.max_jobs = 4
+    sd.write()
+    conn = sqlite3.connect(tmp_path / "db.sqlite3")
+    rows = conn.execute(
+        "SELECT id, position FROM jobs WHERE queue = 'job_queue' ORDER BY position"
+    ).fetchall()
+    # "b" kept its row.
+    assert rows == [("b", 2), ("d", 3)]
+
+    sd = SavedData()
+    sd.read()
+    assert sd.max_jobs == 4
+    assert [j["id"] for j in sd.api_state["job_queue"]] == ["b", "d"]
+
+
+def test_only_given_sections_are_written(tmp_path, monkeypatch):
+    monkeypatch.setattr(saved_data_module, "SAVED_DB_PATH", tmp_path / "db.sqlite3")
+    monkeypatch.setattr(saved_data_module, "SAVED_DATA_PATH", tmp_path / "saved.json")
+    sd = SavedData()
+    sd.read()
+    sd.write()
+
+    sd.max_jobs = 7
+    sd.api_state = {"job_queue": [_job("a")]}
+    sd.write([SaveSection.JOBS])
+    sd = SavedData()
+    sd.read()
+    assert sd.max_jobs == 5
+    assert [j["id"] for j in sd.api_state["job_queue"]] == ["a"]
+
+
+def test_text_rows_from_before_the_binary_format_are_read(tmp_path, monkeypatch):
+    monkeypatch.setattr(saved_data_module, "SAVED_DB_PATH", tmp_path / "db.sqlite3")
+    monkeypatch.setattr(saved_data_module, "SAVED_DATA_PATH", tmp_path / "saved.json")
+    sd = SavedData()
+    sd.read()
+    sd.write()
+    conn = sqlite3.connect(tmp_path / "db.sqlite3")
+    with conn:
+        conn.execute(
+            "INSERT INTO jobs VALUES ('job_queue', 'a', 0, ?)",
+            (json.dumps(_job("a")),),
+        )
+    sd = SavedData()
+    sd.read()
+    assert sd.api_state["job_queue"] == [_job("a")]
+
+
+def test_rows_are_written_with_the_given_compression(tmp_path, monkeypatch):
+    monkeypatch.setattr(saved_data_module, "SAVED_DB_PATH", tmp_path / "db.sqlite3")
+    monkeypatch.setattr(saved_data_module, "SAVED_DATA_PATH", tmp_path / "saved.json")
+    job = _job("a", "a lighthouse, " * 20)
+    for compression in (Compression.NONE, Compression.ZLIB):
+        sd = SavedData(compression)
+        sd.read()
+        sd.api_state = {"job_queue": [job]}
+        sd.write()
+        conn = sqlite3.connect(tmp_path / "db.sqlite3")
+        (data,) = conn.execute("SELECT data FROM jobs").fetchone()
+        conn.close()
+        assert data[4] == compression
+        sd = SavedData()
+        sd.read()
+        assert sd.api_state["job_queue"] == [job]
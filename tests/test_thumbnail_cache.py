@@ -0,0 +1,22 @@
+from PIL import Image
+
+from hordeqt.other.thumbnail_cache import (
+    THUMBNAIL_SIZE,
+    get_thumbnail,
+    remove_thumbnails,
+    thumbnail_paths,
+)
+
+
+def test_remove_thumbnails(tmp_path):
+    path = tmp_path / "image.png"
+    Image.new("RGB", (1024, 768)).save(path)
+    thumbnail = get_thumbnail(path, THUMBNAIL_SIZE)
+    assert thumbnail_paths(path) == [thumbnail]
+
+    remove_thumbnails(thumbnail_paths(path))
+    assert not thumbnail.exists()
+    # Already gone, or the image is
+    remove_thumbnails(thumbnail_paths(path))
+    path.unlink()
+    assert thumbnail_paths(path) == []